@@ -0,0 +1,38 @@
+"""
+Contract ABIs shipped with the backend.
+
+Verification.json holds only the ABI of the Verification contract (no
+bytecode or AST), so loading it does not need the Truffle build. Regenerate
+it after changing the contract:
+
+    python -m app.abi ../blockchain/build/contracts/Verification.json
+"""
+import json
+import functools
+import os
+from typing import Dict, Any, List, Optional
+
+ABI_DIR = os.path.dirname(os.path.abspath(__file__))
+VERIFICATION_ABI_PATH = os.path.join(ABI_DIR, "Verification.json")
+
+@functools.lru_cache(maxsize=None)
+def load_abi(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Load a contract ABI (read once per path).
+
+    Args:
+        path: ABI file, or a Truffle artifact with an "abi" key (default: the bundled Verification ABI)
+
+    Returns:
+        The ABI
+    """
+    with open(path or VERIFICATION_ABI_PATH, "r") as f:
+        data = json.load(f)
+    return data["abi"] if isinstance(data, dict) else data
+
+def extract_abi(artifact_path: str, output_path: str = VERIFICATION_ABI_PATH):
+    """Write the ABI of a Truffle artifact to an ABI-only file."""
+    abi = load_abi(artifact_path)
+    with open(output_path, "w") as f:
+        json.dump(abi, f, indent=2)
+        f.write("\n")
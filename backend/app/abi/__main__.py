@@ -0,0 +1,11 @@
+"""Extract the ABI of a Truffle artifact: python -m app.abi <artifact> [output]"""
+import sys
+
+from app.abi import VERIFICATION_ABI_PATH, extract_abi
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__)
+    output_path = sys.argv[2] if len(sys.argv) == 3 else VERIFICATION_ABI_PATH
+    extract_abi(sys.argv[1], output_path)
+    print(f"Wrote {output_path}")
@@ -1,21 +1,53 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 
 from app.routes import verification
 from app.routes import resume_verification  # Add this import
+from app.services.admission import ADMISSION_RETRY_AFTER, OverloadedError
+from app.services.blockchain import BLOCKCHAIN_WARM_UP, close_blockchain, warm_up
+from app.services.auto_verification import AUTO_VERIFY_ENABLED, start_auto_verification, stop_auto_verification
+from app.services.metrics import REGISTRY, MetricsMiddleware
+from app.services.mock_db import load_reference_snapshot
+from app.services.mongo import close_clients
+from app.services.reference_snapshot import close_reference_snapshot
+from app.services.scheduler import close_scheduler
+from app.services import tracing
+from app.utils.logging_config import configure_logging, stop_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-)
+# Set up logging (LOG_LEVEL, LOG_FORMAT=text|json, LOG_SAMPLE_RATE)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import web3 and connect to the chain in the background, so /health answers right away
+    if BLOCKCHAIN_WARM_UP:
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    # Load the reference snapshot before serving (REFERENCE_SNAPSHOT=1), not on the first request
+    await asyncio.get_running_loop().run_in_executor(None, load_reference_snapshot)
+    # Verify newly parsed resumes as they are inserted (AUTO_VERIFY=1)
+    if AUTO_VERIFY_ENABLED:
+        start_auto_verification()
+    yield
+    stop_auto_verification()
+    # Cancel queued verification jobs and wait for the running ones
+    close_scheduler()
+    # Stop the reference snapshot refresh and close the shared MongoDB connection pools
+    close_reference_snapshot()
+    close_clients()
+    # Stop replacing stuck transactions and probing ejected RPC endpoints
+    close_blockchain()
+    stop_logging()
+
 app = FastAPI(
     title="Blockchain-Based Applicant Verification API",
     description="API for verifying resume information using blockchain and oracle simulations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -26,11 +58,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(tracing.TracingMiddleware)
+# Added last so it wraps everything, including CORS and tracing
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(verification.router, prefix="/verification")
 app.include_router(resume_verification.router)  # Add this line
 
+@app.exception_handler(OverloadedError)
+async def overloaded(request: Request, exc: OverloadedError):
+    """Shed load quickly when the chain or MongoDB is saturated."""
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -41,4 +85,16 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/traces", include_in_schema=False)
+async def traces(limit: int = Query(20, ge=1, le=500)):
+    """Most recent traces recorded with TRACING_EXPORTER=memory."""
+    if tracing.memory_exporter is None:
+        raise HTTPException(status_code=404, detail="In-memory tracing is disabled, set TRACING_EXPORTER=memory")
+    return {"traces": tracing.memory_exporter.traces(limit)}
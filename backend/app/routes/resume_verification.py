@@ -1,18 +1,41 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import Dict, Any
-from app.utils.helpers import convert_objectid
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
+from bson.errors import InvalidId
+from app.utils.responses import BSONResponse, encode_json, encode_sse
 
 from app.models.schemas import (
     ResumeInitVerificationRequest,
     ResumeEducationVerificationRequest,
     ResumeWorkExperienceVerificationRequest,
-    VerificationResponse
+    VerificationResponse,
+    VerificationStatus
 )
 
+from app.services.admission import OverloadedError, deadline
+from app.services.mock_db import MockDatabase
+from app.services.scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    SchedulerFullError,
+    fairness_key_async,
+    get_scheduler
+)
 from app.services.verification import (
     ResumeVerificationService,
     VerificationState
 )
+from app.services.verification.events import (
+    event_bus,
+    snapshot_event,
+    EVENT_KEEPALIVE_SECONDS,
+    SNAPSHOT_EVENT
+)
+
+# Page size when paging with after but no limit
+DEFAULT_PAGE_SIZE = 50
 
 router = APIRouter(
     prefix="/resume-verification",
@@ -20,6 +43,19 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated list of fields to project."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+def get_db():
+    db = MockDatabase()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def get_resume_verification_service():
     service = ResumeVerificationService()
     try:
@@ -27,6 +63,24 @@ def get_resume_verification_service():
     finally:
         service.close()
 
+async def run_scheduled(service: ResumeVerificationService, resume_id: str, priority: int, function, *args):
+    """
+    Run a verification call on the scheduler, queued fairly against other jobs and recruiters.
+    Backend calls made by a job that waited past the request deadline are rejected.
+    
+    Raises:
+        HTTPException: 503 if the scheduler queue is full
+        OverloadedError: If the chain or MongoDB is saturated
+    """
+    try:
+        # The owner lookup and the job run in copies of this context, deadline included
+        with deadline():
+            key = await fairness_key_async(service.db, resume_id)
+            future = get_scheduler().submit(function, *args, key=key, priority=priority)
+    except SchedulerFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return await asyncio.wrap_future(future)
+
 @router.post("/initialize", response_model=VerificationResponse)
 async def initialize_verification(
     request: ResumeInitVerificationRequest,
@@ -36,17 +90,19 @@ async def initialize_verification(
     Initialize verification record for a resume and automatically start verification.
     """
     try:
-        success, message, data = service.initialize_verification(request.resume_id)
+        success, message, data = await run_scheduled(
+            service, request.resume_id, PRIORITY_BULK,
+            service.initialize_verification, request.resume_id
+        )
         
-        # Convert any ObjectId to string before returning
-        if data:
-            data = convert_objectid(data)
-            
-        return {
+        # ObjectIds are converted while serializing
+        return BSONResponse({
             "success": success,
             "message": message,
             "data": data
-        }
+        })
+    except (HTTPException, OverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error initializing verification: {str(e)}")
 
@@ -59,20 +115,21 @@ async def check_education_verification(
     Check education verification status or initiate verification process.
     """
     try:
-        success, message, data = service.check_education_verification(
+        success, message, data = await run_scheduled(
+            service, request.resume_id, PRIORITY_INTERACTIVE,
+            service.check_education_verification,
             request.resume_id,
             request.education_index
         )
         
-        # Convert any ObjectId to string before returning
-        if data:
-            data = convert_objectid(data)
-            
-        return {
+        # ObjectIds are converted while serializing
+        return BSONResponse({
             "success": success,
             "message": message,
             "data": data
-        }
+        })
+    except (HTTPException, OverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking education verification: {str(e)}")
 
@@ -86,21 +143,22 @@ async def verify_education(
     Approve or reject education verification and store result in blockchain.
     """
     try:
-        success, message, data = service.verify_education(
+        success, message, data = await run_scheduled(
+            service, request.resume_id, PRIORITY_INTERACTIVE,
+            service.verify_education,
             request.resume_id,
             request.education_index,
             approval
         )
         
-        # Convert any ObjectId to string before returning
-        if data:
-            data = convert_objectid(data)
-            
-        return {
+        # ObjectIds are converted while serializing
+        return BSONResponse({
             "success": success,
             "message": message,
             "data": data
-        }
+        })
+    except (HTTPException, OverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying education: {str(e)}")
 
@@ -113,20 +171,21 @@ async def check_work_experience_verification(
     Check work experience verification status or initiate verification process.
     """
     try:
-        success, message, data = service.check_work_experience_verification(
+        success, message, data = await run_scheduled(
+            service, request.resume_id, PRIORITY_INTERACTIVE,
+            service.check_work_experience_verification,
             request.resume_id,
             request.experience_index
         )
         
-        # Convert any ObjectId to string before returning
-        if data:
-            data = convert_objectid(data)
-            
-        return {
+        # ObjectIds are converted while serializing
+        return BSONResponse({
             "success": success,
             "message": message,
             "data": data
-        }
+        })
+    except (HTTPException, OverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking work experience verification: {str(e)}")
 
@@ -140,41 +199,138 @@ async def verify_work_experience(
     Approve or reject work experience verification and store result in blockchain.
     """
     try:
-        success, message, data = service.verify_work_experience(
+        success, message, data = await run_scheduled(
+            service, request.resume_id, PRIORITY_INTERACTIVE,
+            service.verify_work_experience,
             request.resume_id,
             request.experience_index,
             approval
         )
         
-        # Convert any ObjectId to string before returning
-        if data:
-            data = convert_objectid(data)
-            
-        return {
+        # ObjectIds are converted while serializing
+        return BSONResponse({
             "success": success,
             "message": message,
             "data": data
-        }
+        })
+    except (HTTPException, OverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying work experience: {str(e)}")
 
 @router.get("/resumes", response_model=Dict[str, Any])
 async def get_all_resumes(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum number of resumes to return (all if neither limit nor after is given)"),
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    is_verified: Optional[VerificationStatus] = Query(None, description="Filter by overall verification status"),
+    job_id: Optional[str] = Query(None, description="Filter by job ID"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,email,is_verified"),
     service: ResumeVerificationService = Depends(get_resume_verification_service)
 ):
     """
-    Get all resumes with their verification status.
+    Get a page of resumes with their verification status.
+    Pass next_cursor as `after` to fetch the following page. Without limit and after,
+    every matching resume is returned (as before pagination existed).
     """
+    if limit is None and after is not None:
+        limit = DEFAULT_PAGE_SIZE
     try:
-        resumes = service.get_all_resumes()
+        # Off the event loop: the admission limiter may block while MongoDB is saturated
+        resumes, next_cursor = await run_in_threadpool(
+            service.get_resumes_page,
+            limit=limit,
+            after=after,
+            is_verified=is_verified,
+            job_id=job_id,
+            fields=parse_fields(fields)
+        )
         
-        # Convert any ObjectId to string before returning
-        resumes = [convert_objectid(resume) for resume in resumes]
-            
-        return {
+        return BSONResponse({
             "success": True,
             "message": f"Successfully retrieved {len(resumes)} resumes",
-            "data": resumes
-        }
+            "data": resumes,
+            "next_cursor": next_cursor
+        })
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {after}")
+    except OverloadedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching resumes: {str(e)}")
+
+@router.get("/resumes/stream")
+async def stream_resumes(
+    is_verified: Optional[VerificationStatus] = Query(None, description="Filter by overall verification status"),
+    job_id: Optional[str] = Query(None, description="Filter by job ID"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,email,is_verified")
+):
+    """
+    Stream all matching resumes as newline-delimited JSON, one resume per line.
+    """
+    # The service is closed by the generator, after the last document has been sent
+    try:
+        service = ResumeVerificationService()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching resumes: {str(e)}")
+    
+    resumes = service.iter_resumes(
+        is_verified=is_verified,
+        job_id=job_id,
+        fields=parse_fields(fields)
+    )
+    
+    def generate():
+        try:
+            for resume in resumes:
+                yield encode_json(resume) + b"\n"
+        finally:
+            service.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/{resume_id}/events")
+async def verification_events(
+    resume_id: str,
+    db: MockDatabase = Depends(get_db)
+):
+    """
+    Stream the verification progress of a resume as Server-Sent Events.
+    Starts with a "snapshot" event with the state of every item, then sends an "item" event
+    for every item state transition and a "status" event when the overall status changes.
+    """
+    # Subscribe before reading the record so that no transition in between is missed
+    subscription = event_bus.subscribe(resume_id)
+    try:
+        # Off the event loop: the admission limiter may block while MongoDB is saturated
+        verification = await run_in_threadpool(db.get_verification_info, resume_id)
+    except OverloadedError:
+        subscription.close()
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching resumes: {str(e)}")
\ No newline at end of file
+        subscription.close()
+        raise HTTPException(status_code=500, detail=f"Error reading verification: {str(e)}")
+    if not verification:
+        subscription.close()
+        raise HTTPException(status_code=404, detail=f"Verification for resume ID {resume_id} not found")
+    
+    snapshot = snapshot_event(verification)
+    
+    async def generate():
+        try:
+            yield encode_sse(SNAPSHOT_EVENT, snapshot)
+            while True:
+                try:
+                    event_type, data = await asyncio.wait_for(subscription.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                yield encode_sse(event_type, data)
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
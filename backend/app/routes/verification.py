@@ -4,6 +4,7 @@ API routes for blockchain-based verification services.
 from fastapi import APIRouter, HTTPException, Depends 
 from typing import List, Dict, Any
 
+from ..services.admission import OverloadedError
 from ..services.mock_db import MockDatabase
 from ..services.blockchain import BlockchainClient, VerificationType
 from ..services.oracle_simulator import OracleSimulator
@@ -15,6 +16,7 @@ from ..models.schemas import (
     BlockchainStatus,
     VerificationListResponse
 )
+from ..utils.responses import BSONResponse
 
 # Create router
 router = APIRouter(
@@ -60,6 +62,8 @@ async def verify_gpa(
             verification_type=VerificationType.GPA
         )
         return result
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying GPA: {str(e)}")
 
@@ -77,6 +81,8 @@ async def verify_degree(
             verification_type=VerificationType.DEGREE
         )
         return result
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying degree: {str(e)}")
 
@@ -94,6 +100,8 @@ async def verify_employment(
             verification_type=VerificationType.EMPLOYMENT
         )
         return result
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying employment: {str(e)}")
 
@@ -114,6 +122,8 @@ async def get_blockchain_status(
             "block_number": block_number,
             "verification_count": verification_count
         }
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting blockchain status: {str(e)}")
 
@@ -127,10 +137,13 @@ async def list_verifications(
     try:
         verifications = blockchain.get_all_verifications()
         
-        return {
+        # Serialized directly: revalidating every record against the response model is skipped
+        return BSONResponse({
             "verifications": verifications,
             "total": len(verifications)
-        }
+        })
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing verifications: {str(e)}")
 
@@ -150,7 +163,7 @@ async def get_verification(
         verification["data_hash"] = data_hash
         
         return verification
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting verification: {str(e)}")
@@ -164,7 +177,7 @@ async def get_university_record(
     Get university record for a student (for debugging/demo purposes).
     """
     try:
-        record = db.get_university_record_by_name(name)
+        record = db.get_university_record_by_params({"name": name})
         if not record:
             raise HTTPException(status_code=404, detail=f"No university record found for {name}")
         
@@ -173,7 +186,7 @@ async def get_university_record(
             del record["_id"]
             
         return record
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting university record: {str(e)}")
@@ -187,7 +200,7 @@ async def get_employment_records(
     Get employment records for an employee (for debugging/demo purposes).
     """
     try:
-        records = db.get_employment_record_by_name(name)
+        records = db.get_employment_record_by_params({"name": name})
         if not records:
             raise HTTPException(status_code=404, detail=f"No employment records found for {name}")
         
@@ -197,7 +210,7 @@ async def get_employment_records(
                 del record["_id"]
             
         return records
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting employment records: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Admission control in front of the RPC node and MongoDB.
+
+Every BlockchainClient and MockDatabase call takes a slot from the backend's
+AdaptiveLimiter. The number of slots follows the backend's latency (AIMD):
+
+- a call that finishes within the latency target, while at least half of the
+  slots are in use, adds one slot (up to max_limit)
+- a call that is slower than the target or fails multiplies the limit by the
+  backoff factor (down to min_limit)
+
+so concurrency settles around the knee of the latency curve instead of piling
+more work on a node that is already slowing down. Calls over the limit wait in
+a bounded queue for at most ADMISSION_QUEUE_TIMEOUT seconds, or until the
+request deadline; otherwise OverloadedError is raised at once and the routes
+answer 503 with a Retry-After header.
+
+Limits, queued calls, queue wait and rejections are exported as admission_*
+metrics. Disable with ADMISSION_CONTROL=0.
+"""
+import os
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from app.services.metrics import ADMISSION_LIMIT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL", "1").lower() in ("1", "true", "yes")
+# Calls waiting for a slot, per backend, before new calls are rejected
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1.0"))
+# Seconds a verification request may spend queued or running before its backend calls are rejected
+ADMISSION_REQUEST_DEADLINE = float(os.getenv("ADMISSION_REQUEST_DEADLINE", "30"))
+# Seconds clients are asked to wait before retrying a rejected request
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# perf_counter() time after which backend calls of the current request are rejected
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("admission_deadline", default=None)
+
+
+class OverloadedError(Exception):
+    """Raised when a backend call is rejected because the backend is saturated."""
+
+    def __init__(self, backend: str, reason: str):
+        super().__init__(f"{backend} is overloaded ({reason}), retry later")
+        self.backend = backend
+        self.reason = reason
+
+
+@contextmanager
+def deadline(seconds: float = ADMISSION_REQUEST_DEADLINE) -> Iterator[None]:
+    """
+    Reject the backend calls made in the enclosed block (and in scheduler jobs
+    submitted from it) once the given number of seconds has passed.
+    """
+    token = _deadline.set(time.perf_counter() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease on latency."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float = 0.9,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        enabled: bool = ADMISSION_CONTROL_ENABLED
+    ):
+        """
+        Args:
+            name: Backend name used in metrics and errors, e.g. "chain"
+            initial_limit: Concurrent calls allowed at start
+            min_limit: Lowest limit after backoffs
+            max_limit: Highest limit after increases
+            latency_target: Seconds above which a call counts as a congestion signal
+            backoff: Factor applied to the limit on a congestion signal
+            queue_size: Calls that may wait for a slot
+            queue_timeout: Seconds a call may wait for a slot
+            enabled: If False, calls are never limited
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.enabled = enabled
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.queued = 0
+        self._condition = threading.Condition()
+        ADMISSION_LIMIT.set(int(self.limit), backend=name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current limit, in-flight and queued calls."""
+        with self._condition:
+            return {"limit": int(self.limit), "in_flight": self.in_flight, "queued": self.queued}
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.inc(backend=self.name, reason=reason)
+        raise OverloadedError(self.name, reason)
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if all slots are in use.
+
+        Raises:
+            OverloadedError: If the queue is full, the wait times out or the request deadline has passed
+        """
+        now = time.perf_counter()
+        wait_until = now + self.queue_timeout
+        request_deadline = _deadline.get()
+        if request_deadline is not None:
+            if request_deadline <= now:
+                self._reject("deadline")
+            wait_until = min(wait_until, request_deadline)
+
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            if self.queued >= self.queue_size:
+                self._reject("queue_full")
+
+            self.queued += 1
+            ADMISSION_QUEUED.set(self.queued, backend=self.name)
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = wait_until - time.perf_counter()
+                    if remaining <= 0:
+                        self._reject("timeout")
+                    self._condition.wait(remaining)
+                self.in_flight += 1
+            finally:
+                self.queued -= 1
+                ADMISSION_QUEUED.set(self.queued, backend=self.name)
+                ADMISSION_WAIT.observe(time.perf_counter() - now, backend=self.name)
+
+    def release(self, latency: float, congested: bool = False):
+        """
+        Return a slot and adjust the limit.
+
+        Args:
+            latency: Seconds the call took
+            congested: True if the call failed
+        """
+        with self._condition:
+            utilized = self.in_flight * 2 >= self.limit
+            self.in_flight -= 1
+            if congested or latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif utilized:
+                # Only grow while the slots are actually used, so an idle period does not inflate the limit
+                self.limit = min(self.max_limit, self.limit + 1)
+            ADMISSION_LIMIT.set(int(self.limit), backend=self.name)
+            self._condition.notify(max(int(self.limit) - self.in_flight, 0))
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Run the enclosed block in a slot."""
+        if not self.enabled:
+            yield
+            return
+        self.acquire()
+        congested = True
+        started = time.perf_counter()
+        try:
+            yield
+            congested = False
+        finally:
+            self.release(time.perf_counter() - started, congested)
+
+    def guard(self, function: Callable) -> Callable:
+        """Decorator running every call of a function in a slot."""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.slot():
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def limiter_from_env(name: str, initial_limit: int, max_limit: int, latency_target: float) -> AdaptiveLimiter:
+    """
+    Build a limiter configured by ADMISSION_<NAME>_LIMIT, _MIN_LIMIT, _MAX_LIMIT and _LATENCY_TARGET.
+
+    Args:
+        name: Backend name, e.g. "chain"
+        initial_limit: Default initial limit
+        max_limit: Default maximum limit
+        latency_target: Default latency target in seconds
+
+    Returns:
+        AdaptiveLimiter
+    """
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdaptiveLimiter(
+        name,
+        initial_limit=int(os.getenv(f"{prefix}_LIMIT", str(initial_limit))),
+        min_limit=int(os.getenv(f"{prefix}_MIN_LIMIT", "1")),
+        max_limit=int(os.getenv(f"{prefix}_MAX_LIMIT", str(max_limit))),
+        latency_target=float(os.getenv(f"{prefix}_LATENCY_TARGET", str(latency_target)))
+    )
+
+
+# Ganache serializes requests, so a handful of concurrent RPC calls is already the knee
+CHAIN_LIMITER = limiter_from_env("chain", initial_limit=8, max_limit=64, latency_target=1.0)
+MONGO_LIMITER = limiter_from_env("mongo", initial_limit=32, max_limit=256, latency_target=0.1)
@@ -0,0 +1,343 @@
+"""
+Automatic verification of newly parsed resumes.
+
+A background consumer watches inserts into parsed_resumes through a change
+stream and runs ResumeVerificationService.initialize_verification for each new
+resume, so verification overlaps with ingestion instead of waiting for a call
+to /resume-verification/initialize.
+
+The pipeline is bounded: the watcher hands resume ids to a queue of
+AUTO_VERIFY_QUEUE_SIZE entries read by AUTO_VERIFY_CONCURRENCY worker threads,
+each with its own service. A worker submits its resume to the
+VerificationScheduler as bulk work under the resume's fairness key, so
+automatic initialization shares the scheduler workers fairly with API calls
+and never runs ahead of interactive work, and waits for it to finish. When
+the workers fall behind, the watcher stops reading the stream instead of
+buffering without limit.
+
+The change stream resume token is persisted in MongoDB once every earlier
+insert has been processed, so a restart continues where processing stopped.
+Transient failures (overload, a full scheduler, MongoDB errors) are retried
+with backoff instead of counting as processed. Inserts that were in flight
+are delivered again; initialize_verification ignores resumes that already
+have a verification record.
+
+Enable it with AUTO_VERIFY=1 (needs a replica set or sharded cluster).
+"""
+import os
+import logging
+import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional, Set
+
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure, PyMongoError
+from dotenv import load_dotenv
+
+from app.services.admission import OverloadedError
+from app.services.metrics import AUTO_VERIFY_QUEUE_DEPTH, AUTO_VERIFY_RESUMES
+from app.services.mock_db import MockDatabase
+from app.services.scheduler import (
+    PRIORITY_BULK,
+    SchedulerFullError,
+    VerificationScheduler,
+    fairness_key,
+    get_scheduler
+)
+from app.services.verification import ResumeVerificationService
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+AUTO_VERIFY_ENABLED = os.getenv("AUTO_VERIFY", "0").lower() in ("1", "true", "yes")
+AUTO_VERIFY_CONCURRENCY = int(os.getenv("AUTO_VERIFY_CONCURRENCY", "4"))
+AUTO_VERIFY_QUEUE_SIZE = int(os.getenv("AUTO_VERIFY_QUEUE_SIZE", "100"))
+# Collection (in the resume database) holding the persisted resume tokens
+AUTO_VERIFY_TOKEN_COLLECTION = os.getenv("AUTO_VERIFY_TOKEN_COLLECTION", "change_stream_tokens")
+
+# Seconds between checks of the stop flag while waiting
+WAIT_SECONDS = 1.0
+# Seconds before reopening a failed change stream or retrying to build a service
+RETRY_SECONDS = 5.0
+# Longest wait between retries of a resume that failed transiently (doubling from RETRY_SECONDS)
+MAX_RETRY_SECONDS = 60.0
+# Failures worth retrying: the resume was not processed, but may be once the backend recovers
+TRANSIENT_ERRORS = (OverloadedError, SchedulerFullError, PyMongoError)
+# Server error code when a resume token is older than the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class TokenTracker:
+    """
+    Tracks in-flight inserts and persists the resume token of the last insert
+    before which everything has been processed.
+    """
+
+    def __init__(self, token_collection: Collection, stream_name: str):
+        self.token_collection = token_collection
+        self.stream_name = stream_name
+        self._lock = threading.Lock()
+        self._next_sequence = 0
+        self._in_flight: "OrderedDict[int, Any]" = OrderedDict()
+        self._done: Set[int] = set()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Get the persisted resume token, or None to start from now."""
+        document = self.token_collection.find_one({"_id": self.stream_name})
+        return document["token"] if document else None
+
+    def reset(self):
+        """Forget the persisted token."""
+        self.token_collection.delete_one({"_id": self.stream_name})
+
+    def add(self, token: Dict[str, Any]) -> int:
+        """
+        Register an insert read from the stream.
+
+        Returns:
+            Sequence number to pass to done()
+        """
+        with self._lock:
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._in_flight[sequence] = token
+            return sequence
+
+    def done(self, sequence: int):
+        """Mark an insert as processed and persist the token if the watermark moved."""
+        token = None
+        with self._lock:
+            self._done.add(sequence)
+            while self._in_flight and next(iter(self._in_flight)) in self._done:
+                oldest, token = self._in_flight.popitem(last=False)
+                self._done.discard(oldest)
+            if token is not None:
+                # Saved under the lock so an older token never overwrites a newer one
+                self._save(token)
+
+    def _save(self, token: Dict[str, Any]):
+        try:
+            self.token_collection.update_one(
+                {"_id": self.stream_name},
+                {"$set": {"token": token, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            # The next watermark move saves a newer token
+            logger.error("Error saving the %s resume token: %s", self.stream_name, e)
+
+
+class AutoVerificationConsumer:
+    """Change stream consumer feeding new resumes to initialize_verification."""
+
+    def __init__(
+        self,
+        collection: Collection,
+        token_collection: Collection,
+        service_factory: Callable[[], Any] = ResumeVerificationService,
+        concurrency: int = AUTO_VERIFY_CONCURRENCY,
+        queue_size: int = AUTO_VERIFY_QUEUE_SIZE,
+        scheduler: Optional[VerificationScheduler] = None
+    ):
+        """
+        Args:
+            collection: Collection to watch (parsed_resumes)
+            token_collection: Collection where the resume token is persisted
+            service_factory: Builds one verification service per worker (default: ResumeVerificationService)
+            concurrency: Number of worker threads
+            queue_size: Resumes read from the stream but not yet picked up by a worker
+            scheduler: Scheduler running the verification (default: the process-wide one)
+        """
+        self.collection = collection
+        self.service_factory = service_factory
+        self.concurrency = concurrency
+        self.scheduler = scheduler
+        self.tokens = TokenTracker(token_collection, collection.full_name)
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the watcher and the worker threads."""
+        self._stop.clear()
+        targets = [("watch", self._watch)] + [(f"worker-{i}", self._work) for i in range(self.concurrency)]
+        for name, target in targets:
+            thread = threading.Thread(target=target, name=f"auto-verify-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Auto-verification of %s started with %d workers", self.collection.full_name, self.concurrency)
+
+    def stop(self, timeout: float = 30):
+        """
+        Stop reading the stream and wait for the worker threads to exit.
+        Workers stop waiting for their current resume within WAIT_SECONDS; it and
+        the queued resumes are left for the next start (their token is not persisted).
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        logger.info("Auto-verification of %s stopped", self.collection.full_name)
+
+    def _watch(self):
+        """Read inserts from the change stream until stopped, reopening it after errors."""
+        token = None
+        token_loaded = False
+        while not self._stop.is_set():
+            try:
+                if not token_loaded:
+                    token = self.tokens.load()
+                    token_loaded = True
+                with self.collection.watch(
+                    [{"$match": {"operationType": "insert"}}],
+                    resume_after=token,
+                    max_await_time_ms=int(WAIT_SECONDS * 1000)
+                ) as stream:
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is not None:
+                            # Reopen after the last insert handed to the queue, not the persisted one
+                            token = change["_id"]
+                            self._submit(change)
+            except OperationFailure as e:
+                if e.code != CHANGE_STREAM_HISTORY_LOST:
+                    logger.error("Change stream on %s failed: %s", self.collection.full_name, e)
+                    self._stop.wait(RETRY_SECONDS)
+                    continue
+                # Inserts since the token are no longer in the oplog; initialize them through the API
+                logger.error("Resume token of %s is too old, continuing from now: %s", self.collection.full_name, e)
+                self.tokens.reset()
+                token = None
+            except PyMongoError as e:
+                logger.error("Change stream on %s failed: %s", self.collection.full_name, e)
+                self._stop.wait(RETRY_SECONDS)
+
+    def _submit(self, change: Dict[str, Any]):
+        """Queue one insert, waiting while the queue is full."""
+        sequence = self.tokens.add(change["_id"])
+        item = (sequence, str(change["documentKey"]["_id"]))
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=WAIT_SECONDS)
+                AUTO_VERIFY_QUEUE_DEPTH.set(self._queue.qsize())
+                return
+            except queue.Full:
+                continue
+
+    def _work(self):
+        """Initialize the verification of queued resumes until stopped."""
+        service = None
+        try:
+            while not self._stop.is_set():
+                if service is None:
+                    try:
+                        service = self.service_factory()
+                    except Exception as e:
+                        logger.error("Error creating the verification service: %s", e)
+                        self._stop.wait(RETRY_SECONDS)
+                        continue
+                try:
+                    sequence, resume_id = self._queue.get(timeout=WAIT_SECONDS)
+                except queue.Empty:
+                    continue
+                AUTO_VERIFY_QUEUE_DEPTH.set(self._queue.qsize())
+                self._initialize(service, sequence, resume_id)
+        finally:
+            if service is not None:
+                service.close()
+
+    def _schedule(self, service: Any, resume_id: str) -> Optional[Future]:
+        """Submit initialize_verification as bulk work, waiting while the scheduler is full (None once stopped)."""
+        key = fairness_key(service.db, resume_id)
+        scheduler = self.scheduler or get_scheduler()
+        while not self._stop.is_set():
+            try:
+                return scheduler.submit(service.initialize_verification, resume_id, key=key, priority=PRIORITY_BULK)
+            except SchedulerFullError:
+                self._stop.wait(WAIT_SECONDS)
+        return None
+
+    def _result(self, future: Future) -> Optional[Any]:
+        """Wait for a scheduled job, checking the stop flag (None once stopped; a queued job is cancelled)."""
+        while True:
+            try:
+                return future.result(timeout=WAIT_SECONDS)
+            except FutureTimeoutError:
+                if self._stop.is_set():
+                    future.cancel()
+                    return None
+
+    def _initialize(self, service: Any, sequence: int, resume_id: str):
+        """
+        Initialize one resume, retrying transient failures with backoff.
+
+        The insert is only marked done once it was processed, skipped or failed
+        permanently; if the consumer stops first, it is delivered again after a restart.
+        """
+        attempt = 0
+        while True:
+            try:
+                future = self._schedule(service, resume_id)
+                if future is None:
+                    # Stopped before it could be queued
+                    return
+                result = self._result(future)
+                if result is None:
+                    logger.info("Auto-verification of resume %s interrupted by stop", resume_id)
+                    return
+                success, message, _ = result
+                outcome = "initialized" if success else "skipped"
+                logger.info("Auto-verification of resume %s: %s", resume_id, message)
+                break
+            except CancelledError:
+                # The scheduler shut down with the job queued
+                logger.info("Auto-verification of resume %s cancelled", resume_id)
+                return
+            except TRANSIENT_ERRORS as e:
+                delay = min(RETRY_SECONDS * 2 ** attempt, MAX_RETRY_SECONDS)
+                attempt += 1
+                AUTO_VERIFY_RESUMES.inc(outcome="retried")
+                logger.warning("Auto-verification of resume %s failed, retrying in %.1fs: %s", resume_id, delay, e)
+                if self._stop.wait(delay):
+                    return
+            except Exception as e:
+                outcome = "error"
+                logger.error("Error auto-verifying resume %s: %s", resume_id, e)
+                break
+        AUTO_VERIFY_RESUMES.inc(outcome=outcome)
+        self.tokens.done(sequence)
+
+
+_consumer: Optional[AutoVerificationConsumer] = None
+_consumer_lock = threading.Lock()
+
+def start_auto_verification() -> AutoVerificationConsumer:
+    """
+    Start the process-wide consumer on the parsed_resumes collection.
+
+    Returns:
+        The running AutoVerificationConsumer
+    """
+    global _consumer
+    with _consumer_lock:
+        if _consumer is None:
+            db = MockDatabase()
+            _consumer = AutoVerificationConsumer(
+                db.parsed_resumes,
+                db.resume_rover_db[AUTO_VERIFY_TOKEN_COLLECTION]
+            )
+            _consumer.start()
+        return _consumer
+
+def stop_auto_verification():
+    """Stop the process-wide consumer if it is running."""
+    global _consumer
+    with _consumer_lock:
+        if _consumer is not None:
+            _consumer.stop()
+            _consumer = None
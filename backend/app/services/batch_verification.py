@@ -0,0 +1,272 @@
+"""
+Vectorized batch verification of GPA and degree claims.
+
+OracleSimulator.verify_gpa / verify_degree look up and compare one claim at a
+time. For bulk re-verification of a cohort the claims are instead joined against
+the reference snapshot's ColumnStore in one pass (sorted key search over the
+name keys) and compared as NumPy arrays. Only the rare claims that need more
+than the first record of a person, or that hit records changed since the last
+snapshot load, fall back to per-claim Python.
+"""
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.record_store import ColumnStore, MISSING_CODE, float32_value, normalize
+from app.services.reference_snapshot import RecordSnapshot
+
+# Per-claim status codes
+STATUS_VERIFIED = 0
+STATUS_MISMATCH = 1
+STATUS_NOT_FOUND = 2
+STATUS_MISSING_FIELDS = 3
+
+SnapshotState = Tuple[ColumnStore, Set[int], Dict[str, Dict[bytes, Dict[str, Any]]]]
+
+# Matches the single-claim comparison in OracleSimulator.verify_gpa
+GPA_TOLERANCE = 0.01
+
+
+class BatchResult:
+    """
+    Result vectors of a batch verification.
+
+    Attributes:
+        verified: Boolean array, one entry per claim
+        status: STATUS_* code per claim
+        actual: Matched reference value per claim (None when not found)
+    """
+
+    def __init__(self, claims: Sequence[Dict[str, Any]], field: str, verified: np.ndarray, status: np.ndarray, actual: List[Any]):
+        self.claims = claims
+        self.field = field
+        self.verified = verified
+        self.status = status
+        self.actual = actual
+        self._details: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.verified)
+
+    @property
+    def details(self) -> List[str]:
+        """Detail message per claim, worded like the single-claim methods (built on first access)."""
+        if self._details is None:
+            self._details = [self._detail(index) for index in range(len(self))]
+        return self._details
+
+    def results(self) -> List[Tuple[bool, str]]:
+        """Get (verification_result, details) tuples like verify_gpa / verify_degree return."""
+        return list(zip(self.verified.tolist(), self.details))
+
+    def _detail(self, index: int) -> str:
+        claim = self.claims[index]
+        status = self.status[index]
+        name = claim.get("name")
+        university = claim.get("university")
+
+        if status == STATUS_MISSING_FIELDS:
+            return f"Missing required fields (name, university, {self.field})"
+        if status == STATUS_NOT_FOUND:
+            return f"No records found for {name} at {university}"
+
+        actual = self.actual[index]
+        if self.field == "gpa":
+            if status == STATUS_VERIFIED:
+                return f"Verified GPA of {actual} for {name} at {university}"
+            return f"GPA mismatch for {name} at {university}. Claimed: {claim.get('gpa')}, Actual: {actual}"
+        if status == STATUS_VERIFIED:
+            return f"Verified {actual} degree for {name} at {university}"
+        return f"Degree mismatch for {name} at {university}. Claimed: {claim.get('degree')}, Actual: {actual}"
+
+
+def join_claims(state: SnapshotState, names: Sequence[Any], universities: Sequence[Any]) -> Tuple[np.ndarray, Dict[int, Dict[str, Any]]]:
+    """
+    Find the reference record of each (name, university) claim.
+
+    Uses the same matching as ReferenceSnapshot.find_university_record: exact
+    normalized name, university as a case-insensitive substring, first match wins.
+
+    Args:
+        state: University snapshot view from RecordSnapshot.state()
+        names: Claimed full names
+        universities: Claimed (partial) university names
+
+    Returns:
+        Tuple of (matched store row per claim or -1, overlay records by claim index)
+    """
+    store, deleted, overlay = state
+    count = len(names)
+    rows = np.full(count, -1, dtype=np.int64)
+    overlay_matches: Dict[int, Dict[str, Any]] = {}
+    if count == 0:
+        return rows, overlay_matches
+
+    normalized = [normalize(name) for name in names]
+    keys = np.fromiter((hash(name) for name in normalized), dtype=np.int64, count=count)
+
+    # Distinct claimed universities against the distinct stored ones, as a lookup matrix
+    claimed_ids: Dict[str, int] = {}
+    claim_university = np.fromiter(
+        (claimed_ids.setdefault(normalize(university), len(claimed_ids)) for university in universities),
+        dtype=np.int64,
+        count=count
+    )
+    table = store.tables["university"]
+    stored = [normalize(value) for value in table.values]
+    # The extra last column stands for MISSING_CODE (index -1) and never matches
+    allowed = np.zeros((len(claimed_ids), len(stored) + 1), dtype=bool)
+    for claimed, claimed_id in claimed_ids.items():
+        allowed[claimed_id, :len(stored)] = [claimed in value for value in stored]
+
+    key_hashes = np.frombuffer(store.key_hashes, dtype=np.int64)
+    if len(key_hashes):
+        offsets = np.frombuffer(store.key_offsets, dtype=np.uint32).astype(np.int64)
+        university_codes = np.frombuffer(store.columns["university"], dtype=np.int32)
+        deleted_rows = np.zeros(len(store), dtype=bool)
+        if deleted:
+            deleted_rows[list(deleted)] = True
+
+        index = np.searchsorted(key_hashes, keys)
+        index = np.minimum(index, len(key_hashes) - 1)
+        found = np.nonzero(key_hashes[index] == keys)[0]
+        # A matching hash can still belong to another name
+        index[found] = [store.match_key(key_index, normalized[claim]) for claim, key_index in zip(found.tolist(), index[found].tolist())]
+        found = found[index[found] >= 0]
+        starts = offsets[index[found]]
+        ends = offsets[index[found] + 1]
+
+        # Most people have a single record: check the first row of every claim at once
+        first_match = allowed[claim_university[found], university_codes[starts]] & ~deleted_rows[starts]
+        rows[found[first_match]] = starts[first_match]
+
+        # Remaining rows of people with several records
+        pending = ~first_match & (ends - starts > 1)
+        for claim, start, end in zip(found[pending].tolist(), starts[pending].tolist(), ends[pending].tolist()):
+            for row in range(start + 1, end):
+                if not deleted_rows[row] and allowed[claim_university[claim], university_codes[row]]:
+                    rows[claim] = row
+                    break
+
+    if overlay:
+        for claim in np.nonzero(rows < 0)[0].tolist():
+            for record in overlay.get(normalized[claim], {}).values():
+                if normalize(universities[claim]) in normalize(record.get("university")):
+                    overlay_matches[claim] = record
+                    break
+
+    return rows, overlay_matches
+
+
+def _claim_columns(claims: Sequence[Dict[str, Any]], field: str) -> Tuple[List[Any], List[Any], List[Any], np.ndarray]:
+    names = [claim.get("name") for claim in claims]
+    universities = [claim.get("university") for claim in claims]
+    values = [claim.get(field) for claim in claims]
+    missing = np.fromiter(
+        (not (name and university and value) for name, university, value in zip(names, universities, values)),
+        dtype=bool,
+        count=len(claims)
+    )
+    return names, universities, values, missing
+
+
+def _status(missing: np.ndarray, found: np.ndarray, verified: np.ndarray) -> np.ndarray:
+    status = np.full(len(missing), STATUS_MISMATCH, dtype=np.int8)
+    status[verified] = STATUS_VERIFIED
+    status[~found] = STATUS_NOT_FOUND
+    status[missing] = STATUS_MISSING_FIELDS
+    return status
+
+
+def verify_gpa_batch(snapshot: RecordSnapshot, claims: Sequence[Dict[str, Any]]) -> BatchResult:
+    """
+    Verify many GPA claims against the university records snapshot.
+
+    Args:
+        snapshot: University records snapshot
+        claims: Dictionaries containing name, university, and gpa to verify
+
+    Returns:
+        BatchResult with one entry per claim
+    """
+    names, universities, values, missing = _claim_columns(claims, "gpa")
+
+    claimed = np.full(len(claims), np.nan)
+    for index, value in enumerate(values):
+        if not missing[index]:
+            try:
+                claimed[index] = float(value)
+            except (TypeError, ValueError):
+                pass
+
+    state = snapshot.state()
+    rows, overlay_matches = join_claims(state, names, universities)
+    store = state[0]
+    gpas = np.frombuffer(store.columns["gpa"], dtype=np.float32)
+
+    found = (rows >= 0) & ~missing
+    actual = np.full(len(claims), np.nan)
+    # Widen the float32 column to the stored decimal (3.73, not 3.7300000190...) so the
+    # tolerance boundary falls where the single-claim verify_gpa puts it
+    actual[rows >= 0] = np.array([float32_value(value) for value in gpas[rows[rows >= 0]].tolist()], dtype=float)
+    for index, record in overlay_matches.items():
+        found[index] = not missing[index]
+        try:
+            actual[index] = float(record.get("gpa"))
+        except (TypeError, ValueError):
+            pass
+
+    # NaN (unparseable or missing GPA) compares False
+    verified = found & (np.abs(claimed - actual) < GPA_TOLERANCE)
+    actual_values = [float32_value(value) if is_found else None for value, is_found in zip(actual.tolist(), found.tolist())]
+    return BatchResult(claims, "gpa", verified, _status(missing, found, verified), actual_values)
+
+
+def verify_degree_batch(snapshot: RecordSnapshot, claims: Sequence[Dict[str, Any]]) -> BatchResult:
+    """
+    Verify many degree claims against the university records snapshot.
+
+    Args:
+        snapshot: University records snapshot
+        claims: Dictionaries containing name, university, and degree to verify
+
+    Returns:
+        BatchResult with one entry per claim
+    """
+    names, universities, values, missing = _claim_columns(claims, "degree")
+
+    state = snapshot.state()
+    rows, overlay_matches = join_claims(state, names, universities)
+    store = state[0]
+    table = store.tables["degree"]
+    degree_codes = np.frombuffer(store.columns["degree"], dtype=np.int32)
+
+    # Compare case-insensitively through ids of the lowercased degree names
+    lowered_ids: Dict[str, int] = {}
+    stored_ids = np.array(
+        [lowered_ids.setdefault(str(value).lower(), len(lowered_ids)) for value in table.values] + [-1],
+        dtype=np.int64
+    )
+    claimed_ids = np.fromiter(
+        (lowered_ids.get(str(value).lower(), -2) if value else -2 for value in values),
+        dtype=np.int64,
+        count=len(claims)
+    )
+
+    found = (rows >= 0) & ~missing
+    actual_codes = np.full(len(claims), MISSING_CODE, dtype=np.int64)
+    actual_codes[rows >= 0] = degree_codes[rows[rows >= 0]]
+    verified = found & (stored_ids[actual_codes] == claimed_ids)
+
+    actual_values: List[Any] = [
+        table.values[code] if is_found and code != MISSING_CODE else None
+        for code, is_found in zip(actual_codes.tolist(), found.tolist())
+    ]
+    for index, record in overlay_matches.items():
+        if missing[index]:
+            continue
+        found[index] = True
+        actual_values[index] = record.get("degree")
+        verified[index] = actual_values[index] is not None and str(values[index]).lower() == str(actual_values[index]).lower()
+
+    return BatchResult(claims, "degree", verified, _status(missing, found, verified), actual_values)
@@ -2,20 +2,50 @@
 Blockchain integration utilities for interacting with the Verification smart contract.
 """
 import os
+import sys
 import json
-import web3
-from web3 import Web3
-from typing import Dict, Any, Optional, Tuple, List
+import logging
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, List
 from dotenv import load_dotenv
 from enum import IntEnum
 
+# Fix imports to work both as module and when run directly
+try:
+    from .admission import CHAIN_LIMITER
+    from .metrics import BLOCKCHAIN_METRICS
+    from .tracing import set_span_attributes
+    from ..abi import load_abi
+except ImportError:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from app.services.admission import CHAIN_LIMITER
+    from app.services.metrics import BLOCKCHAIN_METRICS
+    from app.services.tracing import set_span_attributes
+    from app.abi import load_abi
+
+if TYPE_CHECKING:
+    from app.services.signer import SignerPool
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Blockchain configuration
+# One node URL (http(s):// or ws(s)://), or several of the same chain separated by commas (load balanced)
 BLOCKCHAIN_PROVIDER = os.getenv("BLOCKCHAIN_PROVIDER", "http://localhost:7545")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "")
-ABI_PATH = os.getenv("ABI_PATH", "../blockchain/build/contracts/Verification.json")
+# ABI file or Truffle artifact (default: the ABI bundled in app/abi)
+ABI_PATH = os.getenv("ABI_PATH", "")
+# Connect to the chain while the app starts instead of on the first request
+BLOCKCHAIN_WARM_UP = os.getenv("BLOCKCHAIN_WARM_UP", "1").lower() not in ("0", "false", "no")
+
+# Providers whose connection was checked, so later clients skip is_connected()
+_connected = set()
+
+def is_dev_chain(provider_uri: str) -> bool:
+    """Development chains (Ganache/anvil ports) sign transactions with their unlocked accounts."""
+    from app.services.rpc_provider import parse_endpoints
+    return all(url.endswith(("7545", "8545")) for url in parse_endpoints(provider_uri))
 
 # Verification types enum (matching the contract)
 class VerificationType(IntEnum):
@@ -28,16 +58,33 @@ class VerificationType(IntEnum):
 class BlockchainClient:
     """Client for interacting with the Verification smart contract."""
     
-    def __init__(self):
-        """Initialize the blockchain client with web3 connection and contract."""
+    def __init__(self, provider_uri: Optional[str] = None, **provider_options):
+        """
+        Initialize the blockchain client with web3 connection and contract.
+        
+        Args:
+            provider_uri: Node URL(s), http(s):// or ws(s):// (default: BLOCKCHAIN_PROVIDER)
+            **provider_options: pool_size, timeout, connect_timeout and tcp_keepalive
+                (default: the RPC_* settings, see app.services.rpc_provider)
+        """
+        # web3 takes about a second to import; it is loaded with the first client (see warm_up)
+        from web3 import Web3
+        from app.services.contract_calls import ContractCaller
+        from app.services.rpc_provider import get_provider
+        
+        provider_uri = provider_uri or BLOCKCHAIN_PROVIDER
+        self.dev_chain = is_dev_chain(provider_uri)
         try:
-            # Connect to blockchain
-            self.w3 = Web3(Web3.HTTPProvider(BLOCKCHAIN_PROVIDER))
+            # Connect to blockchain (the provider and its connections are shared by all clients)
+            self.w3 = Web3(get_provider(provider_uri, **provider_options))
             
-            if not self.w3.is_connected():
-                raise ConnectionError(f"Failed to connect to blockchain provider at {BLOCKCHAIN_PROVIDER}")
-            
-            print(f"Connected to blockchain: {BLOCKCHAIN_PROVIDER}")
+            if provider_uri not in _connected:
+                with BLOCKCHAIN_METRICS.track("is_connected"):
+                    connected = self.w3.is_connected()
+                if not connected:
+                    raise ConnectionError(f"Failed to connect to blockchain provider at {provider_uri}")
+                _connected.add(provider_uri)
+                logger.info("Connected to blockchain: %s", provider_uri)
             
             # Get contract address from environment or file
             self.contract_address = CONTRACT_ADDRESS
@@ -48,17 +95,15 @@ class BlockchainClient:
                         address_data = json.load(f)
                         self.contract_address = address_data["address"]
                 except Exception as e:
-                    print(f"Error loading contract address: {e}")
+                    logger.error("Error loading contract address: %s", e)
                     raise ValueError("Contract address not found. Please set CONTRACT_ADDRESS environment variable or ensure deployed_contract_address.json exists.")
             
-            # Load contract ABI
+            # Load contract ABI (read once per process)
             try:
-                with open(ABI_PATH, "r") as f:
-                    contract_json = json.load(f)
-                    self.contract_abi = contract_json["abi"]
+                self.contract_abi = load_abi(ABI_PATH or None)
             except Exception as e:
-                print(f"Error loading contract ABI: {e}")
-                raise ValueError(f"Failed to load contract ABI from {ABI_PATH}")
+                logger.error("Error loading contract ABI: %s", e)
+                raise ValueError(f"Failed to load contract ABI from {ABI_PATH or 'app/abi'}")
             
             # Initialize contract
             self.contract = self.w3.eth.contract(
@@ -66,15 +111,26 @@ class BlockchainClient:
                 abi=self.contract_abi
             )
             
-            print(f"Contract loaded at address: {self.contract_address}")
+            # Hot read-only functions skip web3's contract function machinery
+            self.calls = ContractCaller(self.w3.provider, self.contract.address, self.contract_abi)
             
-            # Use the first account by default
-            self.default_account = self.w3.eth.accounts[0]
+            logger.debug("Contract loaded at address: %s", self.contract_address)
             
         except Exception as e:
-            print(f"Error initializing blockchain client: {e}")
+            logger.error("Error initializing blockchain client: %s", e)
             raise
     
+    @property
+    def signers(self) -> "SignerPool":
+        """Oracle accounts writes are sent from (loaded and authorized on the first write)."""
+        from app.services.signer import get_signer_pool
+        return get_signer_pool(self.w3, self.contract, self.dev_chain)
+    
+    @property
+    def default_account(self) -> str:
+        """The first oracle account."""
+        return self.signers.default.address
+    
     def create_data_hash(self, data: Dict[str, Any]) -> str:
         """
         Create a keccak256 hash from the data dictionary.
@@ -91,6 +147,7 @@ class BlockchainClient:
         data_hash = self.w3.keccak(text=data_string).hex()
         return data_hash
     
+    @BLOCKCHAIN_METRICS.instrument("requestVerification")
     def request_verification(self, data_hash: str, verification_type: VerificationType, account: Optional[str] = None) -> str:
         """
         Request verification for data.
@@ -98,34 +155,26 @@ class BlockchainClient:
         Args:
             data_hash: Hash of the data to verify
             verification_type: Type of verification to perform
-            account: Account to send transaction from (default: first account)
+            account: Account to send transaction from (default: the next oracle account, round-robin)
             
         Returns:
             Transaction hash
         """
-        if not account:
-            account = self.default_account
+        # The first write may wait for oracle authorization; not while holding a chain slot
+        signers = self.signers
+        sender = signers.sender(account)
+        set_span_attributes(data_hash=data_hash, account=sender.address)
         
         # Convert the hex string to bytes32 format
-        bytes32_hash = Web3.to_bytes(hexstr=data_hash)
-        
-        # Build transaction
-        tx = self.contract.functions.requestVerification(
-            bytes32_hash,
-            int(verification_type)
-        ).build_transaction({
-            'from': account,
-            'gas': 200000,
-            'gasPrice': self.w3.to_wei('20', 'gwei'),
-            'nonce': self.w3.eth.get_transaction_count(account)
-        })
+        bytes32_hash = self.w3.to_bytes(hexstr=data_hash)
         
-        # Sign and send transaction
-        signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=os.getenv("PRIVATE_KEY"))
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        function_call = self.contract.functions.requestVerification(bytes32_hash, int(verification_type))
+        with CHAIN_LIMITER.slot():
+            tx_hash = signers.transact(self.w3, function_call, ("requestVerification", int(verification_type)), sender)
         
         return tx_hash.hex()
     
+    @BLOCKCHAIN_METRICS.instrument("storeVerificationResult")
     def store_verification_result(
         self, 
         data_hash: str, 
@@ -142,52 +191,34 @@ class BlockchainClient:
             is_verified: Verification result
             verification_type: Type of verification performed
             details: Additional details about verification
-            account: Account to send transaction from (default: first account)
+            account: Account to send transaction from (default: the next oracle account, round-robin)
             
         Returns:
             Transaction hash
         """
-        if not account:
-            account = self.default_account
+        # The first write may wait for oracle authorization; not while holding a chain slot
+        signers = self.signers
+        sender = signers.sender(account)
+        set_span_attributes(data_hash=data_hash, account=sender.address)
         
         # Convert the hex string to bytes32 format
-        bytes32_hash = Web3.to_bytes(hexstr=data_hash)
-            
-        # If using development environment, we can use accounts directly
-        if BLOCKCHAIN_PROVIDER.endswith("7545") or BLOCKCHAIN_PROVIDER.endswith("8545"):
-            # Build transaction
-            tx_hash = self.contract.functions.storeVerificationResult(
-                bytes32_hash,
-                is_verified,
-                int(verification_type),
-                details
-            ).transact({'from': account, 'gas': 1000000})
+        bytes32_hash = self.w3.to_bytes(hexstr=data_hash)
             
-            return tx_hash.hex()
-        else:
-            # For production, use private key
-            if not os.getenv("PRIVATE_KEY"):
-                raise ValueError("PRIVATE_KEY environment variable required for non-development environments")
-                
-            # Build transaction
-            tx = self.contract.functions.storeVerificationResult(
-                bytes32_hash,
-                is_verified,
-                int(verification_type),
-                details
-            ).build_transaction({
-                'from': account,
-                'gas': 1000000,
-                'gasPrice': self.w3.to_wei('20', 'gwei'),
-                'nonce': self.w3.eth.get_transaction_count(account)
-            })
-            
-            # Sign and send transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=os.getenv("PRIVATE_KEY"))
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            return tx_hash.hex()
+        function_call = self.contract.functions.storeVerificationResult(
+            bytes32_hash,
+            is_verified,
+            int(verification_type),
+            details
+        )
+        # Not cached: the gas depends on contract state (the scan of verificationHashes
+        # grows with every record, and a first write costs more than a re-store)
+        with CHAIN_LIMITER.slot():
+            tx_hash = signers.transact(self.w3, function_call, None, sender)
+        
+        return tx_hash.hex()
     
+    @BLOCKCHAIN_METRICS.instrument("verificationExists")
+    @CHAIN_LIMITER.guard
     def verification_exists(self, data_hash: str) -> bool:
         """
         Check if verification exists for given data hash.
@@ -198,10 +229,14 @@ class BlockchainClient:
         Returns:
             True if verification exists, False otherwise
         """
+        set_span_attributes(data_hash=data_hash)
+        
         # Convert the hex string to bytes32 format
-        bytes32_hash = Web3.to_bytes(hexstr=data_hash)
-        return self.contract.functions.verificationExists(bytes32_hash).call()
+        bytes32_hash = self.w3.to_bytes(hexstr=data_hash)
+        return self.calls.call("verificationExists", bytes32_hash)[0]
     
+    @BLOCKCHAIN_METRICS.instrument("getVerificationStatus")
+    @CHAIN_LIMITER.guard
     def get_verification_status(self, data_hash: str) -> Dict[str, Any]:
         """
         Get verification status for a data hash.
@@ -211,13 +246,20 @@ class BlockchainClient:
             
         Returns:
             Dictionary with verification details or None if not found
+
+        Raises:
+            Web3RPCError: The node failed the call
         """
+        from web3.exceptions import ContractLogicError
+
+        set_span_attributes(data_hash=data_hash)
+        
         try:
             # Convert the hex string to bytes32 format
-            bytes32_hash = Web3.to_bytes(hexstr=data_hash)
+            bytes32_hash = self.w3.to_bytes(hexstr=data_hash)
             
             # Call contract function
-            result = self.contract.functions.getVerificationStatus(bytes32_hash).call()
+            result = self.calls.call("getVerificationStatus", bytes32_hash)
             
             # Contract returns: isVerified, verificationType, timestamp, oracleAddress, details
             verification_data = {
@@ -229,11 +271,13 @@ class BlockchainClient:
             }
             
             return verification_data
-        except Exception as e:
+        except ContractLogicError as e:
             # If verification doesn't exist, contract will revert
-            print(f"Error getting verification status: {e}")
+            logger.warning("Error getting verification status: %s", e)
             return None
     
+    @BLOCKCHAIN_METRICS.instrument("getVerificationCount")
+    @CHAIN_LIMITER.guard
     def get_verification_count(self) -> int:
         """
         Get total number of verifications stored in contract.
@@ -249,17 +293,23 @@ class BlockchainClient:
         
         Returns:
             List of verification records
+
+        Raises:
+            Web3RPCError: The node failed a call
         """
+        from web3.exceptions import ContractLogicError
+
         verification_count = self.get_verification_count()
         
         verifications = []
         for i in range(verification_count):
             try:
                 # Get hash at index
-                data_hash_bytes = self.contract.functions.getVerificationHashAtIndex(i).call()
+                with BLOCKCHAIN_METRICS.track("getVerificationHashAtIndex"), CHAIN_LIMITER.slot():
+                    data_hash_bytes, = self.calls.call("getVerificationHashAtIndex", i)
 
                 # Convert the bytes32 value to a hex string
-                data_hash = Web3.to_hex(data_hash_bytes)[2:]  # Remove the '0x' prefix
+                data_hash = self.w3.to_hex(data_hash_bytes)[2:]  # Remove the '0x' prefix
                 
                 # Get verification data for that hash
                 verification_data = self.get_verification_status(data_hash)
@@ -268,14 +318,36 @@ class BlockchainClient:
                     # Add hash to the data
                     verification_data["data_hash"] = data_hash
                     verifications.append(verification_data)
-            except Exception as e:
-                print(f"Error fetching verification at index {i}: {e}")
+            except ContractLogicError as e:
+                # Node and limiter errors propagate: a partial list would look complete
+                logger.warning("Error fetching verification at index %s: %s", i, e)
                 continue
                 
         return verifications
 
+def warm_up():
+    """
+    Import web3, connect to the chain, load the contract and the oracle accounts
+    ahead of the first request. Failures are left for the first request to retry.
+    """
+    try:
+        BlockchainClient().signers
+        logger.info("Blockchain client warmed up")
+    except Exception as e:
+        logger.warning("Blockchain warm-up failed: %s", e)
+
+def close_blockchain():
+    """Stop replacing stuck transactions and close the shared RPC providers, if they were loaded."""
+    fees = sys.modules.get("app.services.fees")
+    if fees is not None:
+        fees.transaction_monitor.stop()
+    rpc_provider = sys.modules.get("app.services.rpc_provider")
+    if rpc_provider is not None:
+        rpc_provider.close_providers()
+
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     client = BlockchainClient()
     
     # Example: Create data hash
@@ -0,0 +1,123 @@
+"""
+Precompiled eth_call layer for the hot read-only contract functions.
+
+contract.functions.X(...).call() looks the function up by name, matches the
+arguments against the ABI, normalizes them and sends the request through the
+web3 middleware stack. For the few functions called on every request
+(HOT_FUNCTIONS), the 4 byte selector and the eth_abi tuple encoder and decoder
+are built once, and the encoded call goes straight to the provider as a raw
+eth_call. Results have the types web3 returns (addresses checksummed).
+"""
+import functools
+from typing import Dict, Any, List, Tuple
+
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
+from eth_utils import keccak, to_checksum_address
+from web3.exceptions import BadFunctionCallOutput, ContractLogicError, Web3RPCError
+
+HOT_FUNCTIONS = ("verificationExists", "getVerificationStatus", "getVerificationHashAtIndex")
+
+# JSON-RPC error code of a reverted eth_call (EIP-1474)
+REVERT_CODE = 3
+# Error(string) and Panic(uint256) revert data
+REVERT_SELECTORS = ("0x08c379a0", "0x4e487b71")
+
+# Results only name a few oracle addresses; checksumming one costs a keccak
+checksum_address = functools.lru_cache(maxsize=1024)(to_checksum_address)
+
+
+class CompiledFunction:
+    """Selector, encoder and decoder of one contract function."""
+
+    def __init__(self, name: str, input_types: Tuple[str, ...], output_types: Tuple[str, ...]):
+        self.name = name
+        self.selector = keccak(text=f"{name}({','.join(input_types)})")[:4]
+        # Tuple coders from the public registry API ("()" is not a valid type, so no arguments encode to nothing)
+        self._encoder = registry.get_encoder(f"({','.join(input_types)})") if input_types else lambda args: b""
+        self._decoder = registry.get_decoder(f"({','.join(output_types)})")
+        # Positions of address outputs, checksummed like web3 does
+        self._addresses = [i for i, output_type in enumerate(output_types) if output_type == "address"]
+
+    def encode(self, args: Tuple[Any, ...]) -> str:
+        """Get the call data of a call."""
+        return "0x" + (self.selector + self._encoder(args)).hex()
+
+    def decode(self, result: str) -> Tuple[Any, ...]:
+        """Decode the hex return data of a call."""
+        data = bytes.fromhex(result[2:] if result.startswith("0x") else result)
+        if not data:
+            raise BadFunctionCallOutput(f"Empty return data from {self.name}, is the contract deployed at this address?")
+        values = self._decoder(ContextFramesBytesIO(data))
+        if self._addresses:
+            values = tuple(checksum_address(value) if i in self._addresses else value for i, value in enumerate(values))
+        return values
+
+@functools.lru_cache(maxsize=None)
+def compile_function(name: str, input_types: Tuple[str, ...], output_types: Tuple[str, ...]) -> CompiledFunction:
+    """Compile a function once per signature (shared by all clients)."""
+    return CompiledFunction(name, input_types, output_types)
+
+def _types(params: List[Dict[str, Any]]) -> Tuple[str, ...]:
+    # The contract's functions only take and return elementary types
+    return tuple(param["type"] for param in params)
+
+
+class ContractCaller:
+    """Raw eth_call of the hot functions of one contract."""
+
+    def __init__(self, provider, address: str, abi: List[Dict[str, Any]], names: Tuple[str, ...] = HOT_FUNCTIONS):
+        """
+        Args:
+            provider: Web3 provider (its make_request is called directly)
+            address: Contract address
+            abi: Contract ABI
+            names: Functions to compile
+        """
+        self.provider = provider
+        self.address = address
+        self.functions = {
+            entry["name"]: compile_function(entry["name"], _types(entry["inputs"]), _types(entry["outputs"]))
+            for entry in abi
+            if entry.get("type") == "function" and entry.get("name") in names
+        }
+
+    def call(self, name: str, *args: Any, block: str = "latest") -> Tuple[Any, ...]:
+        """
+        Call a compiled function.
+
+        Args:
+            name: Function name
+            *args: Arguments, in ABI order
+            block: Block to call at
+
+        Returns:
+            Tuple of the return values
+
+        Raises:
+            ContractLogicError: The call reverted
+            Web3RPCError: The node failed the request (rate limit, unknown block, timeout...)
+        """
+        function = self.functions[name]
+        response = self.provider.make_request("eth_call", [{"to": self.address, "data": function.encode(args)}, block])
+        error = response.get("error")
+        if error:
+            # Nodes normally send an error object, but some send a bare message
+            if isinstance(error, dict):
+                message, data = error.get("message", str(error)), error.get("data")
+            else:
+                message, data = str(error), None
+            if is_revert(error, message, data):
+                raise ContractLogicError(message, data=data)
+            raise Web3RPCError(message, rpc_response=response)
+        return function.decode(response["result"])
+
+
+def is_revert(error: Any, message: str, data: Any) -> bool:
+    """Tell a reverted call from a node or transport error."""
+    if isinstance(error, dict) and error.get("code") == REVERT_CODE:
+        return True
+    if isinstance(data, str) and data.startswith(REVERT_SELECTORS):
+        return True
+    # "execution reverted: ..." (geth and most nodes), "VM Exception while processing transaction: revert ..." (Ganache)
+    return "revert" in message.lower()
@@ -0,0 +1,314 @@
+"""
+Gas limits, fees and replacement of stuck transactions for contract writes.
+
+- Gas limits are estimated with eth_estimateGas, with a GAS_LIMIT_MARGIN
+  safety margin. Calls whose cost only depends on their arguments are cached
+  once per call shape (function and the arguments that change its cost) for
+  GAS_ESTIMATE_TTL seconds; calls whose cost depends on contract state are
+  estimated every time.
+- Fees follow EIP-1559: maxPriorityFeePerGas is the FEE_PRIORITY_PERCENTILE
+  tip of the last FEE_HISTORY_BLOCKS blocks (eth_feeHistory) and maxFeePerGas
+  leaves room for FEE_BASE_MULTIPLIER times the next base fee. Chains without
+  a base fee get a legacy gasPrice. Fees are capped at FEE_MAX_GWEI.
+- Sent transactions are tracked by TransactionMonitor. One that is still
+  pending after TX_STUCK_SECONDS is sent again with the same nonce and fees
+  raised by at least 12.5% (the minimum bump nodes accept for a replacement),
+  up to TX_MAX_REPLACEMENTS times. A transaction given up unmined (too many
+  replacements, or fees over the cap) is handed back to its sender, which
+  fills its nonce (see signer.Sender.fill_gap) so later transactions of the
+  account do not wait behind it forever.
+  Mined transactions that reverted are logged and counted.
+"""
+import os
+import logging
+import math
+import statistics
+import threading
+import time
+from typing import Dict, Any, Callable, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from app.services.metrics import CHAIN_TX_PENDING, CHAIN_TX_REPLACEMENTS, CHAIN_TX_REVERTS
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+GAS_LIMIT_MARGIN = float(os.getenv("GAS_LIMIT_MARGIN", "1.2"))
+GAS_ESTIMATE_TTL = float(os.getenv("GAS_ESTIMATE_TTL", "600"))
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "20"))
+FEE_PRIORITY_PERCENTILE = float(os.getenv("FEE_PRIORITY_PERCENTILE", "50"))
+FEE_BASE_MULTIPLIER = float(os.getenv("FEE_BASE_MULTIPLIER", "2"))
+FEE_MIN_PRIORITY_GWEI = float(os.getenv("FEE_MIN_PRIORITY_GWEI", "0.01"))
+FEE_MAX_GWEI = float(os.getenv("FEE_MAX_GWEI", "500"))
+# Seconds fees are reused before eth_feeHistory is asked again (about one block)
+FEE_CACHE_SECONDS = float(os.getenv("FEE_CACHE_SECONDS", "3"))
+TX_STUCK_SECONDS = float(os.getenv("TX_STUCK_SECONDS", "60"))
+TX_CHECK_INTERVAL = float(os.getenv("TX_CHECK_INTERVAL", "15"))
+TX_MAX_REPLACEMENTS = int(os.getenv("TX_MAX_REPLACEMENTS", "5"))
+
+# Minimum fee increase for a node to accept a replacement (geth requires 10%)
+REPLACEMENT_BUMP = 1.125
+FEE_FIELDS = ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice")
+
+def _gwei(value: float) -> int:
+    return int(value * 10**9)
+
+
+class FeePolicy:
+    """Cached gas estimates per call shape and fee fields from the recent fee history."""
+
+    def __init__(
+        self,
+        margin: float = GAS_LIMIT_MARGIN,
+        estimate_ttl: float = GAS_ESTIMATE_TTL,
+        history_blocks: int = FEE_HISTORY_BLOCKS,
+        priority_percentile: float = FEE_PRIORITY_PERCENTILE,
+        base_multiplier: float = FEE_BASE_MULTIPLIER,
+        min_priority_fee: int = _gwei(FEE_MIN_PRIORITY_GWEI),
+        max_fee: int = _gwei(FEE_MAX_GWEI),
+        fee_cache_seconds: float = FEE_CACHE_SECONDS
+    ):
+        self.margin = margin
+        self.estimate_ttl = estimate_ttl
+        self.history_blocks = history_blocks
+        self.priority_percentile = priority_percentile
+        self.base_multiplier = base_multiplier
+        self.min_priority_fee = min_priority_fee
+        self.max_fee = max_fee
+        self.fee_cache_seconds = fee_cache_seconds
+        self._lock = threading.Lock()
+        self._gas: Dict[Hashable, Tuple[int, float]] = {}
+        self._fees: Optional[Tuple[Dict[str, int], float]] = None
+
+    def gas_limit(self, shape: Optional[Hashable], estimate: Callable[[], int]) -> int:
+        """
+        Get the gas limit for a call shape, estimating it on the first call.
+
+        Args:
+            shape: Key of the call shape, e.g. ("requestVerification", 2), or None
+                to estimate every call (the cost depends on contract state)
+            estimate: Returns the eth_estimateGas result for this call
+
+        Returns:
+            Estimated gas plus the safety margin
+        """
+        if shape is None:
+            return math.ceil(estimate() * self.margin)
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._gas.get(shape)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        gas = math.ceil(estimate() * self.margin)
+        with self._lock:
+            self._gas[shape] = (gas, now + self.estimate_ttl)
+        return gas
+
+    def fee_fields(self, w3: Web3) -> Dict[str, int]:
+        """
+        Get the fee fields for a new transaction.
+
+        Args:
+            w3: Web3 connected to the chain
+
+        Returns:
+            {"maxFeePerGas", "maxPriorityFeePerGas"}, or {"gasPrice"} on chains without EIP-1559
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._fees
+        if cached is not None and cached[1] > now:
+            return dict(cached[0])
+
+        fields = self._current_fees(w3)
+        with self._lock:
+            self._fees = (fields, now + self.fee_cache_seconds)
+        return dict(fields)
+
+    def _current_fees(self, w3: Web3) -> Dict[str, int]:
+        try:
+            history = w3.eth.fee_history(self.history_blocks, "latest", [self.priority_percentile])
+            base_fees = history.get("baseFeePerGas") or []
+        except Exception as e:
+            logger.warning("eth_feeHistory failed, using a legacy gas price: %s", e)
+            base_fees = []
+        if not any(base_fees):
+            return {"gasPrice": min(w3.eth.gas_price, self.max_fee)}
+
+        tips = [reward[0] for reward in history.get("reward") or [] if reward]
+        priority_fee = max(int(statistics.median(tips)) if tips else 0, self.min_priority_fee)
+        # The last entry is the base fee of the next block
+        max_fee = int(base_fees[-1] * self.base_multiplier) + priority_fee
+        if max_fee > self.max_fee:
+            logger.warning("Fees capped at %d wei (wanted %d)", self.max_fee, max_fee)
+            max_fee = self.max_fee
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": min(priority_fee, max_fee)}
+
+    def bumped(self, w3: Web3, tx: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """
+        Get the fee fields of a replacement: at least REPLACEMENT_BUMP over the
+        old ones, and not below the current fees.
+
+        Returns:
+            Fee fields, or None if the replacement would exceed the fee cap
+        """
+        current = self.fee_fields(w3)
+        fields = {}
+        for name in FEE_FIELDS:
+            if name in tx:
+                fields[name] = max(math.ceil(tx[name] * REPLACEMENT_BUMP), current.get(name, 0))
+        if max(fields.get("maxFeePerGas", 0), fields.get("gasPrice", 0)) > self.max_fee:
+            return None
+        return fields
+
+
+class _Pending:
+    __slots__ = ("w3", "tx", "send", "abandoned", "hashes", "sent_at", "replacements")
+
+    def __init__(
+        self,
+        w3: Web3,
+        tx: Dict[str, Any],
+        send: Callable[[Dict[str, Any]], Any],
+        tx_hash: Any,
+        abandoned: Optional[Callable[[Dict[str, Any]], None]]
+    ):
+        self.w3 = w3
+        self.tx = tx
+        self.send = send
+        self.abandoned = abandoned
+        self.hashes = [tx_hash]
+        self.sent_at = time.monotonic()
+        self.replacements = 0
+
+
+class TransactionMonitor:
+    """Watches sent transactions and replaces the ones that stay pending too long."""
+
+    def __init__(
+        self,
+        policy: FeePolicy,
+        stuck_seconds: float = TX_STUCK_SECONDS,
+        check_interval: float = TX_CHECK_INTERVAL,
+        max_replacements: int = TX_MAX_REPLACEMENTS
+    ):
+        self.policy = policy
+        self.stuck_seconds = stuck_seconds
+        self.check_interval = check_interval
+        self.max_replacements = max_replacements
+        self._lock = threading.Lock()
+        # (sender, nonce) -> pending transaction
+        self._pending: Dict[Tuple[str, int], _Pending] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(
+        self,
+        w3: Web3,
+        tx: Dict[str, Any],
+        send: Callable[[Dict[str, Any]], Any],
+        tx_hash: Any,
+        abandoned: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Watch a sent transaction.
+
+        Args:
+            w3: Web3 connected to the chain
+            tx: The transaction as sent (with from, nonce, gas and fee fields)
+            send: Sends a transaction dict and returns its hash (signs it if needed)
+            tx_hash: Hash of the sent transaction
+            abandoned: Called with the last sent version if the transaction is given up before it is mined
+        """
+        with self._lock:
+            self._pending[(tx["from"], tx["nonce"])] = _Pending(w3, dict(tx), send, tx_hash, abandoned)
+            CHAIN_TX_PENDING.set(len(self._pending))
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="tx-monitor", daemon=True)
+                self._thread.start()
+
+    def pending(self) -> List[Any]:
+        """Get the latest hash of every watched transaction."""
+        with self._lock:
+            return [pending.hashes[-1] for pending in self._pending.values()]
+
+    def stop(self):
+        """Stop watching (watched transactions are left as they are)."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def check(self):
+        """Forget mined transactions and replace the stuck ones."""
+        with self._lock:
+            watched = list(self._pending.items())
+        for key, pending in watched:
+            try:
+                if self._settled(pending):
+                    self._forget(key)
+                elif time.monotonic() - pending.sent_at >= self.stuck_seconds:
+                    self._replace(key, pending)
+            except Exception as e:
+                logger.error("Error checking transaction %s: %s", pending.hashes[-1], e)
+
+    def _settled(self, pending: _Pending) -> bool:
+        """True once any version of the transaction, or another one with its nonce, is mined."""
+        for tx_hash in pending.hashes:
+            try:
+                receipt = pending.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt["status"] == 0:
+                CHAIN_TX_REVERTS.inc()
+                logger.error("Transaction %s (nonce %s) reverted", tx_hash, pending.tx["nonce"])
+            return True
+        return pending.w3.eth.get_transaction_count(pending.tx["from"], "latest") > pending.tx["nonce"]
+
+    def _replace(self, key: Tuple[str, int], pending: _Pending):
+        if pending.replacements >= self.max_replacements:
+            logger.error("Transaction %s is still pending after %d replacements", pending.hashes[-1], pending.replacements)
+            self._abandon(key, pending)
+            return
+        fees = self.policy.bumped(pending.w3, pending.tx)
+        if fees is None:
+            logger.error("Transaction %s is stuck but its replacement would exceed the fee cap", pending.hashes[-1])
+            self._abandon(key, pending)
+            return
+
+        tx = {**pending.tx, **fees}
+        tx_hash = pending.send(tx)
+        pending.tx = tx
+        pending.hashes.append(tx_hash)
+        pending.sent_at = time.monotonic()
+        pending.replacements += 1
+        CHAIN_TX_REPLACEMENTS.inc()
+        logger.warning("Replaced stuck transaction %s (nonce %s) with %s", pending.hashes[-2], tx["nonce"], tx_hash)
+
+    def _abandon(self, key: Tuple[str, int], pending: _Pending):
+        """Stop watching an unmined transaction and hand it back to its sender."""
+        self._forget(key)
+        if pending.abandoned is not None:
+            pending.abandoned(dict(pending.tx))
+
+    def _forget(self, key: Tuple[str, int]):
+        with self._lock:
+            self._pending.pop(key, None)
+            CHAIN_TX_PENDING.set(len(self._pending))
+
+
+fee_policy = FeePolicy()
+transaction_monitor = TransactionMonitor(fee_policy)
@@ -0,0 +1,283 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Counters, gauges and histograms are kept in memory and rendered on demand by
+the /metrics route, so no exporter or other service is needed. Each stage of a
+request has its own latency histogram, call counter (by outcome) and in-flight
+gauge:
+
+    http_request_*      routes (MetricsMiddleware)
+    blockchain_call_*   BlockchainClient calls, per contract function
+    mongo_query_*       MockDatabase queries, per method
+    oracle_verify_*     OracleSimulator verifications and the simulated oracle delay
+
+plus response serialization time and the MongoDB connection pool metrics.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.services.mongo import pool_metrics
+from app.services.tracing import tracer
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow chain writes
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class for a metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+    def collect(self) -> List[str]:
+        """Get the exposition lines of this family."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield f"{self.name}_bucket{self._labels(key, [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class Registry:
+    """Set of metric families plus collectors that produce lines at render time."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class StageMetrics:
+    """
+    Latency histogram, call counter and in-flight gauge for one stage, labelled by operation.
+
+    Every tracked call also runs in a tracing span named "<span_prefix>.<operation>".
+    """
+
+    def __init__(self, prefix: str, description: str, label: str, registry: Registry = REGISTRY, span_prefix: Optional[str] = None, span_attribute: Optional[str] = None):
+        self.label = label
+        self.span_prefix = span_prefix or prefix
+        self.span_attribute = span_attribute or label
+        self.duration = registry.register(Histogram(f"{prefix}_duration_seconds", f"{description} latency in seconds", (label,)))
+        self.calls = registry.register(Counter(f"{prefix}_total", f"{description} calls by outcome", (label, "outcome")))
+        self.in_flight = registry.register(Gauge(f"{prefix}_in_flight", f"{description} calls in progress", (label,)))
+
+    @contextmanager
+    def track(self, name: str):
+        """Measure the enclosed block as one call of the named operation."""
+        labels = {self.label: name}
+        self.in_flight.inc(**labels)
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            with tracer.start_span(f"{self.span_prefix}.{name}", **{self.span_attribute: name}):
+                yield
+            outcome = "ok"
+        finally:
+            self.duration.observe(time.perf_counter() - started, **labels)
+            self.calls.inc(outcome=outcome, **labels)
+            self.in_flight.dec(**labels)
+
+    def instrument(self, name: str) -> Callable:
+        """Decorator measuring every call of a function as the named operation."""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.track(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+BLOCKCHAIN_METRICS = StageMetrics("blockchain_call", "Contract function", "function", span_prefix="chain", span_attribute="contract.function")
+MONGO_METRICS = StageMetrics("mongo_query", "MockDatabase query", "method", span_prefix="db", span_attribute="db.operation")
+ORACLE_METRICS = StageMetrics("oracle_verify", "Oracle verification", "method", span_prefix="oracle", span_attribute="oracle.method")
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Route latency in seconds, until the last body chunk is sent", ("method", "route", "status")
+))
+HTTP_REQUESTS = REGISTRY.register(Counter("http_requests_total", "Requests by route and status", ("method", "route", "status")))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "Requests in progress", ("method",)))
+RESPONSE_SERIALIZATION = REGISTRY.register(Histogram(
+    "response_serialization_seconds", "Time spent encoding JSON response bodies",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+))
+AUTO_VERIFY_RESUMES = REGISTRY.register(Counter(
+    "auto_verify_resumes_total", "Resumes processed by the change stream consumer by outcome", ("outcome",)
+))
+AUTO_VERIFY_QUEUE_DEPTH = REGISTRY.register(Gauge("auto_verify_queue_depth", "Resumes waiting for an auto-verification worker"))
+SCHEDULER_QUEUE_DEPTH = REGISTRY.register(Gauge("scheduler_queue_depth", "Verification jobs waiting for a worker", ("priority",)))
+SCHEDULER_WAIT = REGISTRY.register(Histogram(
+    "scheduler_wait_seconds", "Time verification jobs waited for a worker", ("priority",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+))
+SCHEDULER_RUNNING = REGISTRY.register(Gauge("scheduler_running", "Verification jobs running", ("priority",)))
+SCHEDULER_JOBS = REGISTRY.register(Counter("scheduler_jobs_total", "Verification jobs by outcome", ("priority", "outcome")))
+ADMISSION_LIMIT = REGISTRY.register(Gauge("admission_limit", "Adaptive concurrency limit per backend", ("backend",)))
+ADMISSION_QUEUED = REGISTRY.register(Gauge("admission_queued", "Backend calls waiting for a slot", ("backend",)))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "admission_wait_seconds", "Time backend calls waited for a slot", ("backend",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+))
+ADMISSION_REJECTED = REGISTRY.register(Counter("admission_rejected_total", "Backend calls rejected by reason", ("backend", "reason")))
+RPC_ENDPOINT_HEALTHY = REGISTRY.register(Gauge("rpc_endpoint_healthy", "1 if the RPC endpoint takes requests, 0 if ejected", ("endpoint",)))
+RPC_REQUESTS = REGISTRY.register(Counter("rpc_requests_total", "JSON-RPC requests per endpoint by outcome", ("endpoint", "outcome")))
+RPC_HEDGES = REGISTRY.register(Counter("rpc_hedges_total", "Hedged reads by the request that answered first", ("winner",)))
+CHAIN_TX_PENDING = REGISTRY.register(Gauge("chain_tx_pending", "Sent contract transactions not yet mined"))
+CHAIN_TX_REPLACEMENTS = REGISTRY.register(Counter("chain_tx_replacements_total", "Stuck transactions sent again with higher fees"))
+CHAIN_TX_REVERTS = REGISTRY.register(Counter("chain_tx_reverts_total", "Contract transactions mined with a failed status"))
+
+def _pool_lines() -> Iterator[str]:
+    """Connection pool metrics collected by app.services.mongo.pool_metrics."""
+    stats = pool_metrics.snapshot()
+    names = sorted({name for values in stats.values() for name in values})
+    for name in names:
+        metric = f"mongo_pool_{name}"
+        yield f"# HELP {metric} MongoDB connection pool {name.replace('_', ' ')}"
+        yield f"# TYPE {metric} gauge"
+        for address, values in sorted(stats.items()):
+            if name in values:
+                yield f'{metric}{{address="{_escape(address)}"}} {_format_value(values[name])}'
+
+REGISTRY.add_collector(_pool_lines)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, count and in-flight requests per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The matched route template keeps the label set bounded (not the raw path)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            labels = {"method": method, "route": route, "status": str(status)}
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, **labels)
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
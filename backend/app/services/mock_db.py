@@ -1,74 +1,135 @@
-import json
 import os
-from typing import Dict, List, Any, Optional
+import re
+from typing import Dict, List, Any, Optional, Iterable
 import logging
-from pymongo import MongoClient
+from pymongo import ReturnDocument, ASCENDING, IndexModel
+from pymongo.cursor import Cursor
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from dotenv import load_dotenv
 
+from app.services.admission import MONGO_LIMITER
+from app.services.metrics import MONGO_METRICS
+from app.services.mongo import get_client
+from app.services.record_store import normalize
+from app.services.reference_snapshot import REFERENCE_SNAPSHOT_ENABLED, get_reference_snapshot
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Database names
+UNIVERSITY_DB_NAME = os.getenv("UNIVERSITY_DB_NAME", "university_db")
+COMPANY_DB_NAME = os.getenv("COMPANY_DB_NAME", "company_db")
+RESUME_DB_NAME = os.getenv("RESUME_DB_NAME", "resume_rover_db")
+
+# Normalized full name of the reference records, so name lookups can use an index
+# (case-insensitive $regex queries scan every index key). Records imported before
+# it existed are migrated with: python -m app.services.seed_loader <dataset> --backfill-name-keys
+NAME_KEY_FIELD = "full_name_key"
+# Names per $in query of the batched name lookups
+NAME_LOOKUP_BATCH_SIZE = 1000
+
+# Indexes for the hot query shapes, keyed by collection attribute
+INDEXES = {
+    "verification_info": [
+        IndexModel([("resume_id", ASCENDING)], name="resume_id_unique", unique=True),
+        IndexModel([("job_id", ASCENDING), ("is_verified", ASCENDING), ("_id", ASCENDING)], name="job_id_is_verified"),
+        IndexModel([("is_verified", ASCENDING), ("_id", ASCENDING)], name="is_verified"),
+        IndexModel([("username", ASCENDING)], name="username"),
+    ],
+    "university_collection": [
+        IndexModel([(NAME_KEY_FIELD, ASCENDING), ("university", ASCENDING)], name="full_name_key_university"),
+    ],
+    "company_collection": [
+        IndexModel([(NAME_KEY_FIELD, ASCENDING), ("company", ASCENDING)], name="full_name_key_company"),
+    ],
+}
+
+def with_name_key(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the normalized full name lookup key to a reference record (in place)."""
+    record[NAME_KEY_FIELD] = normalize(record.get("full_name"))
+    return record
+
 class MockDatabase:
     """
     Mock database class that simulates fetching data from university and company records.
     In a production environment, this would connect to actual institutional databases.
     """
     
-    def __init__(self):
-        """Initialize the mock database by loading JSON files."""
-        # Connect to MongoDB for mock verification data
+    # Set once the indexes have been created in this process
+    _indexes_ensured = False
+    
+    def __init__(self, create_indexes: bool = True):
+        """
+        Initialize the mock database connections.
+        
+        Reference data is not loaded here; use app.services.seed_loader to import it.
+        
+        Args:
+            create_indexes: Create the query indexes if not yet done in this process
+        """
+        # Shared pooled client for mock verification data
         self.mock_uri = os.getenv("MONGO_URI")
-        self.mock_client = MongoClient(self.mock_uri)
+        self.mock_client = get_client(self.mock_uri)
         
-        # Connect to MongoDB for resume rover data
+        # Shared pooled client for resume rover data (same client if the URIs match)
         self.resume_uri = os.getenv("MONGO")
-        self.resume_client = MongoClient(self.resume_uri)
+        self.resume_client = get_client(self.resume_uri)
         
         # Existing mock databases (using MONGO_URI)
-        self.mock_db_u = self.mock_client["university_db"]
-        self.mock_db_c = self.mock_client["company_db"]
+        self.mock_db_u = self.mock_client[UNIVERSITY_DB_NAME]
+        self.mock_db_c = self.mock_client[COMPANY_DB_NAME]
         self.university_collection = self.mock_db_u["university_records"]
         self.company_collection = self.mock_db_c["employment_records"]
         
         # Resume rover database (using MONGO)
-        self.resume_rover_db = self.resume_client["resume_rover_db"]
+        self.resume_rover_db = self.resume_client[RESUME_DB_NAME]
         self.parsed_resumes = self.resume_rover_db["parsed_resumes"]
         self.verification_info = self.resume_rover_db["verification_info"]
         
-        # Load data from JSON files if collections are empty
-        self._load_mock_data_if_empty()
+        # Optional in-memory snapshot of the reference datasets, shared by the process
+        self.snapshot = None
+        if REFERENCE_SNAPSHOT_ENABLED:
+            self.snapshot = get_reference_snapshot(self.university_collection, self.company_collection)
+        
+        # Create indexes once per process
+        if create_indexes and not MockDatabase._indexes_ensured:
+            self.ensure_indexes()
         
         logger.info("MockDatabase initialized")
     
-    def _load_mock_data_if_empty(self):
-        """Load mock data from JSON files if collections are empty."""
-        # Load university records
-        if self.university_collection.count_documents({}) == 0:
-            try:
-                with open("data/university_records.json", "r") as file:
-                    university_records = json.load(file)
-                    if university_records:
-                        self.university_collection.insert_many(university_records)
-                        logger.info(f"Loaded {len(university_records)} university records")
-            except Exception as e:
-                logger.error(f"Error loading university records: {e}")
-        
-        # Load company records
-        if self.company_collection.count_documents({}) == 0:
+    def ensure_indexes(self) -> bool:
+        """
+        Create the indexes used by the hot query paths. Safe to call repeatedly.
+        
+        Attempted once per process from the constructor: failures are logged,
+        not retried on every new instance.
+        
+        Returns:
+            True if all indexes exist, False otherwise
+        """
+        success = True
+        for attribute, indexes in INDEXES.items():
+            collection = getattr(self, attribute)
             try:
-                with open("data/company_records.json", "r") as file:
-                    company_records = json.load(file)
-                    if company_records:
-                        self.company_collection.insert_many(company_records)
-                        logger.info(f"Loaded {len(company_records)} company records")
-            except Exception as e:
-                logger.error(f"Error loading company records: {e}")
+                collection.create_indexes(indexes)
+            except PyMongoError as e:
+                # e.g. duplicate resume_id values created before the unique index existed
+                logger.error("Error creating indexes on %s: %s", collection.full_name, e)
+                success = False
+        
+        MockDatabase._indexes_ensured = True
+        if success:
+            logger.info("MockDatabase indexes ensured")
+        return success
     
+    @MONGO_METRICS.instrument("get_university_record_by_params")
+    @MONGO_LIMITER.guard
     def get_university_record_by_params(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Get university record based on query parameters.
+        Served from the in-memory reference snapshot when REFERENCE_SNAPSHOT is enabled.
         
         Args:
             params: Query parameters for filtering
@@ -76,22 +137,52 @@ class MockDatabase:
         Returns:
             Matching record or None
         """
-        # Case-insensitive search for name and university
+        name = params.get("name", params.get("full_name"))
+        if self.snapshot and isinstance(name, str) and isinstance(params.get("university", ""), str):
+            return self.snapshot.find_university_record(name, params.get("university", ""))
+        
+        # Exact name ignoring case (through the indexed lookup key), case-insensitive university
         query = {}
-        if "name" in params:
-            query["full_name"] = {"$regex": f"^{params['name']}$", "$options": "i"}
-        elif "full_name" in params:
-            query["full_name"] = {"$regex": f"^{params['full_name']}$", "$options": "i"}
+        if "name" in params or "full_name" in params:
+            query[NAME_KEY_FIELD] = normalize(name)
         
+        # University, company and job title are substrings (not patterns), like the snapshot matches them
         if "university" in params:
-            query["university"] = {"$regex": f"{params['university']}", "$options": "i"}
+            query["university"] = {"$regex": re.escape(str(params["university"])), "$options": "i"}
                 
-        logger.info(f"Querying university records with: {query}")
+        logger.debug("Querying university records with: %s", query)
         return self.university_collection.find_one(query)
     
+    @MONGO_METRICS.instrument("get_university_records_by_names")
+    @MONGO_LIMITER.guard
+    def get_university_records_by_names(
+        self,
+        names: Iterable[Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the university records of many people, a batch of names per query.
+        
+        Args:
+            names: Full names (matched exactly ignoring case, like get_university_record_by_params)
+            projection: Fields to return
+            
+        Returns:
+            List of matching records
+        """
+        keys = list(dict.fromkeys(normalize(name) for name in names if isinstance(name, str)))
+        records = []
+        for start in range(0, len(keys), NAME_LOOKUP_BATCH_SIZE):
+            query = {NAME_KEY_FIELD: {"$in": keys[start:start + NAME_LOOKUP_BATCH_SIZE]}}
+            records.extend(self.university_collection.find(query, projection))
+        return records
+    
+    @MONGO_METRICS.instrument("get_employment_record_by_params")
+    @MONGO_LIMITER.guard
     def get_employment_record_by_params(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Get employment records based on query parameters.
+        Served from the in-memory reference snapshot when REFERENCE_SNAPSHOT is enabled.
         
         Args:
             params: Query parameters for filtering
@@ -99,20 +190,22 @@ class MockDatabase:
         Returns:
             List of matching records
         """
+        name = params.get("name", params.get("full_name"))
+        if self.snapshot and isinstance(name, str) and isinstance(params.get("company", ""), str):
+            return self.snapshot.find_employment_records(name, params.get("company", ""), params.get("job_title"))
+        
         # Build query - avoid nested regex structures that cause issues
         query = {}
         
-        # Handle name field
-        if "name" in params:
-            query["full_name"] = {"$regex": f"{params['name']}", "$options": "i"}
-        elif "full_name" in params and isinstance(params["full_name"], str):
-            query["full_name"] = {"$regex": f"{params['full_name']}", "$options": "i"}
-        elif "full_name" in params and isinstance(params["full_name"], dict):
+        # Handle name field: exact name ignoring case, through the indexed lookup key
+        if isinstance(params.get("full_name"), dict):
             query["full_name"] = params["full_name"]
+        elif "name" in params or "full_name" in params:
+            query[NAME_KEY_FIELD] = normalize(name)
         
         # Handle company field
         if "company" in params and isinstance(params["company"], str):
-            query["company"] = {"$regex": f"{params['company']}", "$options": "i"}
+            query["company"] = {"$regex": re.escape(params["company"]), "$options": "i"}
         elif "company" in params and isinstance(params["company"], dict):
             query["company"] = params["company"]
         
@@ -120,14 +213,16 @@ class MockDatabase:
         if "job_title" in params and params["job_title"]:
             # Try both position and job_title fields
             position_query = {"$or": [
-                {"position": {"$regex": f"{params['job_title']}", "$options": "i"}},
-                {"job_title": {"$regex": f"{params['job_title']}", "$options": "i"}}
+                {"position": {"$regex": re.escape(params["job_title"]), "$options": "i"}},
+                {"job_title": {"$regex": re.escape(params["job_title"]), "$options": "i"}}
             ]}
             query = {**query, **position_query}
         
-        logger.info(f"Querying employment records with: {query}")
+        logger.debug("Querying employment records with: %s", query)
         return list(self.company_collection.find(query))
     
+    @MONGO_METRICS.instrument("get_resume_by_id")
+    @MONGO_LIMITER.guard
     def get_resume_by_id(self, resume_id: str) -> Optional[Dict[str, Any]]:
         """
         Get parsed resume by ID.
@@ -143,12 +238,14 @@ class MockDatabase:
         try:
             object_id = ObjectId(resume_id)
             resume = self.parsed_resumes.find_one({"_id": object_id})
-            logger.info(f"Retrieved resume with ID: {resume_id}")
+            logger.debug("Retrieved resume with ID: %s", resume_id)
             return resume
         except Exception as e:
-            logger.error(f"Error retrieving resume with ID {resume_id}: {e}")
+            logger.error("Error retrieving resume with ID %s: %s", resume_id, e)
             return None
     
+    @MONGO_METRICS.instrument("get_verification_info")
+    @MONGO_LIMITER.guard
     def get_verification_info(self, resume_id: str) -> Optional[Dict[str, Any]]:
         """
         Get verification info by resume ID.
@@ -164,12 +261,73 @@ class MockDatabase:
         try:
             object_id = ObjectId(resume_id)
             verification = self.verification_info.find_one({"resume_id": resume_id})
-            logger.info(f"Retrieved verification info for resume ID: {resume_id}")
+            logger.debug("Retrieved verification info for resume ID: %s", resume_id)
             return verification
         except Exception as e:
-            logger.error(f"Error retrieving verification info for resume ID {resume_id}: {e}")
+            logger.error("Error retrieving verification info for resume ID %s: %s", resume_id, e)
             return None
     
+    @MONGO_METRICS.instrument("get_resume_owner")
+    @MONGO_LIMITER.guard
+    def get_resume_owner(self, resume_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the job_id and username of a resume, from its verification record or else the parsed resume.
+
+        Args:
+            resume_id: Resume ID
+
+        Returns:
+            Dictionary with job_id and username, or None if not found
+        """
+        from bson.objectid import ObjectId
+
+        projection = {"_id": 0, "job_id": 1, "username": 1}
+        try:
+            owner = self.verification_info.find_one({"resume_id": resume_id}, projection)
+            if owner is None:
+                owner = self.parsed_resumes.find_one({"_id": ObjectId(resume_id)}, projection)
+            return owner
+        except Exception as e:
+            logger.error("Error retrieving owner of resume ID %s: %s", resume_id, e)
+            return None
+
+    def find_verification_records(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: Optional[int] = None
+    ) -> Cursor:
+        """
+        Get a cursor over verification records in _id order (keyset pagination).
+        
+        Args:
+            filters: Equality filters, e.g. {"is_verified": "VERIFIED", "job_id": "..."}
+            after: Only return records with an _id greater than this one
+            limit: Maximum number of records to return
+            fields: Fields to project (all fields if not given)
+            batch_size: Number of documents fetched per round trip
+            
+        Returns:
+            Cursor over matching records
+        """
+        from bson.objectid import ObjectId
+        
+        query = dict(filters or {})
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        
+        projection = {field: 1 for field in fields} if fields else None
+        cursor = self.verification_info.find(query, projection).sort("_id", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+    
+    @MONGO_METRICS.instrument("create_verification_record")
+    @MONGO_LIMITER.guard
     def create_verification_record(self, verification_data: Dict[str, Any]) -> str:
         """
         Create verification record.
@@ -182,12 +340,17 @@ class MockDatabase:
         """
         try:
             result = self.verification_info.insert_one(verification_data)
-            logger.info(f"Created verification record with ID: {result.inserted_id}")
+            logger.info("Created verification record with ID: %s", result.inserted_id)
             return str(result.inserted_id)
+        except DuplicateKeyError:
+            logger.warning("Verification record for resume ID %s already exists", verification_data.get('resume_id'))
+            return None
         except Exception as e:
-            logger.error(f"Error creating verification record: {e}")
+            logger.error("Error creating verification record: %s", e)
             return None
     
+    @MONGO_METRICS.instrument("update_verification_record")
+    @MONGO_LIMITER.guard
     def update_verification_record(self, record_id: str, update_data: Dict[str, Any]) -> bool:
         """
         Update verification record.
@@ -208,18 +371,93 @@ class MockDatabase:
                 {"$set": update_data}
             )
             success = result.modified_count > 0
-            logger.info(f"Updated verification record {record_id}: {success}")
+            logger.debug("Updated verification record %s: %s", record_id, success)
             return success
         except Exception as e:
-            logger.error(f"Error updating verification record {record_id}: {e}")
+            logger.error("Error updating verification record %s: %s", record_id, e)
             return False
     
-    def close(self):
-        """Close database connections."""
-        if hasattr(self, 'mock_client') and self.mock_client:
-            self.mock_client.close()
-            logger.info("Closed mock database connections")
+    @MONGO_METRICS.instrument("get_verification_record")
+    @MONGO_LIMITER.guard
+    def get_verification_record(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get verification record by its own ID.
+        
+        Args:
+            record_id: Record ID
+            
+        Returns:
+            Verification record or None
+        """
+        from bson.objectid import ObjectId
+        
+        try:
+            return self.verification_info.find_one({"_id": ObjectId(record_id)})
+        except Exception as e:
+            logger.error("Error retrieving verification record %s: %s", record_id, e)
+            return None
+    
+    @MONGO_METRICS.instrument("update_verification_item")
+    @MONGO_LIMITER.guard
+    def update_verification_item(
+        self,
+        record_id: str,
+        item_path: str,
+        item: Dict[str, Any],
+        expected_state: Optional[str] = None,
+        counter_deltas: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically replace an education/work experience item and adjust the record counters.
+        
+        Args:
+            record_id: Record ID
+            item_path: Dotted path of the item, e.g. "education.0"
+            item: New item value
+            expected_state: Only apply the update if the stored item is still in this state
+            counter_deltas: Counter increments to apply together with the item update
+            
+        Returns:
+            The updated record or None if no record matched
+        """
+        from bson.objectid import ObjectId
+        
+        try:
+            query = {"_id": ObjectId(record_id)}
+            if expected_state is not None:
+                query[f"{item_path}.verified"] = expected_state
+            
+            update = {"$set": {item_path: item}}
+            if counter_deltas:
+                update["$inc"] = counter_deltas
             
-        if hasattr(self, 'resume_client') and self.resume_client:
-            self.resume_client.close()
-            logger.info("Closed resume database connections")
\ No newline at end of file
+            return self.verification_info.find_one_and_update(
+                query,
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error("Error updating %s of verification record %s: %s", item_path, record_id, e)
+            return None
+    
+    def close(self):
+        """
+        Release this instance. The pooled clients are shared by the process and
+        are closed by app.services.mongo.close_clients on shutdown.
+        """
+        self.mock_client = None
+        self.resume_client = None
+
+
+def load_reference_snapshot():
+    """
+    Load the shared reference snapshot and start its refresh (when REFERENCE_SNAPSHOT is enabled).
+    Call once on application startup, so no request waits for the full load.
+    """
+    if not REFERENCE_SNAPSHOT_ENABLED:
+        return
+    try:
+        MockDatabase().close()
+    except PyMongoError as e:
+        # The first request tries again
+        logger.error("Error loading the reference snapshot: %s", e)
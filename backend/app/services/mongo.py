@@ -0,0 +1,144 @@
+"""
+Shared MongoDB client management.
+
+One pooled MongoClient is created per distinct URI and reused for the whole
+process, instead of opening new clients for every MockDatabase instance.
+Pool sizing, timeouts, compression and read preference come from the environment.
+"""
+import os
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+from pymongo import MongoClient, monitoring
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Connection pool configuration
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+# Comma separated, in order of preference, e.g. "zstd,snappy,zlib" (zstd/snappy need their python packages)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool metrics per server address from pymongo's monitoring events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: defaultdict(float))
+
+    def _add(self, address, name: str, value: float = 1):
+        with self._lock:
+            self._stats[f"{address[0]}:{address[1]}"][name] += value
+
+    def pool_created(self, event):
+        self._add(event.address, "pools_created")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(event.address, "pools_cleared")
+
+    def pool_closed(self, event):
+        self._add(event.address, "pools_closed")
+
+    def connection_created(self, event):
+        self._add(event.address, "connections_open")
+        self._add(event.address, "connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, "connections_open", -1)
+
+    def connection_check_out_started(self, event):
+        self._add(event.address, "checkouts_waiting")
+
+    def connection_check_out_failed(self, event):
+        self._add(event.address, "checkouts_waiting", -1)
+        self._add(event.address, "checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._add(event.address, "checkouts_waiting", -1)
+        self._add(event.address, "connections_in_use")
+        self._add(event.address, "checkouts")
+        # Time spent waiting for a connection (pymongo >= 4.7)
+        self._add(event.address, "checkout_wait_seconds", getattr(event, "duration", 0) or 0)
+
+    def connection_checked_in(self, event):
+        self._add(event.address, "connections_in_use", -1)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Get a copy of the current metrics, keyed by server address."""
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._stats.items()}
+
+
+pool_metrics = PoolMetricsListener()
+
+_clients: Dict[Optional[str], MongoClient] = {}
+_clients_lock = threading.Lock()
+
+def client_options() -> Dict[str, Any]:
+    """
+    Get the MongoClient keyword arguments built from the configuration.
+
+    Returns:
+        Dictionary of MongoClient options
+    """
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "event_listeners": [pool_metrics],
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+def get_client(uri: Optional[str]) -> MongoClient:
+    """
+    Get the shared MongoClient for a URI, creating it on first use.
+
+    Args:
+        uri: MongoDB connection string (None for the driver default)
+
+    Returns:
+        Pooled MongoClient shared by the whole process
+    """
+    client = _clients.get(uri)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(uri, **client_options())
+            _clients[uri] = client
+            logger.info("Created MongoDB client (maxPoolSize=%s, minPoolSize=%s)", MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE)
+        return client
+
+def close_clients():
+    """Close all shared clients. Call once on application shutdown."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+    logger.info("Closed MongoDB clients")
@@ -3,6 +3,7 @@ Oracle simulator to mimic Chainlink oracle behavior for data verification.
 """
 import json
 import time
+import logging
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime
 from enum import IntEnum
@@ -12,14 +13,26 @@ import os
 # Fix imports to work both as module and when run directly
 try:
     # Try relative import first (when imported as module)
+    from .admission import OverloadedError
     from .mock_db import MockDatabase
+    from .reference_snapshot import RecordSnapshot
+    from .record_store import UNIVERSITY_COLUMNS
+    from .metrics import ORACLE_METRICS
+    from ..utils.logging_config import SAMPLED
     from .blockchain import BlockchainClient, VerificationType
 except ImportError:
     # Fall back to absolute import (when run as script)
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from app.services.admission import OverloadedError
     from app.services.mock_db import MockDatabase
+    from app.services.reference_snapshot import RecordSnapshot
+    from app.services.record_store import UNIVERSITY_COLUMNS
+    from app.services.metrics import ORACLE_METRICS
+    from app.utils.logging_config import SAMPLED
     from app.services.blockchain import BlockchainClient, VerificationType
 
+logger = logging.getLogger(__name__)
+
 class OracleSimulator:
     """
     Simulates Chainlink Oracle behavior to verify applicant information.
@@ -30,6 +43,7 @@ class OracleSimulator:
         self.db = MockDatabase()
         self.blockchain = BlockchainClient()
         
+    @ORACLE_METRICS.instrument("verify_gpa")
     def verify_gpa(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Verify GPA information against mock university database.
@@ -64,6 +78,7 @@ class OracleSimulator:
         else:
             return False, f"GPA mismatch for {name} at {university}. Claimed: {claimed_gpa}, Actual: {actual_gpa}"
     
+    @ORACLE_METRICS.instrument("verify_degree")
     def verify_degree(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Verify degree information against mock university database.
@@ -98,6 +113,54 @@ class OracleSimulator:
         else:
             return False, f"Degree mismatch for {name} at {university}. Claimed: {claimed_degree}, Actual: {actual_degree}"
     
+    def _university_snapshot(self, claims: List[Dict[str, Any]]) -> RecordSnapshot:
+        """
+        Get the university records to verify a batch of claims against.
+
+        Uses the process-wide snapshot when REFERENCE_SNAPSHOT is enabled. Otherwise
+        only the records of the claimed names are fetched, with batched queries.
+        """
+        if self.db.snapshot:
+            return self.db.snapshot.universities
+
+        snapshot = RecordSnapshot(self.db.university_collection, UNIVERSITY_COLUMNS)
+        snapshot.load_documents(self.db.get_university_records_by_names(
+            (claim.get("name") for claim in claims), snapshot.projection
+        ))
+        return snapshot
+
+    @ORACLE_METRICS.instrument("verify_gpa_batch")
+    def verify_gpa_batch(self, claims: List[Dict[str, Any]]):
+        """
+        Verify many GPA claims at once against the reference snapshot.
+
+        Args:
+            claims: Dictionaries containing name, university, and gpa to verify
+
+        Returns:
+            BatchResult with verified/status vectors and per-claim details
+        """
+        # numpy is only needed for bulk re-verification, not on the request path
+        from app.services.batch_verification import verify_gpa_batch
+
+        return verify_gpa_batch(self._university_snapshot(claims), claims)
+
+    @ORACLE_METRICS.instrument("verify_degree_batch")
+    def verify_degree_batch(self, claims: List[Dict[str, Any]]):
+        """
+        Verify many degree claims at once against the reference snapshot.
+
+        Args:
+            claims: Dictionaries containing name, university, and degree to verify
+
+        Returns:
+            BatchResult with verified/status vectors and per-claim details
+        """
+        from app.services.batch_verification import verify_degree_batch
+
+        return verify_degree_batch(self._university_snapshot(claims), claims)
+
+    @ORACLE_METRICS.instrument("verify_employment")
     def verify_employment(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Verify employment information against mock company database.
@@ -133,6 +196,7 @@ class OracleSimulator:
             job_titles = [r.get("job_title") for r in records]
             return True, f"Verified {name} worked at {company} as: {', '.join(job_titles)}"
     
+    @ORACLE_METRICS.instrument("verify_and_store_on_blockchain")
     def verify_and_store_on_blockchain(self, 
                                       data: Dict[str, Any], 
                                       verification_type: VerificationType) -> Dict[str, Any]:
@@ -148,11 +212,11 @@ class OracleSimulator:
         """
         # Create hash from data
         data_hash = self.blockchain.create_data_hash(data)
-        print(f"Generated data hash: {data_hash}")
+        logger.debug("Generated data hash: %s", data_hash)
         
         # Check if verification already exists on blockchain
         exists = self.blockchain.verification_exists(data_hash)
-        print(f"Verification exists: {exists}")
+        logger.debug("Verification exists: %s", exists)
         
         if exists:
             # Get existing verification
@@ -163,7 +227,7 @@ class OracleSimulator:
             return verification
         
         # Perform verification based on type
-        print(f"Performing verification of type: {verification_type.name}")
+        logger.debug("Performing verification of type: %s", verification_type.name)
         if verification_type == VerificationType.GPA:
             is_verified, details = self.verify_gpa(data)
         elif verification_type == VerificationType.DEGREE:
@@ -176,10 +240,11 @@ class OracleSimulator:
                 "data_hash": data_hash
             }
         
-        print(f"Verification result: {is_verified}, Details: {details}")
+        logger.info("Verification result: %s, Details: %s", is_verified, details, extra=SAMPLED)
         
         # Simulate oracle delay
-        time.sleep(1)
+        with ORACLE_METRICS.track("simulated_delay"):
+            time.sleep(1)
         
         try:
             # Store result on blockchain
@@ -187,15 +252,14 @@ class OracleSimulator:
                 data_hash=data_hash,
                 is_verified=is_verified,
                 verification_type=verification_type,
-                details=details,
-                account=self.blockchain.default_account  # Explicitly specify the account
+                details=details
             )
             
-            print(f"Stored verification on blockchain with tx: {tx_hash}")
+            logger.info("Stored verification on blockchain with tx: %s", tx_hash)
             
             # Confirm it was stored
             exists_after = self.blockchain.verification_exists(data_hash)
-            print(f"Verification exists after storing: {exists_after}")
+            logger.debug("Verification exists after storing: %s", exists_after)
             
             # Return result with transaction details
             return {
@@ -208,8 +272,10 @@ class OracleSimulator:
                 "tx_hash": tx_hash,
                 "status": "new"
             }
+        except OverloadedError:
+            raise
         except Exception as e:
-            print(f"Error storing verification result: {e}")
+            logger.error("Error storing verification result: %s", e)
             return {
                 "error": f"Failed to store verification: {str(e)}",
                 "data_hash": data_hash,
@@ -225,6 +291,7 @@ class OracleSimulator:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     oracle = OracleSimulator()
     
     print("Oracle simulator initialized")
@@ -0,0 +1,265 @@
+"""
+Compact columnar storage for reference records.
+
+Holding tens of millions of university/employment rows as one Python dict per
+record costs kilobytes per row. ColumnStore keeps each field in a typed array
+instead: strings are interned into per-column tables and stored as int32 codes,
+GPAs as float32, and records are sorted by the hash of their normalized full name
+so that all records of a person are found through a per-key offset. The
+normalized name of each key is kept as UTF-8 and compared on lookup, so names
+whose hashes collide never return each other's records. A record costs a few
+tens of bytes plus its share of the interned strings and names.
+"""
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+
+# Column kinds and their array type codes
+STRING = "str"
+FLOAT32 = "float32"
+INT32 = "int32"
+TYPECODES = {STRING: "i", FLOAT32: "f", INT32: "i"}
+
+MISSING_CODE = -1
+MISSING_INT = -(2 ** 31)
+
+ID_SIZE = 12
+
+# (field, kind) columns kept for each dataset
+UNIVERSITY_COLUMNS = (
+    ("university", STRING),
+    ("degree", STRING),
+    ("gpa", FLOAT32),
+    ("graduation_year", INT32),
+)
+EMPLOYMENT_COLUMNS = (
+    ("company", STRING),
+    ("position", STRING),
+    ("job_title", STRING),
+    ("start_date", STRING),
+    ("end_date", STRING),
+)
+
+def normalize(value: Any) -> str:
+    """Normalize a name for lookups: collapse whitespace and ignore case."""
+    return " ".join(str(value).split()).casefold() if value is not None else ""
+
+def id_bytes(record_id: Any) -> bytes:
+    """Get the fixed-size binary form of a document _id."""
+    if isinstance(record_id, ObjectId):
+        return record_id.binary
+    return blake2b(repr(record_id).encode(), digest_size=ID_SIZE).digest()
+
+def float32_value(value: float) -> Optional[float]:
+    """Convert a stored float32 back to the shortest float it represents."""
+    if math.isnan(value):
+        return None
+    return float(f"{value:.7g}")
+
+
+class InternTable:
+    """Interns the values of a string column into integer codes."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Any) -> int:
+        """Get the code of a value, adding it to the table if needed."""
+        if value is None:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> int:
+        """Get the code of a value without adding it (MISSING_CODE if unknown)."""
+        return self.codes.get(value, MISSING_CODE)
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the table and its strings."""
+        return (
+            sys.getsizeof(self.values) + sys.getsizeof(self.codes)
+            + sum(sys.getsizeof(value) for value in self.values)
+        )
+
+
+class ColumnStore:
+    """
+    Immutable columnar record set, sorted by full name key.
+
+    Attributes:
+        columns: Field name -> typed array, one entry per row
+        tables: Field name -> InternTable for string columns
+        key_hashes: Sorted name keys, one per distinct normalized name
+            (colliding names repeat the same hash)
+        key_offsets: Row range of key i is key_offsets[i]:key_offsets[i + 1]
+        names: Concatenated UTF-8 normalized names of the keys
+        name_offsets: Name of key i is names[name_offsets[i]:name_offsets[i + 1]]
+        ids: Concatenated 12-byte document ids in row order
+        id_order: Rows sorted by id, for id lookups
+    """
+
+    __slots__ = (
+        "specs", "columns", "tables", "row_keys", "row_names", "key_hashes", "key_offsets",
+        "names", "name_offsets", "ids", "id_order"
+    )
+
+    def __init__(self, specs: Tuple[Tuple[str, str], ...]):
+        self.specs = specs
+        self.columns: Dict[str, array] = {field: array(TYPECODES[kind]) for field, kind in specs}
+        self.tables: Dict[str, InternTable] = {field: InternTable() for field, kind in specs if kind == STRING}
+        # Name key and normalized name of each row, only filled while staging documents in build()
+        self.row_keys = array("q")
+        self.row_names: List[str] = []
+        self.key_hashes = array("q")
+        self.key_offsets = array("I", [0])
+        self.names = bytearray()
+        self.name_offsets = array("Q", [0])
+        self.ids = bytearray()
+        self.id_order = array("I")
+
+    def __len__(self) -> int:
+        return len(self.ids) // ID_SIZE
+
+    @classmethod
+    def build(cls, documents: Iterable[Dict[str, Any]], specs: Tuple[Tuple[str, str], ...]) -> "ColumnStore":
+        """
+        Build a store from documents with a full_name field.
+
+        Args:
+            documents: Source documents (streamed, not kept)
+            specs: (field, kind) columns to keep
+
+        Returns:
+            New ColumnStore
+        """
+        staging = cls(specs)
+        for document in documents:
+            staging._append(document)
+
+        # Sort rows by key and name so that each name owns a contiguous row range
+        order = sorted(range(len(staging)), key=lambda row: (staging.row_keys[row], staging.row_names[row]))
+
+        store = cls(specs)
+        store.tables = staging.tables
+        for field, column in staging.columns.items():
+            store.columns[field] = array(column.typecode, (column[row] for row in order))
+        store.ids = bytearray().join(staging.ids[row * ID_SIZE:(row + 1) * ID_SIZE] for row in order)
+
+        previous = None
+        for row, source_row in enumerate(order):
+            name = staging.row_names[source_row]
+            if name != previous:
+                if store.key_hashes:
+                    store.key_offsets.append(row)
+                store.key_hashes.append(staging.row_keys[source_row])
+                store.names += name.encode()
+                store.name_offsets.append(len(store.names))
+                previous = name
+        if store.key_hashes:
+            store.key_offsets.append(len(store))
+        del staging, order
+
+        store.id_order = array("I", sorted(range(len(store)), key=store._id_at))
+        return store
+
+    def _append(self, document: Dict[str, Any]):
+        name = normalize(document.get("full_name"))
+        self.row_keys.append(hash(name))
+        self.row_names.append(name)
+        self.ids += id_bytes(document["_id"])
+        for field, kind in self.specs:
+            value = document.get(field)
+            if kind == STRING:
+                self.columns[field].append(self.tables[field].code(value))
+            elif kind == FLOAT32:
+                try:
+                    self.columns[field].append(float(value))
+                except (TypeError, ValueError):
+                    self.columns[field].append(math.nan)
+            else:
+                try:
+                    self.columns[field].append(int(value))
+                except (TypeError, ValueError):
+                    self.columns[field].append(MISSING_INT)
+
+    def _id_at(self, row: int) -> bytes:
+        return bytes(self.ids[row * ID_SIZE:(row + 1) * ID_SIZE])
+
+    def match_key(self, index: int, name: str) -> int:
+        """
+        Find the key of a normalized name among the keys sharing its hash.
+
+        Args:
+            index: First key index with the hash of the name
+            name: Normalized name
+
+        Returns:
+            Key index, or -1 if the name has no records
+        """
+        key = hash(name)
+        encoded = name.encode()
+        while index < len(self.key_hashes) and self.key_hashes[index] == key:
+            if self.names[self.name_offsets[index]:self.name_offsets[index + 1]] == encoded:
+                return index
+            index += 1
+        return -1
+
+    def rows_for_name(self, name: Any) -> range:
+        """Get the rows of all records with a full name (normalized exact match)."""
+        name = normalize(name)
+        index = self.match_key(bisect_left(self.key_hashes, hash(name)), name)
+        if index < 0:
+            return range(0)
+        return range(self.key_offsets[index], self.key_offsets[index + 1])
+
+    def row_for_id(self, record_id: Any) -> Optional[int]:
+        """Get the row of a document id, or None."""
+        target = id_bytes(record_id)
+        index = bisect_left(self.id_order, target, key=self._id_at)
+        if index < len(self.id_order) and self._id_at(self.id_order[index]) == target:
+            return self.id_order[index]
+        return None
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Materialize one row as a dictionary (missing values are left out)."""
+        record = {}
+        for field, kind in self.specs:
+            value = self.columns[field][row]
+            if kind == STRING:
+                if value != MISSING_CODE:
+                    record[field] = self.tables[field].values[value]
+            elif kind == FLOAT32:
+                value = float32_value(value)
+                if value is not None:
+                    record[field] = value
+            elif value != MISSING_INT:
+                record[field] = value
+        return record
+
+    def records(self, rows: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """Materialize several rows."""
+        return (self.record(row) for row in rows)
+
+    def nbytes(self) -> int:
+        """Memory used by the columns, keys, ids and intern tables."""
+        arrays = list(self.columns.values()) + [self.key_hashes, self.key_offsets, self.name_offsets, self.id_order]
+        return (
+            sum(column.itemsize * len(column) for column in arrays)
+            + len(self.ids)
+            + len(self.names)
+            + sum(table.nbytes() for table in self.tables.values())
+        )
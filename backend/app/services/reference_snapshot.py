@@ -0,0 +1,383 @@
+"""
+In-memory snapshot of the institutional reference datasets.
+
+The university and employment collections change rarely (about once a day), so
+instead of one MongoDB query per claim the oracle lookups can be served from an
+in-process copy keyed by normalized full name. The snapshot is refreshed in the
+background, through a change stream when the deployment supports one and by
+polling `updated_at` otherwise. The change stream starts at the cluster time
+read before the full load, so writes made during the load are applied too.
+Both modes do a full reload every REFERENCE_SNAPSHOT_RELOAD_SECONDS.
+
+Enable it with REFERENCE_SNAPSHOT=1 (loaded on application startup).
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple, Iterable, Iterator
+
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+from dotenv import load_dotenv
+
+from app.services.record_store import (
+    ColumnStore,
+    EMPLOYMENT_COLUMNS,
+    UNIVERSITY_COLUMNS,
+    id_bytes,
+    normalize
+)
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Snapshot configuration
+REFERENCE_SNAPSHOT_ENABLED = os.getenv("REFERENCE_SNAPSHOT", "0").lower() in ("1", "true", "yes")
+# "auto" tries a change stream and falls back to polling, "change_stream" or "poll" force one
+REFERENCE_SNAPSHOT_REFRESH = os.getenv("REFERENCE_SNAPSHOT_REFRESH", "auto")
+REFERENCE_SNAPSHOT_POLL_SECONDS = float(os.getenv("REFERENCE_SNAPSHOT_POLL_SECONDS", "60"))
+# Full reloads also pick up deletions and records without updated_at
+REFERENCE_SNAPSHOT_RELOAD_SECONDS = float(os.getenv("REFERENCE_SNAPSHOT_RELOAD_SECONDS", "86400"))
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate the memory used by an object and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+class RecordSnapshot:
+    """
+    In-memory copy of one reference collection.
+
+    Records loaded in bulk live in a compact ColumnStore. Records changed after
+    the load are kept in a small overlay (and shadowed rows in a deleted set)
+    until the next full reload compacts them. Overlay buckets are replaced
+    rather than mutated, so lookups never need a lock.
+    """
+
+    def __init__(self, collection: Collection, specs: Tuple[Tuple[str, str], ...]):
+        self.collection = collection
+        self.specs = specs
+        self.projection = {field: 1 for field, kind in specs}
+        self.projection.update({"full_name": 1, "updated_at": 1})
+        self._store = ColumnStore(specs)
+        self._deleted: Set[int] = set()
+        self._overlay: Dict[str, Dict[bytes, Dict[str, Any]]] = {}
+        self._overlay_keys: Dict[bytes, str] = {}
+        self._lock = threading.Lock()
+        self.last_updated_at = None
+        self.loaded_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.resume_token = None
+        # Cluster time read before the last full load (None without a replica set)
+        self.loaded_at_operation_time = None
+
+    def __len__(self) -> int:
+        return len(self._store) - len(self._deleted) + len(self._overlay_keys)
+
+    def _track_updated_at(self, document: Dict[str, Any]):
+        updated_at = document.get("updated_at")
+        if updated_at is not None and (self.last_updated_at is None or updated_at > self.last_updated_at):
+            self.last_updated_at = updated_at
+
+    def _tracked(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for document in documents:
+            self._track_updated_at(document)
+            yield document
+
+    def load(self):
+        """Load the whole collection and atomically replace the snapshot."""
+        # A change stream started at this time sees every write the load may have missed
+        operation_time = self.collection.database.command("ping").get("operationTime")
+        self.load_documents(self.collection.find({}, self.projection))
+        self.loaded_at_operation_time = operation_time
+        self.resume_token = None
+
+    def load_documents(self, documents: Iterable[Dict[str, Any]]):
+        """
+        Atomically replace the snapshot with the given documents.
+
+        Args:
+            documents: Records of the collection, e.g. only those needed by one batch
+        """
+        self.last_updated_at = None
+        store = ColumnStore.build(self._tracked(documents), self.specs)
+
+        with self._lock:
+            self._store = store
+            self._deleted = set()
+            self._overlay = {}
+            self._overlay_keys = {}
+            self.loaded_at = self.refreshed_at = time.time()
+
+        logger.info("Loaded %d records from %s into the snapshot", len(store), self.collection.full_name)
+
+    def upsert(self, document: Dict[str, Any]):
+        """Insert or replace one record."""
+        record_id = id_bytes(document["_id"])
+        key = normalize(document.get("full_name"))
+        record = {field: document[field] for field, kind in self.specs if field in document}
+
+        with self._lock:
+            self._remove(document["_id"])
+            bucket = dict(self._overlay.get(key, {}))
+            bucket[record_id] = record
+            self._overlay[key] = bucket
+            self._overlay_keys[record_id] = key
+        self._track_updated_at(document)
+
+    def delete(self, record_id: Any):
+        """Remove one record."""
+        with self._lock:
+            self._remove(record_id)
+
+    def _remove(self, record_id: Any):
+        row = self._store.row_for_id(record_id)
+        if row is not None:
+            self._deleted.add(row)
+
+        record_id = id_bytes(record_id)
+        key = self._overlay_keys.pop(record_id, None)
+        if key is None:
+            return
+        bucket = {other: record for other, record in self._overlay.get(key, {}).items() if other != record_id}
+        if bucket:
+            self._overlay[key] = bucket
+        else:
+            self._overlay.pop(key, None)
+
+    def poll(self) -> int:
+        """
+        Apply records changed since the last seen updated_at.
+
+        Returns:
+            Number of records applied
+        """
+        if self.last_updated_at is None:
+            return 0
+
+        count = 0
+        for document in self.collection.find({"updated_at": {"$gt": self.last_updated_at}}, self.projection):
+            self.upsert(document)
+            count += 1
+        self.refreshed_at = time.time()
+        return count
+
+    def apply_change(self, change: Dict[str, Any]):
+        """Apply one change stream event."""
+        operation = change["operationType"]
+        if operation in ("insert", "update", "replace"):
+            document = change.get("fullDocument")
+            if document:
+                self.upsert(document)
+            else:
+                # Deleted again before the update could be looked up
+                self.delete(change["documentKey"]["_id"])
+        elif operation == "delete":
+            self.delete(change["documentKey"]["_id"])
+        self.resume_token = change["_id"]
+        self.refreshed_at = time.time()
+
+    def find(self, name: str) -> List[Dict[str, Any]]:
+        """Get all records for a full name (normalized exact match)."""
+        store = self._store
+        deleted = self._deleted
+        records = [store.record(row) for row in store.rows_for_name(name) if row not in deleted]
+        records.extend(self._overlay.get(normalize(name), {}).values())
+        return records
+
+    def state(self) -> Tuple[ColumnStore, Set[int], Dict[str, Dict[bytes, Dict[str, Any]]]]:
+        """
+        Get a consistent view of the snapshot for batch lookups.
+
+        Returns:
+            Tuple of (base store, deleted rows, overlay buckets by normalized name)
+        """
+        with self._lock:
+            return self._store, set(self._deleted), self._overlay
+
+    def stats(self) -> Dict[str, Any]:
+        """Get record count, memory footprint and staleness."""
+        memory_bytes = (
+            self._store.nbytes()
+            + deep_sizeof(self._deleted)
+            + deep_sizeof(self._overlay)
+            + deep_sizeof(self._overlay_keys)
+        )
+        records = len(self)
+        return {
+            "records": records,
+            "memory_bytes": memory_bytes,
+            "bytes_per_record": round(memory_bytes / records, 1) if records else None,
+            "overlay_records": len(self._overlay_keys),
+            "loaded_at": self.loaded_at,
+            "staleness_seconds": round(time.time() - self.refreshed_at, 3) if self.refreshed_at else None
+        }
+
+
+class ReferenceSnapshot:
+    """Snapshot of the university and employment reference datasets with background refresh."""
+
+    def __init__(self, university_collection: Collection, company_collection: Collection):
+        self.universities = RecordSnapshot(university_collection, UNIVERSITY_COLUMNS)
+        self.employment = RecordSnapshot(company_collection, EMPLOYMENT_COLUMNS)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def load(self):
+        """Load both datasets."""
+        self.universities.load()
+        self.employment.load()
+
+    def find_university_record(self, name: str, university: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a university record by full name and (partial) university name.
+
+        Matches MockDatabase.get_university_record_by_params: the name must match
+        exactly ignoring case, the university is a case-insensitive substring.
+        """
+        university = normalize(university)
+        for record in self.universities.find(name):
+            if university in normalize(record.get("university")):
+                return record
+        return None
+
+    def find_employment_records(self, name: str, company: str, job_title: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find employment records by full name, (partial) company and optional (partial) job title.
+
+        Company and job title are case-insensitive substrings, like the MongoDB query;
+        the name is matched exactly ignoring case.
+        """
+        company = normalize(company)
+        job_title = normalize(job_title) if job_title else None
+
+        records = []
+        for record in self.employment.find(name):
+            if company not in normalize(record.get("company")):
+                continue
+            if job_title and job_title not in normalize(record.get("position")) and job_title not in normalize(record.get("job_title")):
+                continue
+            records.append(record)
+        return records
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memory footprint and staleness of both datasets."""
+        return {
+            "university_records": self.universities.stats(),
+            "employment_records": self.employment.stats()
+        }
+
+    def start(self, mode: str = REFERENCE_SNAPSHOT_REFRESH):
+        """Start background refresh threads for both datasets."""
+        for snapshot in (self.universities, self.employment):
+            thread = threading.Thread(
+                target=self._refresh_loop,
+                args=(snapshot, mode),
+                name=f"snapshot-{snapshot.collection.name}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the background refresh threads."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _refresh_loop(self, snapshot: RecordSnapshot, mode: str):
+        if mode in ("auto", "change_stream"):
+            try:
+                self._watch(snapshot)
+                return
+            except PyMongoError as e:
+                if mode == "change_stream":
+                    logger.error("Change stream on %s failed: %s", snapshot.collection.full_name, e)
+                    return
+                logger.info("Change streams unavailable on %s (%s), polling updated_at instead", snapshot.collection.full_name, e)
+        self._poll(snapshot)
+
+    def _watch(self, snapshot: RecordSnapshot):
+        """Follow the change stream until stopped, with a periodic full reload."""
+        next_reload = time.time() + REFERENCE_SNAPSHOT_RELOAD_SECONDS
+        while not self._stop.is_set():
+            if time.time() >= next_reload:
+                snapshot.load()
+                next_reload = time.time() + REFERENCE_SNAPSHOT_RELOAD_SECONDS
+            if snapshot.resume_token is not None:
+                start = {"resume_after": snapshot.resume_token}
+            else:
+                start = {"start_at_operation_time": snapshot.loaded_at_operation_time}
+            with snapshot.collection.watch(full_document="updateLookup", **start) as stream:
+                while not self._stop.is_set() and time.time() < next_reload:
+                    change = stream.try_next()
+                    if change is not None:
+                        snapshot.apply_change(change)
+                    else:
+                        # No change: the snapshot is still current
+                        snapshot.refreshed_at = time.time()
+
+    def _poll(self, snapshot: RecordSnapshot):
+        """Poll for updated records, with a periodic full reload."""
+        next_reload = time.time() + REFERENCE_SNAPSHOT_RELOAD_SECONDS
+        while not self._stop.wait(REFERENCE_SNAPSHOT_POLL_SECONDS):
+            try:
+                if time.time() >= next_reload:
+                    snapshot.load()
+                    next_reload = time.time() + REFERENCE_SNAPSHOT_RELOAD_SECONDS
+                else:
+                    changed = snapshot.poll()
+                    if changed:
+                        logger.info("Applied %d changed records to the %s snapshot", changed, snapshot.collection.full_name)
+            except PyMongoError as e:
+                logger.error("Error refreshing the %s snapshot: %s", snapshot.collection.full_name, e)
+
+
+_snapshot: Optional[ReferenceSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+def get_reference_snapshot(university_collection: Collection, company_collection: Collection) -> ReferenceSnapshot:
+    """
+    Get the process-wide snapshot, loading it and starting the refresh on first use.
+    The application loads it on startup (load_reference_snapshot), so requests do not wait for it.
+
+    Args:
+        university_collection: University records collection
+        company_collection: Employment records collection
+
+    Returns:
+        Shared ReferenceSnapshot
+    """
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                snapshot = ReferenceSnapshot(university_collection, company_collection)
+                snapshot.load()
+                snapshot.start()
+                _snapshot = snapshot
+    return _snapshot
+
+def close_reference_snapshot():
+    """Stop the background refresh of the shared snapshot."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is not None:
+            _snapshot.stop()
+            _snapshot = None
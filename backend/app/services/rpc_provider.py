@@ -0,0 +1,518 @@
+"""
+Shared web3 providers, with load balancing over several RPC endpoints.
+
+BLOCKCHAIN_PROVIDER may list several node URLs separated by commas (all nodes
+of the same chain). One provider is created per distinct value and shared by
+every BlockchainClient. With more than one URL, MultiEndpointProvider:
+
+- sends reads to a healthy endpoint picked at random, weighted by the inverse
+  of its recent latency, so faster nodes take more of the load
+- hedges reads: if the first endpoint has not answered RPC_HEDGE_AFTER seconds
+  after the request was sent, it is also sent to a second endpoint and the
+  first answer wins. Reads run on a pool of RPC_POOL_SIZE threads per endpoint
+  (as many as the connections), and time waiting for a thread is not counted
+- pins writes (and nonce reads) to one endpoint per sender, picked by
+  rendezvous hashing, so one node assigns all of a sender's nonces
+- ejects an endpoint after RPC_EJECT_AFTER consecutive failures and probes it
+  in the background every RPC_PROBE_INTERVAL seconds until it answers again
+
+URLs starting with ws:// or wss:// use a persistent WebSocket connection on
+which concurrent requests are multiplexed (no per-call HTTP overhead). HTTP
+URLs use one pooled requests session per endpoint for all threads, with
+RPC_POOL_SIZE keep-alive connections, TCP keep-alive probes on idle
+connections and connect/read timeouts of RPC_CONNECT_TIMEOUT/RPC_TIMEOUT.
+
+Endpoint health, requests and hedges are exported as rpc_* metrics.
+"""
+import os
+import contextvars
+import hashlib
+import logging
+import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from itertools import count
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import requests
+from dotenv import load_dotenv
+from eth_account import Account
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from web3 import HTTPProvider
+from web3._utils.encoding import Web3JsonEncoder
+from web3._utils.http_session_manager import HTTPSessionManager
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from websockets.sync.client import ClientConnection, connect
+
+from app.services.metrics import RPC_ENDPOINT_HEALTHY, RPC_HEDGES, RPC_REQUESTS
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a slow read is also sent to a second endpoint (0 disables hedging)
+RPC_HEDGE_AFTER = float(os.getenv("RPC_HEDGE_AFTER", "0.25"))
+RPC_EJECT_AFTER = int(os.getenv("RPC_EJECT_AFTER", "2"))
+RPC_PROBE_INTERVAL = float(os.getenv("RPC_PROBE_INTERVAL", "5"))
+# Keep-alive connections per HTTP endpoint, shared by all threads
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "32"))
+RPC_CONNECT_TIMEOUT = float(os.getenv("RPC_CONNECT_TIMEOUT", "3"))
+# Seconds to wait for the answer of one call
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))
+# Idle seconds before TCP keep-alive probes are sent on a pooled connection (0 disables)
+RPC_TCP_KEEPALIVE = int(os.getenv("RPC_TCP_KEEPALIVE", "60"))
+
+# Weight of the newest sample in the per-endpoint latency average
+LATENCY_DECAY = 0.2
+# Calls that must reach the sender's endpoint: the node signing or assigning the nonce
+PINNED_METHODS = {
+    "eth_sendTransaction",
+    "eth_sendRawTransaction",
+    "eth_signTransaction",
+    "eth_sign",
+    "eth_signTypedData",
+    "eth_signTypedData_v4",
+    "eth_getTransactionCount",
+    "personal_sign",
+    "personal_sendTransaction",
+}
+
+
+def parse_endpoints(value: str) -> List[str]:
+    """Split a comma separated list of endpoint URLs."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+def sender_of(method: str, params: Sequence[Any]) -> str:
+    """
+    Get the account a pinned call acts for.
+
+    Args:
+        method: JSON-RPC method
+        params: JSON-RPC params
+
+    Returns:
+        Lowercase address, or "" if it cannot be determined
+    """
+    try:
+        if method == "eth_sendRawTransaction":
+            sender = Account.recover_transaction(params[0])
+        elif method == "personal_sign":
+            sender = params[1]
+        elif isinstance(params[0], dict):
+            sender = params[0].get("from", "")
+        else:
+            sender = params[0]
+        return str(sender).lower()
+    except Exception as e:
+        logger.warning("Cannot determine the sender of %s: %s", method, e)
+        return ""
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections send TCP keep-alive probes when idle."""
+
+    def __init__(self, keepalive: int, **kwargs):
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        options = list(HTTPConnection.default_socket_options)
+        if self.keepalive > 0:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # Linux names; elsewhere the system defaults apply
+            for name, value in (("TCP_KEEPIDLE", self.keepalive), ("TCP_KEEPINTVL", max(self.keepalive // 4, 1)), ("TCP_KEEPCNT", 4)):
+                if hasattr(socket, name):
+                    options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class _SharedSessionManager(HTTPSessionManager):
+    """Serves every thread from one session (web3 otherwise opens a default session per thread)."""
+
+    def __init__(self, session: requests.Session):
+        super().__init__()
+        self.session = session
+
+    def cache_and_return_session(self, endpoint_uri, session=None, request_timeout=None) -> requests.Session:
+        return self.session
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider with a sized keep-alive connection pool and connect/read timeouts."""
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        pool_size: int = RPC_POOL_SIZE,
+        timeout: float = RPC_TIMEOUT,
+        connect_timeout: float = RPC_CONNECT_TIMEOUT,
+        tcp_keepalive: int = RPC_TCP_KEEPALIVE,
+        **kwargs
+    ):
+        """
+        Args:
+            endpoint_uri: Node URL
+            pool_size: Keep-alive connections kept open to the node
+            timeout: Seconds to wait for the answer of one call
+            connect_timeout: Seconds to wait for a new connection
+            tcp_keepalive: Idle seconds before keep-alive probes (0 disables)
+            **kwargs: HTTPProvider arguments
+        """
+        super().__init__(endpoint_uri, request_kwargs={"timeout": (connect_timeout, timeout)}, **kwargs)
+        session = requests.Session()
+        # Calls are not retried here: the callers (failover, admission control) decide
+        adapter = KeepAliveAdapter(tcp_keepalive, pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self._request_session_manager = _SharedSessionManager(session)
+
+    def close(self):
+        self._request_session_manager.session.close()
+
+
+class WebSocketRPCProvider(JSONBaseProvider):
+    """
+    Persistent WebSocket provider multiplexing concurrent requests on one connection.
+
+    Requests from any thread are sent as they come; a reader thread matches the
+    answers to the waiting callers by JSON-RPC id. The connection is reopened on
+    the next request after it drops.
+    """
+
+    def __init__(self, endpoint_uri: str, timeout: float = RPC_TIMEOUT, connect_timeout: float = RPC_CONNECT_TIMEOUT):
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._ids = count()
+        self._connection: Optional[ClientConnection] = None
+        # Request id -> (caller's future, connection the request was sent on)
+        self._pending: Dict[int, Tuple[Future, ClientConnection]] = {}
+
+    def __str__(self) -> str:
+        return f"WS connection {self.endpoint_uri}"
+
+    def _connect(self) -> ClientConnection:
+        with self._lock:
+            if self._connection is None:
+                try:
+                    # Node responses (logs, traces) can be larger than the 1 MiB default
+                    self._connection = connect(self.endpoint_uri, open_timeout=self.connect_timeout, max_size=None, compression=None)
+                except Exception as e:
+                    raise ConnectionError(f"Cannot open a WebSocket connection to {self.endpoint_uri}: {e}") from e
+                threading.Thread(target=self._read, args=(self._connection,), name="rpc-ws-reader", daemon=True).start()
+            return self._connection
+
+    def _read(self, connection: ClientConnection):
+        """Hand every answer to its caller until the connection closes."""
+        error = ConnectionError(f"WebSocket connection to {self.endpoint_uri} closed")
+        try:
+            for message in connection:
+                response = json.loads(message)
+                with self._lock:
+                    future, _ = self._pending.pop(response.get("id"), (None, None))
+                if future is not None:
+                    future.set_result(response)
+        except Exception as e:
+            error = ConnectionError(f"WebSocket connection to {self.endpoint_uri} failed: {e}")
+        finally:
+            with self._lock:
+                if self._connection is connection:
+                    self._connection = None
+                # Only the requests sent on this connection wait for it
+                failed = [request_id for request_id, (_, sent_on) in self._pending.items() if sent_on is connection]
+                futures = [self._pending.pop(request_id)[0] for request_id in failed]
+            for future in futures:
+                future.set_exception(error)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        connection = self._connect()
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            self._pending[request_id] = (future, connection)
+        try:
+            try:
+                connection.send(json.dumps(
+                    {"jsonrpc": "2.0", "method": method, "params": params or [], "id": request_id},
+                    cls=Web3JsonEncoder
+                ))
+            except Exception as e:
+                raise ConnectionError(f"WebSocket request to {self.endpoint_uri} failed: {e}") from e
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"No answer to {method} from {self.endpoint_uri} within {self.timeout}s")
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def close(self):
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+
+def make_provider(endpoint_uri: str, **options) -> JSONBaseProvider:
+    """
+    Build the provider for one node URL.
+
+    Args:
+        endpoint_uri: http(s):// or ws(s):// URL
+        **options: pool_size, timeout, connect_timeout, tcp_keepalive (WebSocket: timeout, connect_timeout)
+
+    Returns:
+        WebSocketRPCProvider or PooledHTTPProvider
+    """
+    if endpoint_uri.startswith(("ws://", "wss://")):
+        return WebSocketRPCProvider(endpoint_uri, **{key: options[key] for key in ("timeout", "connect_timeout") if key in options})
+    return PooledHTTPProvider(endpoint_uri, **options)
+
+
+class Endpoint:
+    """One node behind a MultiEndpointProvider, with its health and latency."""
+
+    def __init__(self, url: str, provider: JSONBaseProvider):
+        self.url = url
+        self.provider = provider
+        self.healthy = True
+        self.failures = 0
+        self.latency: Optional[float] = None
+        RPC_ENDPOINT_HEALTHY.set(1, endpoint=url)
+
+    def weight(self, default_latency: float) -> float:
+        return 1.0 / max(self.latency or default_latency, 0.001)
+
+    def pin_score(self, sender: str) -> bytes:
+        return hashlib.sha1(f"{sender}|{self.url}".encode()).digest()
+
+
+class MultiEndpointProvider(JSONBaseProvider):
+    """web3 provider balancing requests over several endpoints of the same chain."""
+
+    def __init__(
+        self,
+        endpoint_uris: Sequence[str],
+        hedge_after: float = RPC_HEDGE_AFTER,
+        eject_after: int = RPC_EJECT_AFTER,
+        probe_interval: float = RPC_PROBE_INTERVAL,
+        providers: Optional[Sequence[JSONBaseProvider]] = None,
+        **options
+    ):
+        """
+        Args:
+            endpoint_uris: Node URLs
+            hedge_after: Seconds before a read is hedged (0 disables hedging)
+            eject_after: Consecutive failures before an endpoint is ejected
+            probe_interval: Seconds between probes of ejected endpoints
+            providers: Providers for the URLs (default: make_provider for each)
+            **options: Connection options passed to make_provider
+        """
+        super().__init__()
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required")
+        if providers is None:
+            providers = [make_provider(url, **options) for url in endpoint_uris]
+            for provider in providers:
+                if isinstance(provider, HTTPProvider):
+                    # Failover is handled here, not by retrying the same node
+                    provider.exception_retry_configuration = None
+        self.endpoint_uri = ",".join(endpoint_uris)
+        self.endpoints = [Endpoint(url, provider) for url, provider in zip(endpoint_uris, providers)]
+        self.hedge_after = hedge_after
+        self.eject_after = eject_after
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        # One thread per pooled connection, so reads are only limited by the connections
+        pool_size = options.get("pool_size", RPC_POOL_SIZE)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * len(self.endpoints), thread_name_prefix="rpc-read")
+        self._stop = threading.Event()
+        self._prober = threading.Thread(target=self._probe_loop, name="rpc-prober", daemon=True)
+        self._prober.start()
+
+    def __str__(self) -> str:
+        return f"RPC connection {self.endpoint_uri}"
+
+    def close(self):
+        """Stop the background prober and the hedging threads and close the connections."""
+        self._stop.set()
+        self._prober.join(timeout=5)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for endpoint in self.endpoints:
+            if hasattr(endpoint.provider, "close"):
+                endpoint.provider.close()
+
+    def _healthy(self) -> List[Endpoint]:
+        with self._lock:
+            healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        # With every endpoint ejected, trying them beats failing without a request
+        return healthy or list(self.endpoints)
+
+    def _pick_reads(self) -> List[Endpoint]:
+        """Get up to two distinct endpoints, picked at random weighted by inverse latency."""
+        candidates = self._healthy()
+        known = [endpoint.latency for endpoint in candidates if endpoint.latency is not None]
+        # Endpoints without samples get the best known latency so they are tried early
+        default_latency = min(known) if known else 0.001
+        picked = []
+        while candidates and len(picked) < 2:
+            weights = [endpoint.weight(default_latency) for endpoint in candidates]
+            endpoint = self._random.choices(candidates, weights)[0]
+            candidates.remove(endpoint)
+            picked.append(endpoint)
+        return picked
+
+    def _pick_pinned(self, sender: str) -> Endpoint:
+        """Get the endpoint of a sender (rendezvous hashing: only an ejection moves a sender)."""
+        return max(self._healthy(), key=lambda endpoint: endpoint.pin_score(sender))
+
+    def _record(self, endpoint: Endpoint, latency: Optional[float]):
+        """Record a success (with its latency) or a failure (latency None)."""
+        with self._lock:
+            if latency is None:
+                endpoint.failures += 1
+                if endpoint.healthy and endpoint.failures >= self.eject_after:
+                    endpoint.healthy = False
+                    RPC_ENDPOINT_HEALTHY.set(0, endpoint=endpoint.url)
+                    logger.warning("Ejected RPC endpoint %s after %d failures", endpoint.url, endpoint.failures)
+                return
+            endpoint.failures = 0
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += LATENCY_DECAY * (latency - endpoint.latency)
+            if not endpoint.healthy:
+                endpoint.healthy = True
+                RPC_ENDPOINT_HEALTHY.set(1, endpoint=endpoint.url)
+                logger.info("RPC endpoint %s is back", endpoint.url)
+
+    def _call(self, endpoint: Endpoint, method: RPCEndpoint, params: Any) -> RPCResponse:
+        started = time.perf_counter()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception:
+            self._record(endpoint, None)
+            RPC_REQUESTS.inc(endpoint=endpoint.url, outcome="error")
+            raise
+        self._record(endpoint, time.perf_counter() - started)
+        RPC_REQUESTS.inc(endpoint=endpoint.url, outcome="ok")
+        return response
+
+    def _submit(self, endpoint: Endpoint, method: RPCEndpoint, params: Any) -> Tuple[Future, threading.Event]:
+        """Run a call on the executor; the event is set once it is sent (or finished without being sent)."""
+        sent = threading.Event()
+
+        def call():
+            sent.set()
+            return self._call(endpoint, method, params)
+
+        # Keeps the request's tracing span as the parent of the call
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, call)
+        future.add_done_callback(lambda _: sent.set())
+        return future, sent
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method in PINNED_METHODS:
+            # Not retried elsewhere: a node-signed transaction could be sent twice
+            return self._call(self._pick_pinned(sender_of(method, params)), method, params)
+
+        endpoints = self._pick_reads()
+        if len(endpoints) == 1 or self.hedge_after <= 0:
+            return self._failover(endpoints, method, params)
+
+        primary, sent = self._submit(endpoints[0], method, params)
+        # The hedge delay counts from the send, not from the wait for a free thread
+        sent.wait()
+        try:
+            return primary.result(timeout=self.hedge_after)
+        except FutureTimeoutError:
+            pass
+        except Exception:
+            # Failed fast: the second endpoint is a plain retry, not a hedge
+            return self._call(endpoints[1], method, params)
+
+        hedge, _ = self._submit(endpoints[1], method, params)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                RPC_HEDGES.inc(winner="hedge" if future is hedge else "primary")
+                return response
+        raise error
+
+    def _failover(self, endpoints: List[Endpoint], method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Try the endpoints in order until one answers."""
+        for i, endpoint in enumerate(endpoints):
+            try:
+                return self._call(endpoint, method, params)
+            except Exception:
+                if i == len(endpoints) - 1:
+                    raise
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        """True if any endpoint answers."""
+        return any(endpoint.provider.is_connected() for endpoint in self.endpoints)
+
+    def _probe_loop(self):
+        """Probe ejected endpoints until stopped."""
+        while not self._stop.wait(self.probe_interval):
+            for endpoint in self.endpoints:
+                if endpoint.healthy:
+                    continue
+                try:
+                    self._call(endpoint, RPCEndpoint("eth_blockNumber"), [])
+                except Exception as e:
+                    logger.debug("RPC endpoint %s is still down: %s", endpoint.url, e)
+
+
+_providers: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], JSONBaseProvider] = {}
+_providers_lock = threading.Lock()
+
+def get_provider(endpoint_uris: str, **options) -> JSONBaseProvider:
+    """
+    Get the shared provider for a BLOCKCHAIN_PROVIDER value, creating it on first use.
+
+    Args:
+        endpoint_uris: One node URL, or several separated by commas
+        **options: pool_size, timeout, connect_timeout, tcp_keepalive (see make_provider)
+
+    Returns:
+        Provider of make_provider for one URL, MultiEndpointProvider for several
+    """
+    key = (endpoint_uris, tuple(sorted(options.items())))
+    provider = _providers.get(key)
+    if provider is not None:
+        return provider
+
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            urls = parse_endpoints(endpoint_uris)
+            provider = make_provider(urls[0], **options) if len(urls) == 1 else MultiEndpointProvider(urls, **options)
+            _providers[key] = provider
+            logger.info("Created RPC provider for %d endpoint(s)", len(urls))
+        return provider
+
+def close_providers():
+    """Close the connections and background work of all shared providers. Call once on application shutdown."""
+    with _providers_lock:
+        for provider in _providers.values():
+            if hasattr(provider, "close"):
+                provider.close()
+        _providers.clear()
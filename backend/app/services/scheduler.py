@@ -0,0 +1,314 @@
+"""
+Scheduler for verification work.
+
+Verification calls are queued and run by a fixed number of worker threads
+instead of inline in the request, in this order:
+
+- by priority class: interactive work (an admin checking or approving an item)
+  always runs before bulk work (initializing resumes)
+- within a class, by weighted fair queuing over a fairness key (the job_id of
+  the resume, or the recruiter's username): every key gets its share of the
+  workers, so one recruiter initializing 5,000 resumes for a job delays other
+  recruiters by a few jobs, not by the whole import
+
+Weights default to 1 and can be set per key with SCHEDULER_WEIGHTS, e.g.
+"job-42=4,alice=2". Queue depth, queue wait, running jobs and outcomes are
+exported as scheduler_* metrics.
+"""
+import os
+import asyncio
+import heapq
+import logging
+import threading
+import time
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import Future
+from itertools import count
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.services.metrics import SCHEDULER_JOBS, SCHEDULER_QUEUE_DEPTH, SCHEDULER_RUNNING, SCHEDULER_WAIT
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "8"))
+# Queued jobs (all classes) before new submissions are refused
+SCHEDULER_MAX_QUEUED = int(os.getenv("SCHEDULER_MAX_QUEUED", "10000"))
+SCHEDULER_WEIGHTS = os.getenv("SCHEDULER_WEIGHTS", "")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+# Fairness keys of recently seen resumes (a resume never changes job or owner)
+FAIRNESS_KEY_CACHE_SIZE = 10000
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """
+    Parse "key=weight" pairs separated by commas.
+
+    Args:
+        value: e.g. "job-42=4,alice=2"
+
+    Returns:
+        Weight by fairness key
+    """
+    weights = {}
+    for pair in filter(None, (part.strip() for part in value.split(","))):
+        key, _, weight = pair.rpartition("=")
+        try:
+            weights[key.strip()] = float(weight)
+        except ValueError:
+            logger.error("Invalid scheduler weight: %s", pair)
+    return weights
+
+
+class SchedulerFullError(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+
+class _Job:
+    __slots__ = ("function", "args", "kwargs", "context", "future", "key", "priority", "enqueued_at")
+
+    def __init__(self, function: Callable, args: tuple, kwargs: dict, key: str, priority: int):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        # Runs in the caller's context, so spans nest under the request span
+        self.context = contextvars.copy_context()
+        self.future: Future = Future()
+        self.key = key
+        self.priority = priority
+        self.enqueued_at = time.perf_counter()
+
+
+class FairQueue:
+    """
+    Weighted fair queue over fairness keys (virtual finish time ordering).
+
+    Each job is tagged with the virtual time at which it would finish if every
+    key with queued work got a share of the workers proportional to its
+    weight; jobs run in tag order.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or {}
+        self._heap: List[Tuple[float, int, _Job]] = []
+        self._sequence = count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._queued: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, job: _Job):
+        weight = self.weights.get(job.key, 1.0)
+        # A key that was idle starts at the current virtual time instead of catching up
+        start = max(self._virtual_time, self._last_finish.get(job.key, 0.0))
+        finish = start + 1.0 / weight
+        self._last_finish[job.key] = finish
+        self._queued[job.key] = self._queued.get(job.key, 0) + 1
+        heapq.heappush(self._heap, (finish, next(self._sequence), job))
+
+    def pop(self) -> _Job:
+        finish, _, job = heapq.heappop(self._heap)
+        self._virtual_time = finish
+        self._queued[job.key] -= 1
+        if not self._queued[job.key]:
+            # Forget idle keys so the tables stay bounded by the queued keys
+            del self._queued[job.key]
+            del self._last_finish[job.key]
+        return job
+
+    def drain(self) -> List[_Job]:
+        jobs = [job for _, _, job in self._heap]
+        self._heap = []
+        self._queued.clear()
+        self._last_finish.clear()
+        return jobs
+
+
+class VerificationScheduler:
+    """Priority classes of fair queues served by a bounded pool of worker threads."""
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, max_queued: int = SCHEDULER_MAX_QUEUED, weights: Optional[Dict[str, float]] = None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queues = {priority: FairQueue(weights) for priority in PRIORITY_NAMES}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scheduler-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 30):
+        """Cancel queued jobs and wait for running ones to finish."""
+        with self._condition:
+            self._stopped = True
+            for priority, fair_queue in self._queues.items():
+                for job in fair_queue.drain():
+                    job.future.cancel()
+                    SCHEDULER_JOBS.inc(priority=PRIORITY_NAMES[priority], outcome="cancelled")
+                SCHEDULER_QUEUE_DEPTH.set(0, priority=PRIORITY_NAMES[priority])
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def depth(self) -> Dict[str, int]:
+        """Get the number of queued jobs per priority class."""
+        with self._condition:
+            return {PRIORITY_NAMES[priority]: len(fair_queue) for priority, fair_queue in self._queues.items()}
+
+    def submit(self, function: Callable, *args, key: str = "", priority: int = PRIORITY_BULK, **kwargs) -> Future:
+        """
+        Queue a call.
+
+        Args:
+            function: Function to run on a worker thread
+            *args: Positional arguments
+            key: Fairness key, e.g. the job_id of the resume
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BULK
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future with the result of the call
+
+        Raises:
+            SchedulerFullError: If max_queued jobs are already waiting
+        """
+        job = _Job(function, args, kwargs, key, priority)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Scheduler is stopped")
+            if sum(len(fair_queue) for fair_queue in self._queues.values()) >= self.max_queued:
+                SCHEDULER_JOBS.inc(priority=PRIORITY_NAMES[priority], outcome="rejected")
+                raise SchedulerFullError(f"{self.max_queued} verification jobs are already queued")
+            fair_queue = self._queues[priority]
+            fair_queue.push(job)
+            SCHEDULER_QUEUE_DEPTH.set(len(fair_queue), priority=PRIORITY_NAMES[priority])
+            self._condition.notify()
+        return job.future
+
+    def _next_job(self) -> Optional[_Job]:
+        """Wait for the next job in priority order, or None once stopped."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                for priority in sorted(self._queues):
+                    fair_queue = self._queues[priority]
+                    if fair_queue:
+                        job = fair_queue.pop()
+                        SCHEDULER_QUEUE_DEPTH.set(len(fair_queue), priority=PRIORITY_NAMES[priority])
+                        return job
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            priority = PRIORITY_NAMES[job.priority]
+            SCHEDULER_WAIT.observe(time.perf_counter() - job.enqueued_at, priority=priority)
+            SCHEDULER_RUNNING.inc(priority=priority)
+            outcome = "error"
+            try:
+                job.future.set_result(job.context.run(job.function, *job.args, **job.kwargs))
+                outcome = "ok"
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                SCHEDULER_RUNNING.dec(priority=priority)
+                SCHEDULER_JOBS.inc(priority=priority, outcome=outcome)
+
+
+_fairness_keys: "OrderedDict[str, str]" = OrderedDict()
+_fairness_keys_lock = threading.Lock()
+
+def _cached_fairness_key(resume_id: str) -> Optional[str]:
+    with _fairness_keys_lock:
+        key = _fairness_keys.get(resume_id)
+        if key is not None:
+            _fairness_keys.move_to_end(resume_id)
+        return key
+
+def fairness_key(db: Any, resume_id: str) -> str:
+    """
+    Get the fairness key of a resume: its job_id, else its owner's username.
+
+    Args:
+        db: MockDatabase
+        resume_id: Resume ID
+
+    Returns:
+        Fairness key ("" if the resume is unknown)
+    """
+    key = _cached_fairness_key(resume_id)
+    if key is not None:
+        return key
+
+    owner = db.get_resume_owner(resume_id)
+    if owner is None:
+        return ""
+    key = str(owner.get("job_id") or owner.get("username") or "")
+    with _fairness_keys_lock:
+        _fairness_keys[resume_id] = key
+        if len(_fairness_keys) > FAIRNESS_KEY_CACHE_SIZE:
+            _fairness_keys.popitem(last=False)
+    return key
+
+async def fairness_key_async(db: Any, resume_id: str) -> str:
+    """
+    fairness_key for the event loop: on a cache miss the lookup (which may wait
+    for a MongoDB slot) runs in the default executor, in a copy of this context.
+
+    Args:
+        db: MockDatabase
+        resume_id: Resume ID
+
+    Returns:
+        Fairness key ("" if the resume is unknown)
+    """
+    key = _cached_fairness_key(resume_id)
+    if key is not None:
+        return key
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, fairness_key, db, resume_id)
+
+
+_scheduler: Optional[VerificationScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> VerificationScheduler:
+    """Get the process-wide scheduler, starting it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                scheduler = VerificationScheduler(weights=parse_weights(SCHEDULER_WEIGHTS))
+                scheduler.start()
+                _scheduler = scheduler
+    return _scheduler
+
+def close_scheduler():
+    """Stop the process-wide scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.stop()
+            _scheduler = None
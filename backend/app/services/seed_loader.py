@@ -0,0 +1,326 @@
+"""
+Bulk loader for the institutional reference datasets (university and employment records).
+
+Streams JSON arrays, NDJSON and CSV dumps in fixed-size chunks so that files with
+tens of millions of rows can be imported with constant memory. Run it from the
+backend directory:
+
+    python -m app.services.seed_loader university data/university_records.json
+    python -m app.services.seed_loader company data/company_records.json
+    python -m app.services.seed_loader company dumps/employment.csv --chunk-size 20000 --drop
+
+Records imported before the normalized name lookup key existed are migrated with:
+
+    python -m app.services.seed_loader university --backfill-name-keys
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from itertools import islice
+from typing import Dict, Any, Iterator, Iterable, List, Optional, TextIO
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.services.mock_db import NAME_KEY_FIELD, MockDatabase, with_name_key
+from app.services.record_store import normalize
+from app.services.mongo import close_clients
+
+logger = logging.getLogger(__name__)
+
+# Dataset name -> MockDatabase collection attribute
+DATASETS = {
+    "university": "university_collection",
+    "company": "company_collection",
+}
+
+FORMATS = ("json", "ndjson", "csv")
+
+# CSV columns converted to numbers
+NUMERIC_FIELDS = ("gpa", "graduation_year")
+
+DEFAULT_CHUNK_SIZE = 5000
+NAME_KEY_BATCH_SIZE = 1000
+READ_SIZE = 1 << 16
+
+def detect_format(path: str) -> str:
+    """
+    Detect the dump format from the file extension.
+
+    Args:
+        path: Path of the dump
+
+    Returns:
+        One of "json", "ndjson" or "csv"
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension == ".csv":
+        return "csv"
+    return "json"
+
+def iter_json_array(file: TextIO, read_size: int = READ_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a top-level JSON array, yielding one element at a time.
+
+    Args:
+        file: Open text file containing a JSON array of objects
+        read_size: Number of characters read per chunk
+
+    Returns:
+        Iterator over the array elements
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace and separators
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array of records")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element continues in the next chunk
+                if eof:
+                    raise
+            else:
+                position = end
+                yield record
+                continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON array")
+
+        # Drop the consumed part of the buffer and read more
+        chunk = file.read(read_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def iter_ndjson(file: TextIO) -> Iterator[Dict[str, Any]]:
+    """Parse newline-delimited JSON, skipping blank lines."""
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def _coerce_number(value: str) -> Any:
+    """Convert a CSV value to int or float when possible."""
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+def iter_csv(file: TextIO, numeric_fields: Iterable[str] = NUMERIC_FIELDS) -> Iterator[Dict[str, Any]]:
+    """Parse a CSV file with a header row, converting numeric columns."""
+    numeric_fields = set(numeric_fields)
+    for row in csv.DictReader(file):
+        yield {
+            key: _coerce_number(value) if key in numeric_fields else value
+            for key, value in row.items()
+        }
+
+def iter_records(file: TextIO, file_format: str) -> Iterator[Dict[str, Any]]:
+    """Get a record iterator for the given dump format."""
+    if file_format == "ndjson":
+        return iter_ndjson(file)
+    if file_format == "csv":
+        return iter_csv(file)
+    return iter_json_array(file)
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group records into lists of at most chunk_size."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_records(
+    collection: Collection,
+    records: Iterable[Dict[str, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Insert records in unordered bulk chunks, reporting progress as it goes.
+
+    Args:
+        collection: Target collection
+        records: Records to insert
+        chunk_size: Number of records per insert_many call
+
+    Returns:
+        Summary with inserted, failed and elapsed seconds
+    """
+    inserted = 0
+    failed = 0
+    started = time.perf_counter()
+
+    for chunk in iter_chunks(records, chunk_size):
+        try:
+            result = collection.insert_many(chunk, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered inserts continue past duplicates and other per-document errors
+            inserted += e.details.get("nInserted", 0)
+            failed += len(e.details.get("writeErrors", []))
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%s: %d inserted, %d failed (%.0f records/s)",
+            collection.full_name, inserted, failed, inserted / elapsed if elapsed else 0
+        )
+
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+def backfill_name_keys(collection: Collection, batch_size: int = NAME_KEY_BATCH_SIZE) -> Optional[int]:
+    """
+    Set the normalized full name lookup key on reference records that lack it.
+
+    Walks the records once in _id order (each batch resumes after the last _id),
+    so the migration is linear in the collection size.
+
+    Args:
+        collection: University or employment records collection
+        batch_size: Number of records updated per bulk write
+
+    Returns:
+        Number of records updated, or None on error
+    """
+    updated = 0
+    last_id = None
+    try:
+        while True:
+            query = {NAME_KEY_FIELD: {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(collection.find(query, {"full_name": 1}).sort("_id", ASCENDING).limit(batch_size))
+            if not batch:
+                break
+            collection.bulk_write([
+                UpdateOne({"_id": record["_id"]}, {"$set": {NAME_KEY_FIELD: normalize(record.get("full_name"))}})
+                for record in batch
+            ], ordered=False)
+            updated += len(batch)
+            last_id = batch[-1]["_id"]
+    except PyMongoError as e:
+        logger.error("Error backfilling %s on %s: %s", NAME_KEY_FIELD, collection.full_name, e)
+        return None
+
+    logger.info("Backfilled %s on %d records of %s", NAME_KEY_FIELD, updated, collection.full_name)
+    return updated
+
+def import_dataset(
+    db: MockDatabase,
+    dataset: str,
+    path: str,
+    file_format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    drop: bool = False,
+    if_empty: bool = False
+) -> Dict[str, Any]:
+    """
+    Import a reference dataset dump and build the indexes afterwards.
+
+    Args:
+        db: Database to import into (created with create_indexes=False)
+        dataset: "university" or "company"
+        path: Path of the dump
+        file_format: "json", "ndjson" or "csv" (detected from the extension if not given)
+        chunk_size: Number of records per bulk insert
+        drop: Drop the collection before importing
+        if_empty: Skip the import if the collection already contains records
+
+    Returns:
+        Import summary
+    """
+    collection = getattr(db, DATASETS[dataset])
+    file_format = file_format or detect_format(path)
+
+    if drop:
+        collection.drop()
+        logger.info("Dropped %s", collection.full_name)
+    elif if_empty and collection.estimated_document_count() > 0:
+        logger.info("%s already contains records, skipping import", collection.full_name)
+        return {"inserted": 0, "failed": 0, "seconds": 0, "skipped": True}
+
+    logger.info("Importing %s records from %s (%s)", dataset, path, file_format)
+    with open(path, "r", encoding="utf-8", newline="" if file_format == "csv" else None) as file:
+        records = (with_name_key(record) for record in iter_records(file, file_format))
+        summary = load_records(collection, records, chunk_size)
+
+    # Building indexes once after the load is much cheaper than maintaining them per insert
+    db.ensure_indexes()
+    # Records kept from an earlier import may predate the lookup key
+    if not drop:
+        backfill_name_keys(collection)
+    logger.info("Imported %s records: %s", dataset, summary)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Import institutional reference datasets into MongoDB.")
+    parser.add_argument("dataset", choices=sorted(DATASETS), help="Dataset to import")
+    parser.add_argument("path", nargs="?", help="JSON array, NDJSON or CSV dump")
+    parser.add_argument("--format", dest="file_format", choices=FORMATS, help="Dump format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per bulk insert")
+    parser.add_argument("--drop", action="store_true", help="Drop the collection before importing")
+    parser.add_argument("--if-empty", action="store_true", help="Only import if the collection is empty")
+    parser.add_argument("--backfill-name-keys", action="store_true", help="Only add the name lookup key to existing records")
+    args = parser.parse_args(argv)
+    if args.path is None and not args.backfill_name_keys:
+        parser.error("the path of the dump is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    db = MockDatabase(create_indexes=False)
+    try:
+        if args.backfill_name_keys:
+            db.ensure_indexes()
+            updated = backfill_name_keys(getattr(db, DATASETS[args.dataset]))
+            print(json.dumps({"updated": updated}))
+            return
+        summary = import_dataset(
+            db,
+            args.dataset,
+            args.path,
+            file_format=args.file_format,
+            chunk_size=args.chunk_size,
+            drop=args.drop,
+            if_empty=args.if_empty
+        )
+        print(json.dumps(summary))
+    finally:
+        db.close()
+        close_clients()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Accounts that sign and send contract writes.
+
+- Keys are loaded once into LocalAccount objects: ORACLE_PRIVATE_KEYS (comma
+  separated) or PRIVATE_KEY. Development chains use their first
+  ORACLE_ACCOUNTS unlocked accounts instead, unless ORACLE_PRIVATE_KEYS is set.
+- Every account is authorized as an oracle through authorizeOracle, sent by the
+  contract owner (an oracle account or OWNER_PRIVATE_KEY). Accounts that cannot
+  be authorized are left out. If no account can be used, the failure is
+  remembered for ORACLE_AUTHORIZE_RETRY_SECONDS instead of retrying on every write.
+- Writes go to the accounts round-robin. Each account has its own nonce stream,
+  so writes from different accounts do not wait for each other and chain
+  write throughput grows with the number of accounts. The stream is re-read
+  from the node when a send fails. A sent transaction given up unmined leaves
+  a nonce gap that every later transaction of the account waits behind (the
+  node's pending count skips it), so its nonce is filled with a zero-value
+  transfer to the account itself unless the latest block already covers it.
+"""
+import os
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from hexbytes import HexBytes
+from web3 import Web3
+
+from app.services.fees import FeePolicy, TransactionMonitor, fee_policy, transaction_monitor
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Unlocked accounts used on development chains
+ORACLE_ACCOUNTS = int(os.getenv("ORACLE_ACCOUNTS", "1"))
+# Authorize the oracle accounts on first use (needs the owner's account)
+ORACLE_AUTHORIZE = os.getenv("ORACLE_AUTHORIZE", "1").lower() not in ("0", "false", "no")
+ORACLE_AUTHORIZE_TIMEOUT = float(os.getenv("ORACLE_AUTHORIZE_TIMEOUT", "120"))
+# Seconds a failed load of the oracle accounts is reported before it is tried again
+ORACLE_AUTHORIZE_RETRY_SECONDS = float(os.getenv("ORACLE_AUTHORIZE_RETRY_SECONDS", "60"))
+# Gas of a plain value transfer, used to fill the nonce of a given up transaction
+TRANSFER_GAS = 21000
+
+def private_keys_from_env() -> List[str]:
+    """Oracle private keys: ORACLE_PRIVATE_KEYS (comma separated), or PRIVATE_KEY."""
+    keys = os.getenv("ORACLE_PRIVATE_KEYS") or os.getenv("PRIVATE_KEY") or ""
+    return [key.strip() for key in keys.split(",") if key.strip()]
+
+
+class Sender:
+    """One account and its nonce stream."""
+
+    def __init__(self, address: str, account: Optional[LocalAccount] = None):
+        """
+        Args:
+            address: Checksum address
+            account: Key to sign with (None: the node signs with its unlocked account)
+        """
+        self.address = address
+        self.account = account
+        self._lock = threading.Lock()
+        self._nonce: Optional[int] = None
+
+    def send(self, w3: Web3, tx: Dict[str, Any]) -> HexBytes:
+        """Sign and send a complete transaction dict."""
+        if self.account is None:
+            return w3.eth.send_transaction(tx)
+        return w3.eth.send_raw_transaction(self.account.sign_transaction(tx).raw_transaction)
+
+    def transact(self, w3: Web3, function_call, shape: Optional[Hashable], policy: FeePolicy, monitor: TransactionMonitor) -> HexBytes:
+        """
+        Send a contract transaction with the next nonce of this account.
+
+        Args:
+            w3: Web3 connected to the chain
+            function_call: Bound contract function, e.g. contract.functions.requestVerification(...)
+            shape: Call shape the gas estimate is cached under (None: estimate every call)
+            policy: Gas limits and fees
+            monitor: Watches the transaction until it is mined
+
+        Returns:
+            Transaction hash
+        """
+        gas = policy.gas_limit(shape, lambda: function_call.estimate_gas({'from': self.address}))
+        tx = function_call.build_transaction({'from': self.address, 'gas': gas, **policy.fee_fields(w3)})
+        # Only nonce allocation and the send itself are serialized, per account
+        with self._lock:
+            if self._nonce is None:
+                self._nonce = w3.eth.get_transaction_count(self.address, 'pending')
+            tx['nonce'] = self._nonce
+            try:
+                tx_hash = self.send(w3, tx)
+            except Exception:
+                # The node may or may not have taken the nonce; ask it again next time
+                self._nonce = None
+                raise
+            self._nonce += 1
+        monitor.track(
+            w3, tx, lambda replacement: self.send(w3, replacement), tx_hash,
+            lambda abandoned: self.fill_gap(w3, abandoned, policy, monitor)
+        )
+        return tx_hash
+
+    def resync(self):
+        """Re-read the next nonce from the node's pending count on the next write."""
+        with self._lock:
+            self._nonce = None
+
+    def fill_gap(self, w3: Web3, tx: Dict[str, Any], policy: FeePolicy, monitor: TransactionMonitor):
+        """
+        Fill the nonce of a transaction given up unmined with a zero-value transfer to this account.
+
+        Args:
+            w3: Web3 connected to the chain
+            tx: Last sent version of the given up transaction
+            policy: Fees of the transfer
+            monitor: Watches the transfer until it is mined
+        """
+        try:
+            if w3.eth.get_transaction_count(self.address, 'latest') > tx['nonce']:
+                # Mined after all, or its nonce was used by another transaction
+                return
+            # Outbids the given up transaction if the node still has it (current fees if that is over the cap)
+            filler = {
+                'from': self.address,
+                'to': self.address,
+                'value': 0,
+                'gas': TRANSFER_GAS,
+                'nonce': tx['nonce'],
+                **(policy.bumped(w3, tx) or policy.fee_fields(w3))
+            }
+            if 'chainId' in tx:
+                filler['chainId'] = tx['chainId']
+            tx_hash = self.send(w3, filler)
+        except Exception as e:
+            logger.error("Could not fill nonce %s of %s: %s", tx['nonce'], self.address, e)
+        else:
+            logger.warning("Filling nonce %s of %s with zero-value transfer %s", tx['nonce'], self.address, Web3.to_hex(tx_hash))
+            monitor.track(w3, filler, lambda replacement: self.send(w3, replacement), tx_hash)
+        finally:
+            self.resync()
+
+
+class SignerPool:
+    """Oracle accounts that contract writes are spread over."""
+
+    def __init__(self, senders: List[Sender], policy: FeePolicy = fee_policy, monitor: TransactionMonitor = transaction_monitor):
+        if not senders:
+            raise ValueError("At least one oracle account is required")
+        self.senders = senders
+        self.policy = policy
+        self.monitor = monitor
+        self.node_signed = all(sender.account is None for sender in senders)
+        self._lock = threading.Lock()
+        self._by_address = {sender.address.lower(): sender for sender in senders}
+        self._cycle = itertools.cycle(senders)
+
+    @property
+    def default(self) -> Sender:
+        return self.senders[0]
+
+    def sender(self, address: Optional[str] = None) -> Sender:
+        """
+        Get the sender of the next write.
+
+        Args:
+            address: Send from this account (default: the next account, round-robin)
+
+        Returns:
+            Sender of the account
+        """
+        with self._lock:
+            if address is None:
+                return next(self._cycle)
+            sender = self._by_address.get(address.lower())
+            if sender is None:
+                if not self.node_signed:
+                    raise ValueError(f"No private key loaded for account {address}")
+                # Any unlocked account of a development chain can send
+                sender = self._by_address[address.lower()] = Sender(Web3.to_checksum_address(address))
+            return sender
+
+    def transact(self, w3: Web3, function_call, shape: Optional[Hashable], sender: Sender) -> HexBytes:
+        """Send a contract transaction from a sender of this pool."""
+        return sender.transact(w3, function_call, shape, self.policy, self.monitor)
+
+
+def load_senders(w3: Web3, dev_chain: bool) -> List[Sender]:
+    """Oracle accounts from the environment, or unlocked accounts on development chains."""
+    if dev_chain and not os.getenv("ORACLE_PRIVATE_KEYS"):
+        return [Sender(address) for address in w3.eth.accounts[:ORACLE_ACCOUNTS]]
+
+    keys = private_keys_from_env()
+    if not keys:
+        raise ValueError("PRIVATE_KEY or ORACLE_PRIVATE_KEYS environment variable required for non-development environments")
+    accounts = [Account.from_key(key) for key in keys]
+    return [Sender(account.address, account) for account in accounts]
+
+def authorize(w3: Web3, contract, senders: List[Sender], dev_chain: bool, policy: FeePolicy, monitor: TransactionMonitor) -> List[Sender]:
+    """
+    Authorize every account as an oracle.
+
+    Returns:
+        The senders that are authorized
+    """
+    unauthorized = [sender for sender in senders if not contract.functions.authorizedOracles(sender.address).call()]
+    if not unauthorized:
+        return senders
+
+    owner_address = contract.functions.owner().call()
+    owner = next((sender for sender in senders if sender.address.lower() == owner_address.lower()), None)
+    if owner is None and dev_chain:
+        owner = Sender(owner_address)
+    elif owner is None and os.getenv("OWNER_PRIVATE_KEY"):
+        account = Account.from_key(os.getenv("OWNER_PRIVATE_KEY"))
+        if account.address.lower() == owner_address.lower():
+            owner = Sender(account.address, account)
+    if owner is None:
+        logger.error("Contract owner %s is not a loaded account; not using unauthorized oracles %s",
+                     owner_address, [sender.address for sender in unauthorized])
+        return [sender for sender in senders if sender not in unauthorized]
+
+    sent = []
+    for sender in unauthorized:
+        function_call = contract.functions.authorizeOracle(sender.address)
+        sent.append((sender, owner.transact(w3, function_call, ("authorizeOracle",), policy, monitor)))
+    failed = []
+    for sender, tx_hash in sent:
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=ORACLE_AUTHORIZE_TIMEOUT)
+        if receipt["status"] != 1:
+            logger.error("Authorizing oracle %s failed in transaction %s", sender.address, Web3.to_hex(tx_hash))
+            failed.append(sender)
+        else:
+            logger.info("Authorized oracle %s", sender.address)
+    return [sender for sender in senders if sender not in failed]
+
+
+_pools: Dict[Tuple[str, bool], SignerPool] = {}
+# Failed loads: (error message, monotonic time before which it is not retried)
+_failures: Dict[Tuple[str, bool], Tuple[str, float]] = {}
+# Loading one pool (which may wait for authorization receipts) only blocks callers of that pool
+_load_locks: Dict[Tuple[str, bool], threading.Lock] = {}
+_pools_lock = threading.Lock()
+
+def _load_pool(w3: Web3, contract, dev_chain: bool) -> SignerPool:
+    senders = load_senders(w3, dev_chain)
+    if ORACLE_AUTHORIZE:
+        senders = authorize(w3, contract, senders, dev_chain, fee_policy, transaction_monitor)
+    pool = SignerPool(senders)
+    logger.info("Sending contract writes from %d oracle account(s)", len(senders))
+    return pool
+
+def get_signer_pool(w3: Web3, contract, dev_chain: bool) -> SignerPool:
+    """
+    Get the shared signer pool of a contract, loading and authorizing its accounts on first use.
+
+    Args:
+        w3: Web3 connected to the chain
+        contract: The Verification contract
+        dev_chain: Use unlocked node accounts
+
+    Returns:
+        Signer pool
+
+    Raises:
+        ValueError: If no oracle account can be used (a failure is reported
+            again for ORACLE_AUTHORIZE_RETRY_SECONDS before it is retried)
+    """
+    key = (contract.address, dev_chain)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    with load_lock:
+        with _pools_lock:
+            pool = _pools.get(key)
+            failure = _failures.get(key)
+        if pool is not None:
+            return pool
+        if failure is not None and failure[1] > time.monotonic():
+            raise ValueError(f"No oracle account available: {failure[0]}")
+
+        try:
+            pool = _load_pool(w3, contract, dev_chain)
+        except Exception as e:
+            logger.error("Loading the oracle accounts failed, retrying in %ss: %s", ORACLE_AUTHORIZE_RETRY_SECONDS, e)
+            with _pools_lock:
+                _failures[key] = (str(e), time.monotonic() + ORACLE_AUTHORIZE_RETRY_SECONDS)
+            raise
+
+        with _pools_lock:
+            _pools[key] = pool
+            _failures.pop(key, None)
+        return pool
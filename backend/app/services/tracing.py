@@ -0,0 +1,360 @@
+"""
+Lightweight tracing of a request through routes, services, MongoDB and the chain.
+
+Spans nest through a context variable, so a span started anywhere during a
+request becomes a child of the request span without passing anything around.
+Span fields follow OpenTelemetry naming (W3C trace/span ids, *_unix_nano
+times, attributes, status) and finished spans go to pluggable span processors:
+
+    TRACING_EXPORTER=memory   keep the last TRACING_MEMORY_SPANS spans, served at /traces
+    TRACING_EXPORTER=console  log every finished span as one JSON line
+    TRACING_EXPORTER=otel     mirror spans into the OpenTelemetry API (needs opentelemetry-api)
+
+With the default TRACING_EXPORTER=none spans are not recorded at all.
+"""
+import os
+import json
+import time
+import random
+import inspect
+import logging
+import functools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Comma separated: none, memory, console, otel
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+# Fraction of new traces that are recorded
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+TRACING_MEMORY_SPANS = int(os.getenv("TRACING_MEMORY_SPANS", "10000"))
+
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "start_time_unix_nano",
+        "end_time_unix_nano", "attributes", "status", "status_message", "recording"
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None, recording: bool = True):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+        self.recording = recording
+
+    def set_attribute(self, key: str, value: Any):
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        if self.recording:
+            self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_unix_nano is None:
+            return None
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "duration_ms": self.duration_ms,
+            "attributes": dict(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+# Shared span used when nothing is recorded
+NON_RECORDING_SPAN = Span("non-recording", "0" * 32, recording=False)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanProcessor:
+    """Receives spans as they start and end (same hooks as an OpenTelemetry SpanProcessor)."""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+
+class InMemoryExporter(SpanProcessor):
+    """Keeps the most recent finished spans."""
+
+    def __init__(self, max_spans: int = TRACING_MEMORY_SPANS):
+        self._spans = deque(maxlen=max_spans)
+
+    def on_end(self, span: Span):
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recent traces, each with its spans in start order.
+
+        Args:
+            limit: Maximum number of traces
+
+        Returns:
+            List of traces, most recent first
+        """
+        traces: Dict[str, List[Span]] = {}
+        for span in reversed(self._spans):
+            if span.trace_id not in traces:
+                if len(traces) == limit:
+                    break
+                traces[span.trace_id] = []
+            traces[span.trace_id].append(span)
+
+        result = []
+        for trace_id, spans in traces.items():
+            spans.sort(key=lambda span: span.start_time_unix_nano)
+            root = next((span for span in spans if span.parent_span_id not in {s.span_id for s in spans}), spans[0])
+            result.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "duration_ms": root.duration_ms,
+                "span_count": len(spans),
+                "spans": [span.to_dict() for span in spans]
+            })
+        return result
+
+    def clear(self):
+        self._spans.clear()
+
+
+class ConsoleExporter(SpanProcessor):
+    """Logs every finished span as a JSON line."""
+
+    def on_end(self, span: Span):
+        logger.info("%s", json.dumps(span.to_dict(), default=str))
+
+
+class OpenTelemetryExporter(SpanProcessor):
+    """Mirrors spans into the OpenTelemetry API, for use with any configured OpenTelemetry SDK."""
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(__name__)
+        self._spans: Dict[str, Any] = {}
+
+    def on_start(self, span: Span):
+        parent = self._spans.get(span.parent_span_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._spans[span.span_id] = self._tracer.start_span(span.name, context=context, start_time=span.start_time_unix_nano)
+
+    def on_end(self, span: Span):
+        otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        otel_span.update_name(span.name)
+        otel_span.set_attributes({key: value for key, value in span.attributes.items() if isinstance(value, (str, bool, int, float))})
+        if span.status == STATUS_ERROR:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.status_message))
+        otel_span.end(end_time=span.end_time_unix_nano)
+
+
+class Tracer:
+    """Creates nested spans and hands them to the registered span processors."""
+
+    def __init__(self, sample_rate: float = TRACING_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.processors: List[SpanProcessor] = []
+
+    def add_span_processor(self, processor: SpanProcessor):
+        self.processors.append(processor)
+
+    @contextmanager
+    def start_span(self, name: str, remote_parent: Optional[Tuple[str, str, bool]] = None, **attributes) -> Iterator[Span]:
+        """
+        Start a span as a child of the current one and make it current.
+
+        Args:
+            name: Span name
+            remote_parent: (trace_id, span_id, sampled) from an incoming traceparent header
+            **attributes: Initial span attributes
+
+        Returns:
+            Context manager yielding the span
+        """
+        parent = _current_span.get()
+        if not self.processors or (parent is not None and not parent.recording):
+            yield NON_RECORDING_SPAN
+            return
+
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id)
+        elif remote_parent is not None:
+            trace_id, parent_span_id, sampled = remote_parent
+            span = Span(name, trace_id, parent_span_id, recording=sampled)
+        else:
+            span = Span(name, f"{random.getrandbits(128):032x}", recording=random.random() < self.sample_rate)
+
+        if not span.recording:
+            # Children of an unsampled trace are not recorded either
+            token = _current_span.set(NON_RECORDING_SPAN)
+            try:
+                yield NON_RECORDING_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        span.attributes.update(attributes)
+        token = _current_span.set(span)
+        for processor in self.processors:
+            processor.on_start(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end_time_unix_nano = time.time_ns()
+            if span.status == STATUS_UNSET:
+                span.status = STATUS_OK
+            _current_span.reset(token)
+            for processor in self.processors:
+                processor.on_end(span)
+
+    def traced(self, name: str, attributes: Sequence[str] = ()) -> Callable:
+        """
+        Decorator running a function in a span, with some of its arguments as attributes.
+
+        Args:
+            name: Span name
+            attributes: Names of the function parameters to record
+        """
+        def decorator(function: Callable) -> Callable:
+            signature = inspect.signature(function)
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.processors:
+                    return function(*args, **kwargs)
+                arguments = signature.bind_partial(*args, **kwargs).arguments
+                with self.start_span(name, **{key: arguments[key] for key in attributes if key in arguments}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+tracer = Tracer()
+memory_exporter: Optional[InMemoryExporter] = None
+
+def configure_tracing(exporters: str = TRACING_EXPORTER):
+    """
+    Register the span processors named in a comma separated list.
+
+    Args:
+        exporters: Any of none, memory, console, otel
+    """
+    global memory_exporter
+    tracer.processors = []
+    memory_exporter = None
+    for exporter in (name.strip().lower() for name in exporters.split(",")):
+        if exporter == "memory":
+            memory_exporter = InMemoryExporter()
+            tracer.add_span_processor(memory_exporter)
+        elif exporter == "console":
+            tracer.add_span_processor(ConsoleExporter())
+        elif exporter == "otel":
+            try:
+                tracer.add_span_processor(OpenTelemetryExporter())
+            except ImportError:
+                logger.error("TRACING_EXPORTER=otel needs the opentelemetry-api package")
+        elif exporter not in ("", "none"):
+            logger.error("Unknown tracing exporter: %s", exporter)
+
+configure_tracing()
+
+def current_span() -> Span:
+    """Get the current span (a non-recording span outside of any trace)."""
+    return _current_span.get() or NON_RECORDING_SPAN
+
+def set_span_attributes(**attributes):
+    """Add attributes to the current span."""
+    current_span().set_attributes(attributes)
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+
+    Returns:
+        (trace_id, parent_span_id, sampled), or None if missing or malformed
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class TracingMiddleware:
+    """ASGI middleware starting the root span of every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.processors:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        remote_parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+
+        with tracer.start_span(f"{scope['method']} {scope['path']}", remote_parent, **{"http.method": scope["method"]}) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route and span.recording:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
@@ -2,16 +2,18 @@
 Base verification service and common utilities.
 """
 import logging
-from typing import Dict, Any, Tuple, List, Optional
+from typing import Dict, Any, Tuple, List, Optional, Iterator
 from bson.objectid import ObjectId
 
+from app.services.admission import OverloadedError
 from app.services.mock_db import MockDatabase
 from app.services.blockchain import BlockchainClient
 from app.services.oracle_simulator import OracleSimulator, VerificationType
 from app.utils.helpers import extract_gpa
+from app.services.tracing import tracer
 
 from .common import VerificationState
-from .status import VerificationStatusService
+from .status import VerificationStatusService, count_item_states
 from .education import EducationVerificationService
 from .work_experience import WorkExperienceVerificationService
 
@@ -32,6 +34,7 @@ class ResumeVerificationService:
         self.work_experience_service = WorkExperienceVerificationService(self.db, self.blockchain, self.oracle)
         logger.info("ResumeVerificationService initialized")
     
+    @tracer.traced("resume.initialize_verification", ("resume_id",))
     def initialize_verification(self, resume_id: str) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Initialize verification record for a resume and automatically start verification.
@@ -90,7 +93,7 @@ class ResumeVerificationService:
                     # Only add GPA fields if we found a valid GPA
                     edu_entry["send"]["gpa"] = gpa
                     edu_entry["actual"]["gpa"] = None
-                    logger.info(f"Extracted GPA {gpa} from details: '{details}'")
+                    logger.debug("Extracted GPA %s from details: '%s'", gpa, details)
             
             verification_data["education"].append(edu_entry)
         
@@ -108,9 +111,16 @@ class ResumeVerificationService:
                 "verified": VerificationState.PENDING  # Use enum string instead of boolean
             })
         
+        # Initialize the per-record state counters maintained by VerificationStatusService
+        verification_data.update(count_item_states(verification_data))
+        
         # Store verification record
         record_id = self.db.create_verification_record(verification_data)
         if not record_id:
+            # A concurrent request may have created the record first (unique resume_id index)
+            existing = self.db.get_verification_info(resume_id)
+            if existing:
+                return False, f"Verification for resume ID {resume_id} already exists", existing
             return False, "Failed to create verification record", {}
         
         # Get the created record
@@ -124,6 +134,8 @@ class ResumeVerificationService:
             try:
                 success, message, _ = self.check_education_verification(resume_id, i)
                 verification_results.append(f"Education {i}: {message}")
+            except OverloadedError:
+                raise
             except Exception as e:
                 verification_results.append(f"Education {i}: Error - {str(e)}")
         
@@ -132,6 +144,8 @@ class ResumeVerificationService:
             try:
                 success, message, _ = self.check_work_experience_verification(resume_id, i)
                 verification_results.append(f"Work Experience {i}: {message}")
+            except OverloadedError:
+                raise
             except Exception as e:
                 verification_results.append(f"Work Experience {i}: Error - {str(e)}")
         
@@ -199,14 +213,81 @@ class ResumeVerificationService:
     def get_all_resumes(self):
         """
         Get all resumes with verification details from the database.
+        Prefer get_resumes_page or iter_resumes for large collections.
+        """
+        return list(self.iter_resumes())
+    
+    def get_resumes_page(
+        self,
+        limit: Optional[int] = 50,
+        after: Optional[str] = None,
+        is_verified: Optional[str] = None,
+        job_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of resumes with verification details.
+        
+        Args:
+            limit: Maximum number of resumes in the page (None for all of them)
+            after: Cursor returned by the previous page (last _id seen)
+            is_verified: Only return resumes with this overall status
+            job_id: Only return resumes for this job
+            fields: Fields to project (all fields if not given)
+            
+        Returns:
+            Tuple of (resumes, next_cursor); next_cursor is None on the last page
         """
-        # Assuming you have a collection for verification info
-        verification_collection = self.db.verification_info
+        # Fetch one extra record to know whether another page exists
+        cursor = self.db.find_verification_records(
+            filters=self._resume_filters(is_verified, job_id),
+            after=after,
+            limit=limit + 1 if limit is not None else None,
+            fields=fields
+        )
+        resumes = list(cursor)
         
-        # Get all verification records
-        verifications = list(verification_collection.find({}))
+        next_cursor = None
+        if limit is not None and len(resumes) > limit:
+            resumes = resumes[:limit]
+            next_cursor = str(resumes[-1]["_id"])
         
-        return verifications
+        return resumes, next_cursor
+    
+    def iter_resumes(
+        self,
+        is_verified: Optional[str] = None,
+        job_id: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over resumes with verification details without loading them all in memory.
+        
+        Args:
+            is_verified: Only return resumes with this overall status
+            job_id: Only return resumes for this job
+            fields: Fields to project (all fields if not given)
+            batch_size: Number of documents fetched from MongoDB per round trip
+            
+        Returns:
+            Iterator over resumes
+        """
+        return self.db.find_verification_records(
+            filters=self._resume_filters(is_verified, job_id),
+            fields=fields,
+            batch_size=batch_size
+        )
+    
+    @staticmethod
+    def _resume_filters(is_verified: Optional[str], job_id: Optional[str]) -> Dict[str, Any]:
+        """Build the server-side filters for resume listings."""
+        filters = {}
+        if is_verified:
+            filters["is_verified"] = is_verified
+        if job_id:
+            filters["job_id"] = job_id
+        return filters
     
     def close(self):
         """Close connections."""
@@ -7,6 +7,8 @@ from typing import Dict, Any, Tuple, Optional
 from app.services.mock_db import MockDatabase
 from app.services.blockchain import BlockchainClient
 from app.services.oracle_simulator import OracleSimulator, VerificationType
+from app.services.tracing import tracer
+from app.utils.logging_config import SAMPLED
 from .status import VerificationStatusService
 from .common import VerificationState
 
@@ -23,6 +25,7 @@ class EducationVerificationService:
         self.status_service = VerificationStatusService(db)
         logger.info("EducationVerificationService initialized")
     
+    @tracer.traced("education.check", ("resume_id", "education_index"))
     def check_verification(self, resume_id: str, education_index: int) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Check education verification against blockchain or perform verification.
@@ -34,7 +37,7 @@ class EducationVerificationService:
         Returns:
             Tuple of (success, message, data)
         """
-        logger.info(f"Starting education verification for resume {resume_id}, education index {education_index}")
+        logger.info("Starting education verification for resume %s, education index %s", resume_id, education_index, extra=SAMPLED)
         # Get verification record
         verification = self.db.get_verification_info(resume_id)
         if not verification:
@@ -46,6 +49,7 @@ class EducationVerificationService:
         
         # Get education data
         education = verification["education"][education_index]
+        previous_state = education["verified"]
         if education["verified"] in [VerificationState.VERIFIED, VerificationState.REJECTED]:
             return True, f"Education already in final state: {education['verified']}", verification
         
@@ -70,8 +74,8 @@ class EducationVerificationService:
         
         if exists:
             # Get verification status from blockchain
-            logger.info(f"Verification data found on blockchain: {verification_data}")
-            logger.info(f"Data hash: {data_hash}")
+            logger.debug("Verification data found on blockchain: %s", verification_data)
+            logger.debug("Data hash: %s", data_hash)
             blockchain_status = self.blockchain.get_verification_status(data_hash)
             is_verified = blockchain_status["is_verified"] if isinstance(blockchain_status, dict) else blockchain_status[0]
             
@@ -83,30 +87,22 @@ class EducationVerificationService:
                 if gpa is not None:
                     education["actual"]["gpa"] = gpa
             
-            # Update the record
-            update_data = {
-                f"education.{education_index}": education
-            }
-            
             # Update database
-            self.db.update_verification_record(str(verification["_id"]), update_data)
+            updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
             
             # Check if all verifications are complete
-            self.status_service.update_overall_verification_status(verification)
+            self.status_service.update_overall_verification_status(updated)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "Education verification status retrieved from blockchain", updated_record
         
-        # Not in blockchain, query mock database - FIXED QUERY STRUCTURE
+        # Not in blockchain, query the university records (name ignoring case and spacing,
+        # institution as a case-insensitive substring; served from the snapshot if enabled)
         query_params = {
             "full_name": name,
             "university": institution
-            # Note: We'll do the institution comparison after fetching the record
-            # since the formats might be slightly different
         }
-        
-        # Query the university records
-        university_record = self.db.university_collection.find_one(query_params)
+        university_record = self.db.get_university_record_by_params(query_params)
         
         if university_record:
             # Record found, check if degree and institution match
@@ -114,9 +110,9 @@ class EducationVerificationService:
             db_institution = university_record.get("university", "")  # Using university field from DB
             db_gpa = university_record.get("gpa")
 
-            logger.info(f"Found university record: {university_record}")
-            logger.info(f"Comparing: DB degree '{db_degree}' with claimed '{degree}'")
-            logger.info(f"Comparing: DB institution '{db_institution}' with claimed '{institution}'")
+            logger.debug("Found university record: %s", university_record)
+            logger.debug("Comparing: DB degree '%s' with claimed '%s'", db_degree, degree)
+            logger.debug("Comparing: DB institution '%s' with claimed '%s'", db_institution, institution)
             
             # Update verification data with actual values from database
             education["actual"]["degree"] = db_degree
@@ -127,32 +123,25 @@ class EducationVerificationService:
             # Set status as SUBMITTED (waiting for admin confirmation)
             education["verified"] = VerificationState.SUBMITTED
             
-            # Update the record
-            update_data = {
-                f"education.{education_index}": education
-            }
-            
             # Update database and set overall status to PENDING
-            self.db.update_verification_record(str(verification["_id"]), update_data)
-            self.db.update_verification_record(str(verification["_id"]), {"is_verified": "PENDING"})
+            updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
+            self.status_service.set_pending(updated or verification)
             
             # Check if all verifications are complete
-            self.status_service.update_overall_verification_status(verification)
+            self.status_service.update_overall_verification_status(updated)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "Education information found in database. Awaiting verification.", updated_record
         else:
             # No record found, set to PENDING for manual verification
             education["verified"] = VerificationState.PENDING
-            update_data = {
-                f"education.{education_index}": education
-            }
-            self.db.update_verification_record(str(verification["_id"]), update_data)
-            self.db.update_verification_record(str(verification["_id"]), {"is_verified": "PENDING"})
+            updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
+            self.status_service.set_pending(updated or verification)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "No matching education records found. Awaiting manual verification.", updated_record
     
+    @tracer.traced("education.verify", ("resume_id", "education_index", "approval"))
     def verify(self, resume_id: str, education_index: int, approval: bool = True) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Verify education data against mock databases and store in blockchain.
@@ -177,17 +166,15 @@ class EducationVerificationService:
         
         # Get education data
         education = verification["education"][education_index]
+        previous_state = education["verified"]
         
         # If rejecting, mark as rejected and don't store on blockchain
         if not approval:
             education["verified"] = VerificationState.REJECTED
-            update_data = {
-                f"education.{education_index}": education
-            }
-            self.db.update_verification_record(str(verification["_id"]), update_data)
+            updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
             
             # Check if all verifications are complete and update overall status
-            self.status_service.update_overall_verification_status(verification)
+            self.status_service.update_overall_verification_status(updated)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "Education verification rejected", updated_record
@@ -216,7 +203,7 @@ class EducationVerificationService:
             # Already verified in blockchain, just update our records
             blockchain_status = self.blockchain.get_verification_status(data_hash)
             is_verified = blockchain_status["is_verified"] if isinstance(blockchain_status, dict) else blockchain_status[0]
-            logger.info(f"Verification status from blockchain: {blockchain_status}")
+            logger.debug("Verification status from blockchain: %s", blockchain_status)
             
             if is_verified:
                 # Update verification record with actual values and set as verified
@@ -227,17 +214,16 @@ class EducationVerificationService:
                     education["actual"]["gpa"] = gpa
                 
                 # Update the record in database
-                update_data = {f"education.{education_index}": education}
-                self.db.update_verification_record(str(verification["_id"]), update_data)
+                updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
                 
                 # Check if all verifications are complete and update overall status
-                self.status_service.update_overall_verification_status(verification)
+                self.status_service.update_overall_verification_status(updated)
                 
                 updated_record = self.db.get_verification_info(resume_id)
                 return True, "Education already verified in blockchain", updated_record
         
         # Store verification on blockchain (this is the manual verification by admin)
-        logger.info(f"Storing education verification on blockchain for {name}, {degree} at {institution}")
+        logger.info("Storing education verification on blockchain for %s, %s at %s", name, degree, institution)
         
         # Set the verification to verified
         education["verified"] = VerificationState.VERIFIED
@@ -257,13 +243,10 @@ class EducationVerificationService:
         )
         
         # Update the record
-        update_data = {
-            f"education.{education_index}": education
-        }
-        self.db.update_verification_record(str(verification["_id"]), update_data)
+        updated = self.status_service.update_item(verification, "education", education_index, education, previous_state)
         
         # Check if all verifications are complete and update overall status
-        self.status_service.update_overall_verification_status(verification)
+        self.status_service.update_overall_verification_status(updated)
         
         # Get updated record
         updated_record = self.db.get_verification_info(resume_id)
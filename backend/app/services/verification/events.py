@@ -0,0 +1,136 @@
+"""
+In-process publish/subscribe of verification progress, for the SSE route.
+
+VerificationStatusService publishes an "item" event for every item state
+transition and a "status" event whenever the overall status changes.
+Subscribers get them on an asyncio queue of their own event loop. Events are
+published from request threads as well as the event loop thread. A slow
+subscriber loses its oldest events instead of blocking the publisher.
+
+Events only reach subscribers of the same process; with several workers a
+client sees the progress made by the worker serving its stream.
+"""
+import os
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Set, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before the oldest ones are dropped
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+SNAPSHOT_EVENT = "snapshot"
+ITEM_EVENT = "item"
+STATUS_EVENT = "status"
+
+def snapshot_event(verification: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the current state of a verification record, sent first on every stream.
+
+    Args:
+        verification: Verification record
+
+    Returns:
+        Overall status, counters and the state of every item
+    """
+    return {
+        "resume_id": verification.get("resume_id"),
+        "is_verified": verification.get("is_verified"),
+        "pending_count": verification.get("pending_count"),
+        "verified_count": verification.get("verified_count"),
+        "total_count": verification.get("total_count"),
+        "education": [item.get("verified") for item in verification.get("education", [])],
+        "work_experience": [item.get("verified") for item in verification.get("work_experience", [])]
+    }
+
+
+class Subscription:
+    """Events of one resume for one subscriber."""
+
+    def __init__(self, bus: "VerificationEventBus", resume_id: str, max_size: int):
+        self.bus = bus
+        self.resume_id = resume_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        self.dropped = 0
+
+    def _put(self, event: Tuple[str, Dict[str, Any]]):
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Tuple[str, Dict[str, Any]]:
+        """Wait for the next (event type, data) pair."""
+        return await self.queue.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class VerificationEventBus:
+    """Fans out verification events to the subscribers of each resume."""
+
+    def __init__(self, max_size: int = EVENT_QUEUE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, resume_id: str) -> Subscription:
+        """
+        Start receiving the events of a resume. Must be called from a running event loop.
+
+        Args:
+            resume_id: Resume ID
+
+        Returns:
+            Subscription to read events from and close when done
+        """
+        subscription = Subscription(self, resume_id, self.max_size)
+        with self._lock:
+            self._subscriptions[resume_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.resume_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.resume_id]
+
+    def subscriber_count(self, resume_id: str) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(resume_id, ()))
+
+    def publish(self, resume_id: str, event_type: str, data: Dict[str, Any]):
+        """
+        Send an event to every subscriber of a resume. Safe to call from any thread.
+
+        Args:
+            resume_id: Resume ID
+            event_type: ITEM_EVENT or STATUS_EVENT
+            data: JSON-serializable event data
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(resume_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, (event_type, data))
+            except RuntimeError:
+                # The subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+
+event_bus = VerificationEventBus()
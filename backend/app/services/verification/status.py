@@ -2,69 +2,238 @@
 Verification status management service.
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.services.mock_db import MockDatabase
+from app.services.tracing import tracer
 from .common import VerificationState
+from .events import event_bus, ITEM_EVENT, STATUS_EVENT
 
 logger = logging.getLogger(__name__)
 
+# States that count towards the verified percentage
+VERIFIED_STATES = (VerificationState.VERIFIED, VerificationState.BLOCKCHAIN_VERIFIED)
+
+# Percentage of verified items required for an overall VERIFIED status
+VERIFICATION_THRESHOLD = 75
+
+# Guarded item updates retried after a concurrent change of the same item
+UPDATE_ATTEMPTS = 3
+
+def count_item_states(verification: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Count pending and verified items of a verification record.
+
+    Args:
+        verification: Verification record (or record being created)
+
+    Returns:
+        Dictionary with pending_count, verified_count and total_count
+    """
+    items = verification.get("education", []) + verification.get("work_experience", [])
+    return {
+        "pending_count": sum(1 for item in items if item["verified"] == VerificationState.PENDING),
+        "verified_count": sum(1 for item in items if item["verified"] in VERIFIED_STATES),
+        "total_count": len(items)
+    }
+
+def counter_deltas(previous_state: str, new_state: str) -> Dict[str, int]:
+    """
+    Get the counter increments for an item moving from one state to another.
+
+    Args:
+        previous_state: State stored before the change
+        new_state: State after the change
+
+    Returns:
+        Dictionary of non-zero counter increments
+    """
+    deltas = {}
+
+    pending_delta = (new_state == VerificationState.PENDING) - (previous_state == VerificationState.PENDING)
+    if pending_delta:
+        deltas["pending_count"] = pending_delta
+
+    verified_delta = (new_state in VERIFIED_STATES) - (previous_state in VERIFIED_STATES)
+    if verified_delta:
+        deltas["verified_count"] = verified_delta
+
+    return deltas
+
 class VerificationStatusService:
     """Service for managing overall verification status."""
-    
+
     def __init__(self, db: MockDatabase):
         """Initialize the verification status service."""
         self.db = db
         logger.info("VerificationStatusService initialized")
-    
-    def update_overall_verification_status(self, verification: Dict[str, Any]) -> bool:
+
+    @tracer.traced("status.update_item", ("section", "index"))
+    def update_item(
+        self,
+        verification: Dict[str, Any],
+        section: str,
+        index: int,
+        item: Dict[str, Any],
+        previous_state: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store an updated education/work experience item and keep the record counters in sync.
+
+        The counters are adjusted with $inc in the same update as the item, guarded on the
+        previously stored state so that concurrent updates cannot double count.
+
+        Args:
+            verification: Verification record the item belongs to
+            section: "education" or "work_experience"
+            index: Index of the item in the section
+            item: Updated item
+            previous_state: State of the item before it was modified
+
+        Returns:
+            The updated verification record or None if it could not be updated
+        """
+        record_id = str(verification["_id"])
+        item_path = f"{section}.{index}"
+
+        if "total_count" not in verification:
+            # Legacy record without counters: store the item and recount
+            self.db.update_verification_item(record_id, item_path, item)
+            updated = self.recount(record_id)
+            if updated:
+                self._publish_item(updated, section, index, previous_state, item["verified"])
+            return updated
+
+        expected_state = previous_state
+        for _ in range(UPDATE_ATTEMPTS):
+            updated = self.db.update_verification_item(
+                record_id,
+                item_path,
+                item,
+                expected_state=expected_state,
+                counter_deltas=counter_deltas(expected_state, item["verified"])
+            )
+            if updated:
+                self._publish_item(updated, section, index, expected_state, item["verified"])
+                return updated
+
+            # Lost a race: re-read the stored state and guard the update on it
+            current = self.db.get_verification_record(record_id)
+            try:
+                expected_state = current[section][index]["verified"]
+            except (TypeError, KeyError, IndexError):
+                logger.warning("Item %s of record %s no longer exists", item_path, record_id)
+                return None
+            logger.warning("Item %s of record %s changed concurrently to %s, retrying", item_path, record_id, expected_state)
+
+        logger.error("Item %s of record %s kept changing concurrently, not updated", item_path, record_id)
+        return None
+
+    def _publish_item(self, verification: Dict[str, Any], section: str, index: int, previous_state: str, state: str):
+        """Publish an item state transition to the subscribers of the resume."""
+        if previous_state == state:
+            return
+        event_bus.publish(verification.get("resume_id"), ITEM_EVENT, {
+            "resume_id": verification.get("resume_id"),
+            "section": section,
+            "index": index,
+            "previous_state": previous_state,
+            "state": state,
+            "pending_count": verification.get("pending_count"),
+            "verified_count": verification.get("verified_count"),
+            "total_count": verification.get("total_count")
+        })
+
+    def _set_overall_status(self, verification: Dict[str, Any], status: str) -> bool:
+        """Store the overall status and publish it if it changed."""
+        success = self.db.update_verification_record(str(verification["_id"]), {"is_verified": status})
+        if verification.get("is_verified") != status:
+            event_bus.publish(verification.get("resume_id"), STATUS_EVENT, {
+                "resume_id": verification.get("resume_id"),
+                "previous_status": verification.get("is_verified"),
+                "is_verified": status,
+                "pending_count": verification.get("pending_count"),
+                "verified_count": verification.get("verified_count"),
+                "total_count": verification.get("total_count")
+            })
+            # Later status changes of this record are published relative to this one
+            verification["is_verified"] = status
+        return success
+
+    def set_pending(self, verification: Dict[str, Any]) -> bool:
+        """
+        Set the overall status to PENDING while an item awaits confirmation.
+
+        Args:
+            verification: Verification record, as returned by update_item
+
+        Returns:
+            True if the status was stored, False otherwise
+        """
+        return self._set_overall_status(verification, "PENDING")
+
+    @tracer.traced("status.recount", ("record_id",))
+    def recount(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Recompute the counters of a record from its items.
+
+        Args:
+            record_id: Verification record ID
+
+        Returns:
+            The updated verification record or None if not found
+        """
+        verification = self.db.get_verification_record(record_id)
+        if not verification:
+            return None
+
+        counters = count_item_states(verification)
+        self.db.update_verification_record(record_id, counters)
+        verification.update(counters)
+        return verification
+
+    @tracer.traced("status.update_overall")
+    def update_overall_verification_status(self, verification: Optional[Dict[str, Any]]) -> bool:
         """
         Update the overall verification status based on individual verifications.
-        Calculate percentage of verified items and set overall status accordingly.
-        
+        Calculate percentage of verified items from the record counters and set overall status accordingly.
+
         Args:
-            verification: Verification record
-            
+            verification: Verification record, as returned by update_item
+
         Returns:
             True if all verifications are complete, False otherwise
         """
-        # First check if all items have been processed (not in PENDING state)
-        all_edu_processed = all(edu["verified"] != VerificationState.PENDING for edu in verification["education"]) if verification["education"] else True
-        all_exp_processed = all(exp["verified"] != VerificationState.PENDING for exp in verification["work_experience"]) if verification["work_experience"] else True
-        
+        if not verification:
+            return False
+
+        if "total_count" not in verification:
+            verification = self.recount(str(verification["_id"]))
+            if not verification:
+                # Deleted concurrently
+                return False
+
+        record_id = str(verification["_id"])
+        pending_count = verification["pending_count"]
+        verified_count = verification["verified_count"]
+        total_items = verification["total_count"]
+
         # If not all processed, keep status as PENDING
-        if not (all_edu_processed and all_exp_processed):
-            verification["is_verified"] = "PENDING"
-            self.db.update_verification_record(str(verification["_id"]), {"is_verified": "PENDING"})
-            logger.info(f"Some verifications still pending, keeping status as PENDING for record {verification['_id']}")
+        if pending_count > 0:
+            self._set_overall_status(verification, "PENDING")
+            logger.debug("%s verifications still pending, keeping status as PENDING for record %s", pending_count, record_id)
             return False
-        
-        # Count verified items
-        total_items = len(verification["education"]) + len(verification["work_experience"])
-        verified_count = 0
-        
-        # Count education verifications
-        for edu in verification["education"]:
-            if edu["verified"] == VerificationState.VERIFIED or edu["verified"] == VerificationState.BLOCKCHAIN_VERIFIED:
-                verified_count += 1
-        
-        # Count work experience verifications
-        for exp in verification["work_experience"]:
-            if exp["verified"] == VerificationState.VERIFIED or exp["verified"] == VerificationState.BLOCKCHAIN_VERIFIED:
-                verified_count += 1
-        
+
         # Calculate percentage
         verification_percentage = (verified_count / total_items * 100) if total_items > 0 else 0
-        logger.info(f"Verification percentage: {verification_percentage}% ({verified_count}/{total_items})")
-        
-        # Update overall status based on threshold (75%)
-        if verification_percentage >= 75:
-            verification["is_verified"] = "VERIFIED"
-            self.db.update_verification_record(str(verification["_id"]), {"is_verified": "VERIFIED"})
-            logger.info(f"Verification percentage {verification_percentage}% meets threshold, setting status to VERIFIED")
+        logger.debug("Verification percentage: %s%% (%s/%s)", verification_percentage, verified_count, total_items)
+
+        # Update overall status based on threshold
+        if verification_percentage >= VERIFICATION_THRESHOLD:
+            self._set_overall_status(verification, "VERIFIED")
+            logger.info("Verification percentage %s%% meets threshold, setting status to VERIFIED", verification_percentage)
             return True
         else:
-            verification["is_verified"] = "REJECTED"
-            self.db.update_verification_record(str(verification["_id"]), {"is_verified": "REJECTED"})
-            logger.info(f"Verification percentage {verification_percentage}% below threshold, setting status to REJECTED")
-            return False
\ No newline at end of file
+            self._set_overall_status(verification, "REJECTED")
+            logger.info("Verification percentage %s%% below threshold, setting status to REJECTED", verification_percentage)
+            return False
@@ -7,6 +7,8 @@ from typing import Dict, Any, Tuple, Optional, List
 from app.services.mock_db import MockDatabase
 from app.services.blockchain import BlockchainClient
 from app.services.oracle_simulator import OracleSimulator, VerificationType
+from app.services.tracing import tracer
+from app.utils.logging_config import SAMPLED
 from .status import VerificationStatusService
 from .common import VerificationState
 
@@ -23,6 +25,7 @@ class WorkExperienceVerificationService:
         self.status_service = VerificationStatusService(db)
         logger.info("WorkExperienceVerificationService initialized")
     
+    @tracer.traced("work_experience.check", ("resume_id", "experience_index"))
     def check_verification(self, resume_id: str, experience_index: int) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Check work experience verification against blockchain or perform verification.
@@ -34,7 +37,7 @@ class WorkExperienceVerificationService:
         Returns:
             Tuple of (success, message, data)
         """
-        logger.info(f"Starting work experience verification for resume {resume_id}, experience index {experience_index}")
+        logger.info("Starting work experience verification for resume %s, experience index %s", resume_id, experience_index, extra=SAMPLED)
         # Get verification record
         verification = self.db.get_verification_info(resume_id)
         if not verification:
@@ -46,6 +49,7 @@ class WorkExperienceVerificationService:
         
         # Get work experience data
         experience = verification["work_experience"][experience_index]
+        previous_state = experience["verified"]
         if experience["verified"] in [VerificationState.VERIFIED, VerificationState.REJECTED]:
             return True, f"Work experience already in final state: {experience['verified']}", verification
         
@@ -66,8 +70,8 @@ class WorkExperienceVerificationService:
         
         if exists:
             # Get verification status from blockchain
-            logger.info(f"Work experience verification data found on blockchain: {verification_data}")
-            logger.info(f"Data hash: {data_hash}")
+            logger.debug("Work experience verification data found on blockchain: %s", verification_data)
+            logger.debug("Data hash: %s", data_hash)
             blockchain_status = self.blockchain.get_verification_status(data_hash)
             is_verified = blockchain_status["is_verified"] if isinstance(blockchain_status, dict) else blockchain_status[0]
             
@@ -77,51 +81,23 @@ class WorkExperienceVerificationService:
                 experience["actual"]["position"] = position
                 experience["actual"]["company"] = company
             
-            # Update the record
-            update_data = {
-                f"work_experience.{experience_index}": experience
-            }
-            
             # Update database
-            result = self.db.update_verification_record(str(verification["_id"]), update_data)
-            logger.info(f"Updated verification record from blockchain: {result}")
+            updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
+            logger.debug("Updated verification record from blockchain: %s", updated is not None)
             
             # Check if all verifications are complete
-            self.status_service.update_overall_verification_status(verification)
+            self.status_service.update_overall_verification_status(updated)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "Work experience verification status retrieved from blockchain", updated_record
         
-        # Not in blockchain, try direct query first
-        logger.info(f"Querying employment records for {name} at {company}")
-        
-        # Try simple direct query first
-        direct_query = {"full_name": name, "company": company}
-        employment_records = self.db.company_collection.find(direct_query)
-        records_list = list(employment_records)
-        
-        # If no records found with direct query, try case insensitive
-        if not records_list:
-            logger.info("No exact match found, trying case insensitive search")
-            case_insensitive_query = {
-                "full_name": {"$regex": name, "$options": "i"},
-                "company": {"$regex": company, "$options": "i"}
-            }
-            employment_records = self.db.company_collection.find(case_insensitive_query)
-            records_list = list(employment_records)
-        
-        # If still no records, try partial match
-        if not records_list:
-            logger.info("No case-insensitive match found, trying partial match")
-            partial_match_query = {
-                "full_name": {"$regex": name, "$options": "i"},
-                "company": {"$regex": ".*" + company + ".*", "$options": "i"}
-            }
-            employment_records = self.db.company_collection.find(partial_match_query)
-            records_list = list(employment_records)
+        # Not in blockchain, query the employment records (name ignoring case and spacing,
+        # company as a case-insensitive substring; served from the snapshot if enabled)
+        logger.debug("Querying employment records for %s at %s", name, company)
+        records_list = self.db.get_employment_record_by_params({"full_name": name, "company": company})
         
         if records_list:
-            logger.info(f"Found {len(records_list)} employment records")
+            logger.debug("Found %s employment records", len(records_list))
             
             # Look for position match
             matched_record = None
@@ -129,20 +105,20 @@ class WorkExperienceVerificationService:
                 record_position = record.get("position", "")
                 if position.lower() in record_position.lower() or record_position.lower() in position.lower():
                     matched_record = record
-                    logger.info(f"Found matching position: {record_position}")
+                    logger.debug("Found matching position: %s", record_position)
                     break
             
             # Use the first record if no position match
             if not matched_record and records_list:
                 matched_record = records_list[0]
-                logger.info(f"Using first record as no exact position match found")
+                logger.debug("Using first record as no exact position match found")
             
             if matched_record:
                 # Update verification data with actual values
                 record_position = matched_record.get("position", "")
                 record_company = matched_record.get("company", "")
                 
-                logger.info(f"Updating actual values - Position: {record_position}, Company: {record_company}")
+                logger.debug("Updating actual values - Position: %s, Company: %s", record_position, record_company)
                 
                 experience["actual"]["position"] = record_position
                 experience["actual"]["company"] = record_company
@@ -150,37 +126,30 @@ class WorkExperienceVerificationService:
                 # Set as SUBMITTED (waiting for admin confirmation)
                 experience["verified"] = VerificationState.SUBMITTED
                 
-                # Update the record
-                update_data = {
-                    f"work_experience.{experience_index}": experience
-                }
-                
                 # Update the database record
-                result = self.db.update_verification_record(str(verification["_id"]), update_data)
-                logger.info(f"Updated work experience data: {result}")
+                updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
+                logger.debug("Updated work experience data: %s", updated is not None)
                 
                 # Set overall status to PENDING
-                pending_result = self.db.update_verification_record(str(verification["_id"]), {"is_verified": "PENDING"})
-                logger.info(f"Set overall status to PENDING: {pending_result}")
+                pending_result = self.status_service.set_pending(updated or verification)
+                logger.debug("Set overall status to PENDING: %s", pending_result)
                 
                 updated_record = self.db.get_verification_info(resume_id)
                 return True, "Work experience information fetched. Awaiting verification.", updated_record
         
         # No matching records found
-        logger.info(f"No matching employment records found for {name} at {company}")
+        logger.info("No matching employment records found for %s at %s", name, company, extra=SAMPLED)
         
         # Set to PENDING for manual verification
         experience["verified"] = VerificationState.PENDING
-        update_data = {
-            f"work_experience.{experience_index}": experience
-        }
-        self.db.update_verification_record(str(verification["_id"]), update_data)
-        pending_result = self.db.update_verification_record(str(verification["_id"]), {"is_verified": "PENDING"})
-        logger.info(f"Set status to PENDING: {pending_result}")
+        updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
+        pending_result = self.status_service.set_pending(updated or verification)
+        logger.debug("Set status to PENDING: %s", pending_result)
         
         updated_record = self.db.get_verification_info(resume_id)
         return True, "No matching employment records found. Awaiting manual verification.", updated_record
     
+    @tracer.traced("work_experience.verify", ("resume_id", "experience_index", "approval"))
     def verify(self, resume_id: str, experience_index: int, approval: bool = True) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Verify work experience data against mock databases and store in blockchain.
@@ -194,7 +163,7 @@ class WorkExperienceVerificationService:
         Returns:
             Tuple of (success, message, data)
         """
-        logger.info(f"Admin {'approving' if approval else 'rejecting'} work experience verification for resume {resume_id}, experience index {experience_index}")
+        logger.info("Admin %s work experience verification for resume %s, experience index %s", 'approving' if approval else 'rejecting', resume_id, experience_index)
         
         # Get verification record
         verification = self.db.get_verification_info(resume_id)
@@ -207,17 +176,15 @@ class WorkExperienceVerificationService:
         
         # Get work experience data
         experience = verification["work_experience"][experience_index]
+        previous_state = experience["verified"]
         
         # If rejecting, mark as rejected and don't store on blockchain
         if not approval:
             experience["verified"] = VerificationState.REJECTED
-            update_data = {
-                f"work_experience.{experience_index}": experience
-            }
-            self.db.update_verification_record(str(verification["_id"]), update_data)
+            updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
             
             # Check if all verifications are complete and update overall status
-            self.status_service.update_overall_verification_status(verification)
+            self.status_service.update_overall_verification_status(updated)
             
             updated_record = self.db.get_verification_info(resume_id)
             return True, "Work experience verification rejected", updated_record
@@ -250,17 +217,16 @@ class WorkExperienceVerificationService:
                 experience["actual"]["company"] = company
                 
                 # Update the record in database
-                update_data = {f"work_experience.{experience_index}": experience}
-                self.db.update_verification_record(str(verification["_id"]), update_data)
+                updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
                 
                 # Check if all verifications are complete and update overall status
-                self.status_service.update_overall_verification_status(verification)
+                self.status_service.update_overall_verification_status(updated)
                 
                 updated_record = self.db.get_verification_info(resume_id)
                 return True, "Work experience already verified in blockchain", updated_record
         
         # Store verification on blockchain (this is the manual verification by admin)
-        logger.info(f"Storing work experience verification on blockchain for {name}, {position} at {company}")
+        logger.info("Storing work experience verification on blockchain for %s, %s at %s", name, position, company)
         
         # Set the verification to verified
         experience["verified"] = VerificationState.VERIFIED
@@ -278,13 +244,10 @@ class WorkExperienceVerificationService:
         )
         
         # Update the record
-        update_data = {
-            f"work_experience.{experience_index}": experience
-        }
-        self.db.update_verification_record(str(verification["_id"]), update_data)
+        updated = self.status_service.update_item(verification, "work_experience", experience_index, experience, previous_state)
         
         # Check if all verifications are complete and update overall status
-        self.status_service.update_overall_verification_status(verification)
+        self.status_service.update_overall_verification_status(updated)
         
         # Get updated record
         updated_record = self.db.get_verification_info(resume_id)
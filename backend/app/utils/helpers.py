@@ -1,9 +1,10 @@
 """
 Helper utilities for the blockchain verification system.
 """
+import re
 import json
 import hashlib
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime, timezone
 
 def create_hash(data: Dict[str, Any]) -> str:
@@ -118,9 +119,40 @@ def convert_objectid(obj):
                 convert_objectid(value)
     return obj
 
+# Matches every supported GPA syntax in one pass:
+#   "CGPA: 3.73/4.0", "C-GPA 3.5", "SGPA: 3.5", "GPA of 4.2 out of 5.0", "GPA: 8.1/10", "GPA: 85%"
+# GPA is not anchored at a word start, so prefixed forms (CGPA, SGPA, ...) match too
+_GPA_PATTERN = re.compile(
+    r"""
+    (?:GPA|\bGrade\s+Point\s+Average)\b
+    \s*(?:of\b|[:=-])?\s*
+    (?P<value>\d+(?:\.\d+)?)
+    (?:
+        \s*(?P<percent>%)
+      | \s*(?:/|\bout\s+of\b)\s*(?P<scale>\d+(?:\.\d+)?)
+    )?
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Scale GPAs are normalized to
+GPA_SCALE = 4.0
+
+def _scaled_gpa(value: float, percent: Optional[str], scale: Optional[str]) -> Optional[float]:
+    """Convert a GPA given with its scale (or as a percentage) to the 4.0 scale."""
+    if percent:
+        return round(value / 100 * GPA_SCALE, 2) if value <= 100 else None
+    scale = float(scale)
+    if not scale or value > scale:
+        return None
+    return value if scale == GPA_SCALE else round(value / scale * GPA_SCALE, 2)
+
 def extract_gpa(details: str) -> Optional[float]:
     """
-    Extract GPA value from education details.
+    Extract GPA value from education details, normalized to the 4.0 scale.
+    
+    A GPA given with its scale ("3.73/4.0", "4.2 out of 5", "8.1/10", "85%") is
+    preferred over a bare one ("GPA 3.5"), which is returned as written.
     
     Args:
         details: Education details string
@@ -130,25 +162,28 @@ def extract_gpa(details: str) -> Optional[float]:
     """
     if not details:
         return None
-        
-    # Common patterns for GPA
-    gpa_patterns = [
-        r'CGPA:\s*(\d+\.\d+)/4\.0', 
-        r'C-GPA:\s*(\d+\.\d+)/4\.0',
-        r'GPA:\s*(\d+\.\d+)/4\.0',
-        r'CGPA\s*(\d+\.\d+)/4\.0',
-        r'C-GPA\s*(\d+\.\d+)/4\.0',
-        r'GPA\s*(\d+\.\d+)/4\.0',
-        r'CGPA:?\s*(\d+\.\d+)',
-        r'GPA:?\s*(\d+\.\d+)'
-    ]
-    import re
-    for pattern in gpa_patterns:
-        match = re.search(pattern, details)
-        if match:
-            try:
-                return float(match.group(1))
-            except (ValueError, IndexError):
-                continue
     
-    return None
\ No newline at end of file
+    bare_gpa = None
+    for match in _GPA_PATTERN.finditer(details):
+        value, percent, scale = match.groups()
+        if percent or scale:
+            gpa = _scaled_gpa(float(value), percent, scale)
+            if gpa is not None:
+                return gpa
+        elif bare_gpa is None and "." in value:
+            # Without a scale only decimal values count, so years and counts are not taken for GPAs
+            bare_gpa = float(value)
+    
+    return bare_gpa
+
+def extract_gpa_many(details: Iterable[str]) -> List[Optional[float]]:
+    """
+    Extract GPAs from many education details strings, e.g. for batch resume imports.
+    
+    Args:
+        details: Education details strings
+        
+    Returns:
+        Extracted GPA (or None) for each string, in order
+    """
+    return [extract_gpa(text) for text in details]
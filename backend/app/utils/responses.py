@@ -0,0 +1,81 @@
+"""
+JSON responses for MongoDB documents.
+
+Documents read from MongoDB contain BSON types (ObjectId, Decimal128, Binary)
+that the standard JSON encoder rejects. Instead of walking and rewriting every
+document before returning it, BSONResponse serializes the content once with
+orjson and converts BSON values on the fly through its default hook. datetime
+values are handled natively by orjson (ISO 8601).
+"""
+import time
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from fastapi.responses import JSONResponse
+
+from app.services.metrics import RESPONSE_SERIALIZATION
+
+def bson_default(obj: Any) -> Any:
+    """
+    Convert a value orjson cannot serialize natively.
+
+    Args:
+        obj: Value found while serializing
+
+    Returns:
+        JSON-serializable replacement
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.hex()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def encode_json(content: Any) -> bytes:
+    """
+    Serialize content containing BSON values to JSON bytes.
+
+    Args:
+        content: Dictionaries, lists and scalars, possibly read from MongoDB
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+def encode_sse(event: str, data: Any) -> bytes:
+    """
+    Encode one Server-Sent Events message with JSON data.
+
+    Args:
+        event: Event type
+        data: Event data, possibly read from MongoDB
+
+    Returns:
+        The message, terminated by a blank line
+    """
+    return b"event: " + event.encode() + b"\ndata: " + encode_json(data) + b"\n\n"
+
+
+class BSONResponse(JSONResponse):
+    """
+    JSON response that serializes MongoDB documents without converting them first.
+
+    Returning it from a route also skips response_model validation, while the
+    model is still used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = encode_json(content)
+        RESPONSE_SERIALIZATION.observe(time.perf_counter() - started)
+        return body
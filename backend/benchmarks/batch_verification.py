@@ -0,0 +1,69 @@
+"""
+Batch vs per-claim GPA verification against the reference snapshot.
+
+Loads N synthetic university records into a snapshot (mongomock) and verifies
+one claim per record, first one at a time through ReferenceSnapshot lookups (what
+OracleSimulator.verify_gpa does with REFERENCE_SNAPSHOT=1) and then with
+verify_gpa_batch. Prints a JSON report:
+
+    python -m benchmarks.batch_verification --records 1000000
+"""
+import argparse
+import json
+import random
+import time
+
+import mongomock
+
+from app.services.batch_verification import verify_gpa_batch
+from app.services.reference_snapshot import ReferenceSnapshot
+from benchmarks.snapshot_memory import university_records
+
+def per_claim(snapshot: ReferenceSnapshot, claims):
+    """Verify claims one at a time, like OracleSimulator.verify_gpa."""
+    results = []
+    for claim in claims:
+        record = snapshot.find_university_record(claim["name"], claim["university"])
+        results.append(bool(record) and abs(float(claim["gpa"]) - float(record["gpa"])) < 0.01)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    collection = mongomock.MongoClient()["university_db"]["university_records"]
+    collection.insert_many(university_records(args.records))
+    snapshot = ReferenceSnapshot(collection, mongomock.MongoClient()["company_db"]["employment_records"])
+    snapshot.load()
+
+    # Claims for every record, a quarter of them with a wrong GPA
+    rng = random.Random(7)
+    claims = [
+        {
+            "name": record["full_name"],
+            "university": record["university"].split()[-1],
+            "gpa": record["gpa"] if rng.random() < 0.75 else round(record["gpa"] + 0.3, 2)
+        }
+        for record in collection.find({}, {"full_name": 1, "university": 1, "gpa": 1})
+    ]
+
+    started = time.perf_counter()
+    expected = per_claim(snapshot, claims)
+    per_claim_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = verify_gpa_batch(snapshot.universities, claims)
+    batch_seconds = time.perf_counter() - started
+
+    assert result.verified.tolist() == expected
+
+    print(json.dumps({
+        "claims": len(claims),
+        "per_claim": {"seconds": round(per_claim_seconds, 3), "claims_per_sec": round(len(claims) / per_claim_seconds)},
+        "batch": {"seconds": round(batch_seconds, 3), "claims_per_sec": round(len(claims) / batch_seconds)},
+        "speedup": round(per_claim_seconds / batch_seconds, 1)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Client-side overhead of contract reads: web3 contract functions vs the precompiled call layer.
+
+Calls verificationExists, getVerificationStatus and getVerificationHashAtIndex
+both through contract.functions.X(...).call() and through
+app.services.contract_calls.ContractCaller, against an in-process provider that
+answers eth_call with canned return data. With no network in the way, the
+difference is the per-call cost of each path. Prints microseconds per call and
+the speedup per function:
+
+    python -m benchmarks.contract_calls --calls 20000
+"""
+import argparse
+import json
+import time
+from typing import Dict, Any, Callable, List
+
+from eth_abi import encode
+from eth_utils import function_abi_to_4byte_selector
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from app.abi import load_abi
+from app.services.contract_calls import HOT_FUNCTIONS, ContractCaller
+
+CONTRACT_ADDRESS = Web3.to_checksum_address("0x" + "42" * 20)
+ORACLE_ADDRESS = "0x" + "ab" * 20
+DATA_HASH = bytes(range(32))
+
+# Return data of each function, as the contract encodes it
+RETURN_DATA = {
+    "verificationExists": encode(["bool"], [True]),
+    "getVerificationStatus": encode(
+        ["bool", "uint8", "uint256", "address", "string"],
+        [True, 2, 1700000000, ORACLE_ADDRESS, "Verified GPA of 3.73 for Kalana De Alwis at NSBM Green University"]
+    ),
+    "getVerificationHashAtIndex": encode(["bytes32"], [DATA_HASH]),
+}
+
+# Arguments of each function
+ARGS = {
+    "verificationExists": (DATA_HASH,),
+    "getVerificationStatus": (DATA_HASH,),
+    "getVerificationHashAtIndex": (7,),
+}
+
+
+class StaticProvider(BaseProvider):
+    """Answers eth_call with the return data of the function its selector names."""
+
+    def __init__(self, abi: List[Dict[str, Any]], return_data: Dict[str, bytes] = RETURN_DATA):
+        super().__init__()
+        self.results = {
+            function_abi_to_4byte_selector(entry).hex(): "0x" + return_data[entry["name"]].hex()
+            for entry in abi
+            if entry.get("type") == "function" and entry["name"] in return_data
+        }
+        self.calls: List[Dict[str, Any]] = []
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x539"}
+        self.calls.append(params[0])
+        selector = params[0]["data"].removeprefix("0x")[:8]
+        return {"jsonrpc": "2.0", "id": 1, "result": self.results[selector]}
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+def time_per_call(call: Callable[[], Any], calls: int) -> float:
+    """Microseconds per call."""
+    call()
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - started) / calls * 10**6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    abi = load_abi()
+    provider = StaticProvider(abi)
+    contract = Web3(provider).eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, abi)
+
+    report: Dict[str, Any] = {"calls": args.calls}
+    for name in HOT_FUNCTIONS:
+        web3_us = time_per_call(lambda: contract.functions[name](*ARGS[name]).call(), args.calls)
+        compiled_us = time_per_call(lambda: caller.call(name, *ARGS[name]), args.calls)
+        report[name] = {
+            "web3_us": round(web3_us, 1),
+            "compiled_us": round(compiled_us, 1),
+            "speedup": round(web3_us / compiled_us, 1),
+        }
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
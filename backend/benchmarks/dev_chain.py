@@ -0,0 +1,133 @@
+"""
+Local development chain for the benchmarks.
+
+Starts anvil or Ganache on port 8545 (or 7545), waits for its JSON-RPC endpoint
+and deploys the Verification contract from the Truffle build artifact
+(run `npx truffle compile` in blockchain/ first). An already running node can
+be used instead by passing its URL.
+"""
+import json
+import logging
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import time
+from typing import List, Optional
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+# Truffle build artifact with the contract bytecode (the app only ships the ABI)
+ARTIFACT_PATH = os.getenv("ARTIFACT_PATH", "../blockchain/build/contracts/Verification.json")
+
+# Dev chains with unlocked, pre-funded accounts
+CHAIN_COMMANDS = {
+    "anvil": "anvil --port {port} --silent",
+    "ganache": "ganache --port {port} --wallet.deterministic --logging.quiet",
+    "npx-ganache": "npx --yes ganache --port {port} --wallet.deterministic --logging.quiet",
+}
+
+def chain_command(name: str = "auto", port: int = 8545) -> Optional[List[str]]:
+    """
+    Get the command line starting a dev chain.
+
+    Args:
+        name: anvil, ganache, npx-ganache, or auto for the first one installed
+        port: JSON-RPC port
+
+    Returns:
+        Command arguments, or None if no dev chain is installed
+    """
+    names = ["anvil", "ganache", "npx-ganache"] if name == "auto" else [name]
+    for candidate in names:
+        executable = CHAIN_COMMANDS[candidate].split()[0]
+        if shutil.which(executable):
+            return shlex.split(CHAIN_COMMANDS[candidate].format(port=port))
+    return None
+
+
+class DevChain:
+    """
+    Dev chain with a freshly deployed Verification contract.
+
+    Use as a context manager; a chain started by it is stopped on exit.
+    """
+
+    def __init__(self, url: Optional[str] = None, command: str = "auto", artifact_path: str = ARTIFACT_PATH, startup_timeout: float = 60):
+        self.url = url
+        self.command = command
+        self.artifact_path = artifact_path
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.contract_address: Optional[str] = None
+
+    def __enter__(self) -> "DevChain":
+        try:
+            with open(self.artifact_path, "r") as f:
+                artifact = json.load(f)
+        except OSError as e:
+            raise RuntimeError(f"Contract artifact not found at {self.artifact_path}, run `npx truffle compile` in blockchain/") from e
+
+        if not self.url:
+            # BlockchainClient only sends unsigned (dev) transactions to ports ending in 7545 or 8545
+            port = next((port for port in (8545, 7545) if self._port_free(port)), None)
+            if port is None:
+                raise RuntimeError("Ports 8545 and 7545 are in use, pass the URL of the running chain instead")
+            args = chain_command(self.command, port)
+            if args is None:
+                raise RuntimeError("No dev chain found, install anvil or Ganache or pass a chain URL")
+            logger.info("Starting dev chain: %s", " ".join(args))
+            self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.url = f"http://127.0.0.1:{port}"
+
+        w3 = Web3(Web3.HTTPProvider(self.url))
+        try:
+            self._wait(w3)
+            self.contract_address = self._deploy(w3, artifact)
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        logger.info("Verification contract deployed at %s on %s", self.contract_address, self.url)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    @staticmethod
+    def _port_free(port: int) -> bool:
+        with socket.socket() as sock:
+            return sock.connect_ex(("127.0.0.1", port)) != 0
+
+    def _wait(self, w3: Web3):
+        deadline = time.monotonic() + self.startup_timeout
+        while not w3.is_connected():
+            if self.process is not None and self.process.poll() is not None:
+                raise RuntimeError(f"Dev chain exited with code {self.process.returncode}")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Dev chain at {self.url} did not start within {self.startup_timeout}s")
+            time.sleep(0.2)
+
+    @staticmethod
+    def _deploy(w3: Web3, artifact) -> str:
+        account = w3.eth.accounts[0]
+        contract = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+        tx_hash = contract.constructor().transact({"from": account})
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        return receipt.contractAddress
+
+    def client_settings(self) -> dict:
+        """app.services.blockchain settings pointing at this chain."""
+        return {
+            "BLOCKCHAIN_PROVIDER": self.url,
+            "CONTRACT_ADDRESS": self.contract_address,
+            "ABI_PATH": os.path.abspath(self.artifact_path),
+        }
@@ -0,0 +1,111 @@
+"""
+Import time of the application.
+
+Imports app.main in fresh interpreters with `python -X importtime`, parses the
+per-module timings and prints a JSON report: the median total, the slowest
+top-level packages and whether modules that must stay deferred (web3,
+eth_account) were imported. Exits with status 1 when the median is over
+--budget-ms or a deferred module was imported, to guard regressions:
+
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --budget-ms 1000 --module app.main
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List, Tuple
+
+# Loaded on the first BlockchainClient or by the startup warm-up, never by importing the app
+DEFERRED_MODULES = ("web3", "eth_account")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        output: stderr of the interpreter
+
+    Returns:
+        (module, self microseconds, cumulative microseconds, nesting level) per imported module
+    """
+    modules = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    """Import a module in a fresh interpreter and get its parsed import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+def imported_by(run: List[Tuple[str, int, int, int]], module: str) -> List[Tuple[str, int, int, int]]:
+    """The timings of a module and everything it imported (children come before their parent)."""
+    end = next(i for i, (name, _, _, level) in enumerate(run) if name == module and level == 0)
+    start = end
+    while start > 0 and run[start - 1][3] > 0:
+        start -= 1
+    return run[start:end + 1]
+
+def report(runs: List[List[Tuple[str, int, int, int]]], module: str, top: int) -> Dict[str, Any]:
+    """
+    Summarize import timings of several runs.
+
+    Returns:
+        Median total, slowest packages (cumulative ms of their top-level import) and deferred modules imported
+    """
+    runs = [imported_by(run, module) for run in runs]
+    totals = [run[-1][2] for run in runs]
+    # A package's first import, at any nesting level, carries its cumulative time
+    packages: Dict[str, List[int]] = {}
+    for run in runs:
+        seen = set()
+        for name, _, cumulative, _ in run:
+            package = name.split(".")[0]
+            if package not in seen and "." not in name:
+                seen.add(package)
+                packages.setdefault(package, []).append(cumulative)
+    slowest = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))[:top]
+    imported = {name for run in runs for name, _, _, _ in run}
+    return {
+        "module": module,
+        "runs": len(runs),
+        "total_ms": round(statistics.median(totals) / 1000, 1),
+        "modules_imported": len(runs[-1]),
+        "slowest_packages_ms": {package: round(statistics.median(times) / 1000, 1) for package, times in slowest},
+        "deferred_imported": [name for name in DEFERRED_MODULES if name in imported],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median import takes longer")
+    args = parser.parse_args()
+
+    result = report([measure(args.module) for _ in range(args.runs)], args.module, args.top)
+    failures = [f"{name} was imported" for name in result["deferred_imported"]]
+    if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+        failures.append(f"import took {result['total_ms']} ms, budget {args.budget_ms} ms")
+    result["failures"] = failures
+
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
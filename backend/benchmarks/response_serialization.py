@@ -0,0 +1,120 @@
+"""
+Response serialization cost of the large listing routes.
+
+Serves the verification list and resume list routes from the app
+with stubbed services, and compares each with the previous implementation of
+the route (FastAPI's JSONResponse with response_model validation, plus the
+convert_objectid walk for resumes). Prints a JSON report:
+
+    python -m benchmarks.response_serialization --items 5000 --requests 50
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Dict, Any, List
+from unittest.mock import MagicMock
+
+from bson.objectid import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import VerificationListResponse
+from app.routes.resume_verification import get_resume_verification_service
+from app.routes.verification import get_blockchain
+from app.utils.helpers import convert_objectid
+
+def verifications(count: int) -> List[Dict[str, Any]]:
+    """Generate records shaped like BlockchainClient.get_all_verifications results."""
+    rng = random.Random(42)
+    return [
+        {
+            "data_hash": "0x" + "%064x" % rng.getrandbits(256),
+            "is_verified": rng.random() < 0.8,
+            "verification_type": "GPA",
+            "details": f"Verified GPA of {rng.uniform(2, 4):.2f} for Student {i} at University {i % 200}",
+            "timestamp": 1700000000 + i,
+            "oracle_address": "0x" + "%040x" % rng.getrandbits(160),
+        }
+        for i in range(count)
+    ]
+
+def resumes(count: int) -> List[Dict[str, Any]]:
+    """Generate verification_info documents with ObjectIds."""
+    return [
+        {
+            "_id": ObjectId(),
+            "resume_id": ObjectId(),
+            "name": f"Student {i}",
+            "email": f"student{i}@example.com",
+            "is_verified": "PENDING",
+            "education": [{"send": {"degree": "BSc in Software Engineering", "institution": "NSBM Green University", "gpa": 3.73}, "verified": "PENDING"}],
+            "work_experience": [{"send": {"position": "ML Engineer", "company": "99X Technology"}, "verified": "PENDING"}],
+        }
+        for i in range(count)
+    ]
+
+# Where the app mounts the routes (the verification router prefix is applied twice)
+LIST_PATH = app.url_path_for("list_verifications")
+RESUMES_PATH = app.url_path_for("get_all_resumes")
+
+def legacy_app(blockchain, service) -> FastAPI:
+    """The two routes as they were before the orjson response path."""
+    legacy = FastAPI()
+
+    @legacy.get(LIST_PATH, response_model=VerificationListResponse)
+    async def list_verifications():
+        records = blockchain.get_all_verifications()
+        return {"verifications": records, "total": len(records)}
+
+    @legacy.get(RESUMES_PATH, response_model=Dict[str, Any])
+    async def get_all_resumes():
+        page, next_cursor = service.get_resumes_page()
+        page = [convert_objectid(resume) for resume in page]
+        return {"success": True, "message": f"Successfully retrieved {len(page)} resumes", "data": page, "next_cursor": next_cursor}
+
+    return legacy
+
+def measure(client: TestClient, path: str, requests: int) -> Dict[str, Any]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "bytes": len(response.content)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    blockchain = MagicMock()
+    blockchain.get_all_verifications.return_value = verifications(args.items)
+    service = MagicMock()
+    # Fresh documents per request, generated up front: the legacy route mutates them
+    pages = [resumes(args.items) for _ in range(2 * args.requests)]
+    service.get_resumes_page.side_effect = lambda **kwargs: (pages.pop(), None)
+
+    app.dependency_overrides[get_blockchain] = lambda: blockchain
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    try:
+        clients = {"legacy": TestClient(legacy_app(blockchain, service)), "orjson": TestClient(app)}
+        report = {"items": args.items, "requests": args.requests}
+        for path in (LIST_PATH, RESUMES_PATH):
+            report[path] = {name: measure(client, path, args.requests) for name, client in clients.items()}
+            report[path]["speedup"] = round(report[path]["legacy"]["p50_ms"] / report[path]["orjson"]["p50_ms"], 1)
+    finally:
+        app.dependency_overrides.clear()
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+eth_call latency of the RPC provider modes.
+
+Calls Verification.verificationExists on a dev chain (see benchmarks.dev_chain)
+through each way BlockchainClient can reach the node:
+
+    http_per_client   a new HTTPProvider per call, as when every BlockchainClient built its own
+    http_pooled       the shared PooledHTTPProvider (keep-alive pool, one session for all threads)
+    websocket         the shared WebSocketRPCProvider (one persistent, multiplexed connection)
+
+with --concurrency threads, and prints p50/p95/p99 per mode. The benchmark
+suite runs the same comparison as its rpc.* flows.
+
+    python -m benchmarks.rpc_latency --calls 500 --concurrency 8
+    python -m benchmarks.rpc_latency --chain-url http://127.0.0.1:8545
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from web3 import HTTPProvider, Web3
+
+from app.services.rpc_provider import PooledHTTPProvider, WebSocketRPCProvider
+from benchmarks.dev_chain import DevChain
+
+def websocket_url(http_url: str) -> str:
+    """Ganache and anvil serve WebSocket JSON-RPC on the HTTP port."""
+    return "ws" + http_url[len("http"):] if http_url.startswith("http") else http_url
+
+def provider_modes(url: str) -> Dict[str, Tuple[bool, Callable[[], Any]]]:
+    """
+    Get the providers to compare.
+
+    Returns:
+        Mode name -> (new provider per call, provider factory)
+    """
+    return {
+        "http_per_client": (True, lambda: HTTPProvider(url)),
+        "http_pooled": (False, lambda: PooledHTTPProvider(url)),
+        "websocket": (False, lambda: WebSocketRPCProvider(websocket_url(url))),
+    }
+
+def measure(url: str, contract_address: str, abi: List[Dict[str, Any]], mode: str, calls: int, concurrency: int) -> Tuple[List[float], float, int]:
+    """
+    Run verificationExists calls through one provider mode.
+
+    Args:
+        url: HTTP URL of the chain
+        contract_address: Deployed Verification contract
+        abi: Contract ABI
+        mode: Key of provider_modes
+        calls: Number of calls
+        concurrency: Threads making calls
+
+    Returns:
+        (latency of every call in seconds, wall time, failed calls)
+    """
+    per_call, factory = provider_modes(url)[mode]
+    shared = None if per_call else factory()
+
+    def call(i: int) -> Optional[float]:
+        provider = factory() if per_call else shared
+        contract = Web3(provider).eth.contract(address=contract_address, abi=abi)
+        started = time.perf_counter()
+        try:
+            contract.functions.verificationExists(i.to_bytes(32, "big")).call()
+        except Exception:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, range(calls)))
+    finally:
+        if shared is not None:
+            shared.close()
+    seconds = time.perf_counter() - started
+    latencies = [latency for latency in results if latency is not None]
+    return latencies, seconds, len(results) - len(latencies)
+
+def main():
+    # Imported here: benchmarks.suite imports this module
+    from benchmarks.suite import summarize
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chain-url", help="Running dev chain with unlocked accounts (default: start one)")
+    parser.add_argument("--chain", default="auto", choices=["auto", "anvil", "ganache", "npx-ganache"], help="Dev chain to start")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"calls": args.calls, "concurrency": args.concurrency}
+    with DevChain(args.chain_url, args.chain) as chain:
+        with open(chain.artifact_path, "r") as f:
+            abi = json.load(f)["abi"]
+        report["chain"] = chain.url
+        for mode in provider_modes(chain.url):
+            report[mode] = summarize(*measure(chain.url, chain.contract_address, abi, mode, args.calls, args.concurrency))
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Memory footprint of the reference-record snapshot.
+
+Compares one Python dict per record (as returned by find) with the columnar
+ColumnStore, for N synthetic university records. Prints a JSON report:
+
+    python -m benchmarks.snapshot_memory --records 1000000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from typing import Dict, Any, Iterator
+
+from bson.objectid import ObjectId
+
+from app.services.record_store import ColumnStore, UNIVERSITY_COLUMNS, normalize
+
+UNIVERSITIES = [f"University {i}" for i in range(200)]
+DEGREES = [f"BSc in Subject {i}" for i in range(300)]
+
+def university_records(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Generate synthetic university records shaped like the seed data."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "_id": ObjectId(),
+            "student_id": f"U{i}",
+            "full_name": f"Student {i} {rng.choice('ABCDEFGHIJ')}",
+            "university": rng.choice(UNIVERSITIES),
+            "degree": rng.choice(DEGREES),
+            "gpa": round(rng.uniform(2.0, 4.0), 2),
+            "graduation_year": rng.randint(1990, 2025),
+        }
+
+def measure(build) -> Dict[str, Any]:
+    """Measure memory retained by the object returned by build()."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"bytes": current, "peak_bytes": peak, "seconds": round(seconds, 3)}
+
+def build_dicts(count: int):
+    """One dict per record, grouped by normalized name."""
+    by_name = {}
+    for record in university_records(count):
+        by_name.setdefault(normalize(record["full_name"]), []).append(record)
+    return by_name
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    report = {"records": args.records}
+    for name, build in (
+        ("dict_per_record", lambda: build_dicts(args.records)),
+        ("column_store", lambda: ColumnStore.build(university_records(args.records), UNIVERSITY_COLUMNS)),
+    ):
+        result = measure(build)
+        result["bytes_per_record"] = round(result["bytes"] / args.records, 1)
+        report[name] = result
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+End-to-end latency and throughput of the main API flows.
+
+Seeds N university, employment and resume records into MongoDB (the server at
+--mongo-uri, or an in-process mongomock), starts a dev chain with a freshly
+deployed Verification contract (see benchmarks.dev_chain) and drives the app
+routes through TestClient:
+
+    mock.university, mock.employment      reference record lookups (MongoDB only)
+    verification.gpa/degree/employment    POST /verification/*, oracle verification and chain write
+    verification.get/status/list          GET /verification/*
+    resume.initialize                     POST /resume-verification/initialize
+    resume.check_*, resume.verify_*       check and verify of education and work experience
+    resume.list                           GET /resume-verification/resumes, page by page
+    rpc.http_per_client/http_pooled/websocket   eth_call latency per provider mode (see benchmarks.rpc_latency)
+
+Every flow reports p50/p95/p99 latency and ops/sec. Flows that need the chain
+are reported as skipped when no chain could be started. The simulated one
+second oracle delay is left out unless --oracle-delay is given. Prints a JSON
+report, also written to --output, to compare between commits:
+
+    python -m benchmarks.suite --records 1000 --requests 100
+    python -m benchmarks.suite --chain-url http://127.0.0.1:8545 --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+import mongomock
+from bson.objectid import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+
+from app.main import app
+from app.services import blockchain, mock_db, oracle_simulator
+from app.services.mock_db import MockDatabase, with_name_key
+from benchmarks import rpc_latency
+from benchmarks.dev_chain import DevChain
+from benchmarks.snapshot_memory import university_records
+
+logger = logging.getLogger(__name__)
+
+# Databases used with --mongo-uri, dropped afterwards
+BENCHMARK_DB_NAMES = {
+    "UNIVERSITY_DB_NAME": "benchmark_university_db",
+    "COMPANY_DB_NAME": "benchmark_company_db",
+    "RESUME_DB_NAME": "benchmark_resume_rover_db",
+}
+
+COMPANIES = [f"Company {i}" for i in range(100)]
+POSITIONS = ["Software Engineer", "ML Engineer", "Data Analyst", "QA Engineer", "Product Manager"]
+
+# (method, path, keyword arguments of the TestClient request)
+Request = Tuple[str, str, Dict[str, Any]]
+
+def employment_records(students: List[Dict[str, Any]], seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Generate one employment record per student, shaped like the seed data."""
+    rng = random.Random(seed)
+    for i, student in enumerate(students):
+        yield {
+            "_id": ObjectId(),
+            "employee_id": f"E{i}",
+            "full_name": student["full_name"],
+            "company": rng.choice(COMPANIES),
+            "position": rng.choice(POSITIONS),
+            "start_date": f"{student['graduation_year']}-01-01",
+        }
+
+def parsed_resume(student: Dict[str, Any], job: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Build a parsed resume claiming the given education and employment."""
+    return {
+        "_id": ObjectId(),
+        "job_id": f"job-{index % 20}",
+        "username": f"recruiter-{index % 7}",
+        "name": student["full_name"],
+        "email": f"student{index}@example.com",
+        "phone": "",
+        "status": "parsed",
+        "ranking_score": index % 100,
+        "education": [{
+            "degree": student["degree"],
+            "institution": student["university"],
+            "details": f"GPA: {student['gpa']:.2f}/4.0",
+        }],
+        "work_experience": [{"position": job["position"], "company": job["company"]}],
+    }
+
+def seed(db: MockDatabase, records: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Insert N university, employment and resume records.
+
+    Args:
+        db: Database to seed
+        records: Number of records of each kind
+
+    Returns:
+        The inserted records by kind
+    """
+    students = list(university_records(records))
+    jobs = list(employment_records(students))
+    resumes = [parsed_resume(student, job, i) for i, (student, job) in enumerate(zip(students, jobs))]
+
+    db.university_collection.insert_many([with_name_key(student) for student in students])
+    db.company_collection.insert_many([with_name_key(job) for job in jobs])
+    db.parsed_resumes.insert_many(resumes)
+    return {"students": students, "jobs": jobs, "resumes": resumes}
+
+@contextmanager
+def mongo_backend(uri: Optional[str]) -> Iterator[str]:
+    """
+    Point MockDatabase at the benchmark databases.
+
+    Args:
+        uri: MongoDB server to use, or None for an in-process mongomock
+
+    Returns:
+        Context manager yielding a description of the backend
+    """
+    with ExitStack() as stack:
+        if uri:
+            stack.enter_context(patch.dict(os.environ, {"MONGO_URI": uri, "MONGO": uri}))
+            stack.enter_context(patch.multiple(mock_db, **BENCHMARK_DB_NAMES))
+            client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+            client.admin.command("ping")
+            for name in BENCHMARK_DB_NAMES.values():
+                client.drop_database(name)
+        else:
+            # One in-process server shared by every MockDatabase
+            shared = mongomock.MongoClient()
+            stack.enter_context(patch.object(mock_db, "get_client", lambda uri: shared))
+
+        MockDatabase._indexes_ensured = False
+        try:
+            yield uri or "mongomock"
+        finally:
+            MockDatabase._indexes_ensured = False
+            if uri:
+                for name in BENCHMARK_DB_NAMES.values():
+                    client.drop_database(name)
+                client.close()
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile of sorted values."""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def summarize(latencies: List[float], seconds: float, errors: int) -> Dict[str, Any]:
+    """
+    Summarize the latencies of one flow.
+
+    Args:
+        latencies: Latency of every request in seconds
+        seconds: Wall time of the whole flow
+        errors: Number of failed requests
+
+    Returns:
+        Dictionary with p50/p95/p99 and mean in milliseconds, ops/sec and counts
+    """
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "ops_per_sec": round(len(ordered) / seconds, 2) if seconds else None,
+    }
+
+def failed(response) -> bool:
+    """Whether a response is an HTTP error or a {"success": false} result."""
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return isinstance(body, dict) and body.get("success") is False
+    return False
+
+def run_flow(client: TestClient, requests: List[Request], on_response: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    Send requests one after the other and measure each of them.
+
+    Args:
+        client: Client of the app
+        requests: Requests to send
+        on_response: Called with every response, outside of the measured time
+
+    Returns:
+        Flow summary, see summarize
+    """
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for method, path, kwargs in requests:
+        sent = time.perf_counter()
+        response = client.request(method, path, **kwargs)
+        latencies.append(time.perf_counter() - sent)
+        errors += failed(response)
+        if on_response:
+            on_response(response)
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+def resume_pages(client: TestClient, count: int) -> Dict[str, Any]:
+    """Page through the resume list following next_cursor, starting over after the last page."""
+    path = app.url_path_for("get_all_resumes")
+    latencies = []
+    errors = 0
+    cursor = None
+    started = time.perf_counter()
+    for _ in range(count):
+        params = {"limit": 50, **({"after": cursor} if cursor else {})}
+        sent = time.perf_counter()
+        response = client.get(path, params=params)
+        latencies.append(time.perf_counter() - sent)
+        errors += failed(response)
+        cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+def rpc_flow(chain: DevChain, mode: str, calls: int, concurrency: int = 8) -> Dict[str, Any]:
+    """Measure eth_call latency through one provider mode (see benchmarks.rpc_latency)."""
+    with open(chain.artifact_path, "r") as f:
+        abi = json.load(f)["abi"]
+    return summarize(*rpc_latency.measure(chain.url, chain.contract_address, abi, mode, calls, concurrency))
+
+def flows(client: TestClient, data: Dict[str, List[Dict[str, Any]]], requests: int, list_requests: int, chain: Optional[DevChain] = None) -> List[Tuple[str, bool, Callable[[], Dict[str, Any]]]]:
+    """
+    Get the benchmarked flows in run order.
+
+    Later flows use the verifications and records created by earlier ones.
+
+    Returns:
+        List of (name, needs_chain, run)
+    """
+    students = data["students"][:requests]
+    jobs = data["jobs"][:requests]
+    resume_ids = [str(resume["_id"]) for resume in data["resumes"][:requests]]
+    data_hashes: List[str] = []
+
+    def collect_hash(response):
+        if response.status_code == 200:
+            data_hashes.append(response.json()["data_hash"])
+
+    def post(route: str, bodies, **params) -> List[Request]:
+        return [("POST", app.url_path_for(route), {"json": body, "params": params}) for body in bodies]
+
+    def get(route: str, **path_params) -> Request:
+        return ("GET", app.url_path_for(route, **path_params), {})
+
+    education = [{"resume_id": resume_id, "education_index": 0} for resume_id in resume_ids]
+    experience = [{"resume_id": resume_id, "experience_index": 0} for resume_id in resume_ids]
+
+    return [
+        ("mock.university", False, lambda: run_flow(client, [get("get_university_record", name=s["full_name"]) for s in students])),
+        ("mock.employment", False, lambda: run_flow(client, [get("get_employment_records", name=j["full_name"]) for j in jobs])),
+        ("verification.gpa", True, lambda: run_flow(client, post(
+            "verify_gpa", ({"name": s["full_name"], "university": s["university"], "gpa": s["gpa"]} for s in students)
+        ), collect_hash)),
+        ("verification.degree", True, lambda: run_flow(client, post(
+            "verify_degree", ({"name": s["full_name"], "university": s["university"], "degree": s["degree"]} for s in students)
+        ))),
+        ("verification.employment", True, lambda: run_flow(client, post(
+            "verify_employment", ({"name": j["full_name"], "company": j["company"], "job_title": j["position"]} for j in jobs)
+        ))),
+        ("verification.get", True, lambda: run_flow(client, [get("get_verification", data_hash=h) for h in data_hashes])),
+        ("verification.status", True, lambda: run_flow(client, [get("get_blockchain_status")] * requests)),
+        ("verification.list", True, lambda: run_flow(client, [get("list_verifications")] * list_requests)),
+        ("resume.initialize", True, lambda: run_flow(client, post("initialize_verification", ({"resume_id": r} for r in resume_ids)))),
+        ("resume.check_education", True, lambda: run_flow(client, post("check_education_verification", education))),
+        ("resume.verify_education", True, lambda: run_flow(client, post("verify_education", education, approval=True))),
+        ("resume.check_work_experience", True, lambda: run_flow(client, post("check_work_experience_verification", experience))),
+        ("resume.verify_work_experience", True, lambda: run_flow(client, post("verify_work_experience", experience, approval=True))),
+        ("resume.list", True, lambda: resume_pages(client, list_requests)),
+        ("rpc.http_per_client", True, lambda: rpc_flow(chain, "http_per_client", requests)),
+        ("rpc.http_pooled", True, lambda: rpc_flow(chain, "http_pooled", requests)),
+        ("rpc.websocket", True, lambda: rpc_flow(chain, "websocket", requests)),
+    ]
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1000, help="Seeded records of each kind")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per flow (at most --records)")
+    parser.add_argument("--list-requests", type=int, default=20, help="Requests of the list flows")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_TEST_URI"), help="MongoDB server (default: mongomock)")
+    parser.add_argument("--chain-url", help="Running dev chain with unlocked accounts (default: start one)")
+    parser.add_argument("--chain", default="auto", choices=["auto", "anvil", "ganache", "npx-ganache", "none"], help="Dev chain to start")
+    parser.add_argument("--oracle-delay", action="store_true", help="Keep the simulated one second oracle delay")
+    parser.add_argument("--only", help="Comma separated flow names to run")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    requests = min(args.requests, args.records)
+    only = set(args.only.split(",")) if args.only else None
+    report: Dict[str, Any] = {
+        "revision": git_revision(),
+        "records": args.records,
+        "requests": requests,
+        "oracle_delay": args.oracle_delay,
+        "flows": {}
+    }
+
+    with ExitStack() as stack:
+        report["mongo"] = stack.enter_context(mongo_backend(args.mongo_uri))
+        data = seed(MockDatabase(), args.records)
+
+        chain = None
+        chain_error = "disabled with --chain none"
+        if args.chain != "none" or args.chain_url:
+            try:
+                chain = stack.enter_context(DevChain(args.chain_url, args.chain))
+                stack.enter_context(patch.multiple(blockchain, **chain.client_settings()))
+                chain_error = None
+            except Exception as e:
+                chain_error = str(e)
+                logger.warning("Running without a chain: %s", e)
+        report["chain"] = {"skipped": chain_error} if chain_error else blockchain.BLOCKCHAIN_PROVIDER
+
+        if not args.oracle_delay:
+            stack.enter_context(patch.object(oracle_simulator, "time", SimpleNamespace(sleep=lambda seconds: None)))
+
+        client = TestClient(app)
+        for name, needs_chain, run in flows(client, data, requests, args.list_requests, chain):
+            if only and name not in only:
+                continue
+            if needs_chain and chain_error:
+                report["flows"][name] = {"skipped": "needs a chain"}
+                continue
+            report["flows"][name] = run()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
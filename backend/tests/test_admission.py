@@ -0,0 +1,101 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.resume_verification import get_resume_verification_service
+from app.services.admission import AdaptiveLimiter, OverloadedError, deadline
+from app.services.verification import ResumeVerificationService
+
+def limiter(**kwargs):
+    options = dict(initial_limit=2, min_limit=1, max_limit=4, latency_target=0.1, queue_size=1, queue_timeout=0.05, enabled=True)
+    options.update(kwargs)
+    return AdaptiveLimiter("test", **options)
+
+def test_limit_grows_while_fast_and_used():
+    backend = limiter()
+    for _ in range(5):
+        with backend.slot():
+            pass
+    # One call at a time only uses half of 2 slots, not a third of 3
+    assert backend.snapshot() == {"limit": 3, "in_flight": 0, "queued": 0}
+
+    with backend.slot(), backend.slot():
+        pass
+    assert backend.snapshot()["limit"] == 4
+
+def test_limit_backs_off_on_slow_or_failed_calls():
+    backend = limiter(initial_limit=4, backoff=0.5)
+    backend.acquire()
+    backend.release(latency=0.5)
+    assert backend.snapshot()["limit"] == 2
+
+    with pytest.raises(ValueError):
+        with backend.slot():
+            raise ValueError("node error")
+    assert backend.snapshot()["limit"] == 1
+
+def test_saturated_limiter_rejects_fast():
+    backend = limiter(initial_limit=1, max_limit=1)
+    backend.acquire()
+
+    started = time.perf_counter()
+    with pytest.raises(OverloadedError) as rejected:
+        backend.acquire()
+    assert rejected.value.reason == "timeout"
+    assert time.perf_counter() - started < 1
+
+def test_full_queue_rejects_without_waiting():
+    backend = limiter(initial_limit=1, max_limit=1, queue_timeout=5)
+    backend.acquire()
+    waiter = threading.Thread(target=backend.acquire)
+    waiter.start()
+    while backend.snapshot()["queued"] == 0:
+        time.sleep(0.001)
+
+    with pytest.raises(OverloadedError) as rejected:
+        backend.acquire()
+    assert rejected.value.reason == "queue_full"
+
+    backend.release(latency=0.0)
+    waiter.join(5)
+    assert backend.snapshot()["in_flight"] == 1
+
+def test_expired_deadline_rejects_and_disabled_limiter_admits():
+    with deadline(0):
+        with pytest.raises(OverloadedError) as rejected:
+            limiter().acquire()
+        assert rejected.value.reason == "deadline"
+
+        with limiter(enabled=False).slot():
+            pass
+
+def test_guard_wraps_calls():
+    backend = limiter()
+    assert backend.guard(lambda x: backend.snapshot()["in_flight"] + x)(1) == 2
+
+def test_route_sheds_load_with_503():
+    service = MagicMock()
+    service.get_resumes_page.side_effect = OverloadedError("mongo", "queue_full")
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    try:
+        response = TestClient(app).get("/resume-verification/resumes")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert "mongo is overloaded" in response.json()["detail"]
+
+def test_initialize_does_not_swallow_overload():
+    service = ResumeVerificationService.__new__(ResumeVerificationService)
+    service.db = MagicMock()
+    service.db.get_resume_by_id.return_value = {"name": "Kalana De Alwis", "education": [{"degree": "BSc"}]}
+    service.db.get_verification_info.side_effect = [None, {"resume_id": "1"}]
+    service.check_education_verification = MagicMock(side_effect=OverloadedError("chain", "queue_full"))
+
+    with pytest.raises(OverloadedError):
+        service.initialize_verification("1")
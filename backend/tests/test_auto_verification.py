@@ -0,0 +1,226 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson.objectid import ObjectId
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.services import auto_verification
+from app.services.admission import OverloadedError
+from app.services.auto_verification import AutoVerificationConsumer, TokenTracker
+from app.services.scheduler import PRIORITY_BULK, VerificationScheduler
+
+STREAM = "resume_rover_db.parsed_resumes"
+
+@pytest.fixture(autouse=True)
+def fast_waits(monkeypatch):
+    monkeypatch.setattr(auto_verification, "WAIT_SECONDS", 0.01)
+    monkeypatch.setattr(auto_verification, "RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(auto_verification, "MAX_RETRY_SECONDS", 0.02)
+
+@pytest.fixture
+def scheduler():
+    scheduler = VerificationScheduler(workers=4)
+    scheduler.start()
+    yield scheduler
+    scheduler.stop()
+
+@pytest.fixture
+def tokens():
+    return mongomock.MongoClient()["resume_rover_db"]["change_stream_tokens"]
+
+def insert_event(number):
+    return {"_id": {"_data": f"token-{number}"}, "operationType": "insert", "documentKey": {"_id": ObjectId()}}
+
+class FakeStream:
+    """Change stream returning the given events, then nothing."""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.reads = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def try_next(self):
+        if not self.events:
+            time.sleep(0.001)
+            return None
+        self.reads += 1
+        event = self.events.pop(0)
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+def watched(*streams):
+    collection = MagicMock()
+    collection.full_name = STREAM
+    collection.watch.side_effect = list(streams) + [FakeStream([])] * 100
+    return collection
+
+class FakeService:
+    def __init__(self, processed, gate=None, failures=None):
+        self.processed = processed
+        self.gate = gate
+        # Raised by the next calls (shared, so the test sees what is left)
+        self.failures = failures if failures is not None else []
+        self.db = MagicMock()
+        self.db.get_resume_owner.return_value = {"job_id": "job-1"}
+
+    def initialize_verification(self, resume_id):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.processed.append(resume_id)
+        return True, "Verification record created", {}
+
+    def close(self):
+        pass
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def completed(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+def test_token_is_saved_once_all_earlier_inserts_are_done(tokens):
+    tracker = TokenTracker(tokens, STREAM)
+    sequences = [tracker.add({"_data": f"token-{i}"}) for i in range(3)]
+
+    tracker.done(sequences[2])
+    assert tracker.load() is None
+
+    tracker.done(sequences[0])
+    assert tracker.load() == {"_data": "token-0"}
+
+    tracker.done(sequences[1])
+    assert tracker.load() == {"_data": "token-2"}
+
+def test_inserts_are_verified_and_the_stream_resumes_after_restart(tokens, scheduler):
+    events = [insert_event(i) for i in range(5)]
+    processed = []
+    collection = watched(FakeStream(events))
+    consumer = AutoVerificationConsumer(collection, tokens, lambda: FakeService(processed), concurrency=3, queue_size=2, scheduler=scheduler)
+
+    consumer.start()
+    wait_for(lambda: len(processed) == 5)
+    consumer.stop()
+
+    assert sorted(processed) == sorted(str(event["documentKey"]["_id"]) for event in events)
+    assert collection.watch.call_args_list[0].kwargs["resume_after"] is None
+    assert consumer.tokens.load() == {"_data": "token-4"}
+
+    restarted = watched()
+    consumer = AutoVerificationConsumer(restarted, tokens, lambda: FakeService([]), concurrency=1, scheduler=scheduler)
+    consumer.start()
+    wait_for(lambda: restarted.watch.called)
+    consumer.stop()
+    assert restarted.watch.call_args_list[0].kwargs["resume_after"] == {"_data": "token-4"}
+
+def test_stream_is_not_read_ahead_of_busy_workers(tokens, scheduler):
+    stream = FakeStream([insert_event(i) for i in range(20)])
+    gate = threading.Event()
+    processed = []
+    consumer = AutoVerificationConsumer(watched(stream), tokens, lambda: FakeService(processed, gate), concurrency=1, queue_size=1, scheduler=scheduler)
+
+    consumer.start()
+    time.sleep(0.2)
+    # One resume in the worker, one in the queue and one waiting to be queued
+    assert stream.reads == 3
+    gate.set()
+    wait_for(lambda: len(processed) == 20)
+    consumer.stop()
+
+def test_lost_history_restarts_from_now(tokens, scheduler):
+    tokens.insert_one({"_id": STREAM, "token": {"_data": "expired"}})
+    collection = watched(FakeStream([OperationFailure("history lost", code=286)]))
+    consumer = AutoVerificationConsumer(collection, tokens, lambda: FakeService([]), concurrency=1, scheduler=scheduler)
+
+    consumer.start()
+    wait_for(lambda: collection.watch.call_count >= 2)
+    consumer.stop()
+
+    assert [call.kwargs["resume_after"] for call in collection.watch.call_args_list[:2]] == [{"_data": "expired"}, None]
+    assert consumer.tokens.load() is None
+
+def test_resumes_are_scheduled_as_bulk_work_under_their_fairness_key(tokens):
+    event = insert_event(0)
+    scheduler = MagicMock()
+    scheduler.submit.side_effect = lambda function, *args, **kwargs: completed(function(*args))
+    processed = []
+    consumer = AutoVerificationConsumer(watched(FakeStream([event])), tokens, lambda: FakeService(processed), concurrency=1, scheduler=scheduler)
+
+    consumer.start()
+    wait_for(lambda: consumer.tokens.load() is not None)
+    consumer.stop()
+
+    assert processed == [str(event["documentKey"]["_id"])]
+    assert scheduler.submit.call_args.kwargs == {"key": "job-1", "priority": PRIORITY_BULK}
+
+def test_transient_failures_are_retried_before_the_token_moves(tokens, scheduler):
+    processed = []
+    failures = [OverloadedError("mongo", "queue full"), AutoReconnect("primary stepped down")]
+    consumer = AutoVerificationConsumer(
+        watched(FakeStream([insert_event(0)])), tokens, lambda: FakeService(processed, failures=failures),
+        concurrency=1, scheduler=scheduler
+    )
+
+    consumer.start()
+    wait_for(lambda: consumer.tokens.load() is not None)
+    consumer.stop()
+
+    assert len(processed) == 1
+    assert failures == []
+
+def test_resume_failing_until_stop_is_delivered_again(tokens, scheduler):
+    failures = [AutoReconnect("down")] * 1000
+    consumer = AutoVerificationConsumer(
+        watched(FakeStream([insert_event(0)])), tokens, lambda: FakeService([], failures=failures),
+        concurrency=1, scheduler=scheduler
+    )
+
+    consumer.start()
+    wait_for(lambda: len(failures) < 998)
+    consumer.stop()
+
+    assert consumer.tokens.load() is None
+
+def test_permanent_errors_do_not_block_the_stream(tokens, scheduler):
+    consumer = AutoVerificationConsumer(
+        watched(FakeStream([insert_event(0)])), tokens, lambda: FakeService([], failures=[KeyError("name")]),
+        concurrency=1, scheduler=scheduler
+    )
+
+    consumer.start()
+    wait_for(lambda: consumer.tokens.load() is not None)
+    consumer.stop()
+
+def test_stop_does_not_wait_for_running_jobs(tokens, scheduler):
+    gate = threading.Event()
+    processed = []
+    consumer = AutoVerificationConsumer(
+        watched(FakeStream([insert_event(0)])), tokens, lambda: FakeService(processed, gate),
+        concurrency=1, scheduler=scheduler
+    )
+
+    consumer.start()
+    # The worker is waiting for the job held at the gate
+    time.sleep(0.1)
+    started = time.perf_counter()
+    consumer.stop()
+    gate.set()
+
+    assert time.perf_counter() - started < 1
+    assert consumer.tokens.load() is None
@@ -0,0 +1,124 @@
+import mongomock
+import pytest
+
+from app.services import batch_verification, record_store
+from app.services.batch_verification import (
+    STATUS_MISMATCH,
+    STATUS_MISSING_FIELDS,
+    STATUS_NOT_FOUND,
+    STATUS_VERIFIED,
+    verify_degree_batch,
+    verify_gpa_batch
+)
+from app.services.mock_db import MockDatabase, with_name_key
+from app.services.oracle_simulator import OracleSimulator
+from app.services.reference_snapshot import RecordSnapshot
+from app.services.record_store import UNIVERSITY_COLUMNS
+
+@pytest.fixture
+def snapshot():
+    collection = mongomock.MongoClient()["university_db"]["university_records"]
+    collection.insert_many([
+        {"full_name": "Kalana De Alwis", "university": "University of Colombo", "degree": "MSc in Computer Science", "gpa": 3.9},
+        {"full_name": "Kalana De Alwis", "university": "NSBM Green University", "degree": "BSc in Software Engineering", "gpa": 3.73},
+        {"full_name": "Nadeesha Alwis", "university": "NSBM Green University", "degree": "BSc in Data Science", "gpa": 3.1},
+        {"full_name": "Shehani Jayawardena", "university": "SLIIT", "degree": "BSc in IT"},
+    ])
+    snapshot = RecordSnapshot(collection, UNIVERSITY_COLUMNS)
+    snapshot.load()
+    return snapshot
+
+def test_verify_gpa_batch(snapshot):
+    result = verify_gpa_batch(snapshot, [
+        {"name": "kalana de alwis", "university": "nsbm", "gpa": 3.73},
+        {"name": "Kalana De Alwis", "university": "Colombo", "gpa": "3.9"},
+        {"name": "Nadeesha Alwis", "university": "NSBM", "gpa": 3.5},
+        {"name": "Nadeesha Alwis", "university": "SLIIT", "gpa": 3.1},
+        {"name": "Shehani Jayawardena", "university": "SLIIT", "gpa": 3.0},
+        {"name": "Unknown Person", "university": "NSBM", "gpa": 3.0},
+        {"name": "Kalana De Alwis", "university": "NSBM"},
+    ])
+
+    assert result.verified.tolist() == [True, True, False, False, False, False, False]
+    assert result.status.tolist() == [
+        STATUS_VERIFIED, STATUS_VERIFIED, STATUS_MISMATCH, STATUS_NOT_FOUND,
+        STATUS_MISMATCH, STATUS_NOT_FOUND, STATUS_MISSING_FIELDS
+    ]
+    assert result.details[0] == "Verified GPA of 3.73 for kalana de alwis at nsbm"
+    assert result.details[2] == "GPA mismatch for Nadeesha Alwis at NSBM. Claimed: 3.5, Actual: 3.1"
+    assert result.details[3] == "No records found for Nadeesha Alwis at SLIIT"
+    assert result.details[6] == "Missing required fields (name, university, gpa)"
+
+def test_verify_degree_batch(snapshot):
+    result = verify_degree_batch(snapshot, [
+        {"name": "Kalana De Alwis", "university": "NSBM", "degree": "bsc in software engineering"},
+        {"name": "Kalana De Alwis", "university": "Colombo", "degree": "BSc in Software Engineering"},
+        {"name": "Nadeesha Alwis", "university": "NSBM", "degree": "Unknown Degree"},
+    ])
+
+    assert result.verified.tolist() == [True, False, False]
+    assert result.results()[0] == (True, "Verified BSc in Software Engineering degree for Kalana De Alwis at NSBM")
+    assert result.actual[1] == "MSc in Computer Science"
+
+def test_batch_sees_changes_after_load(snapshot):
+    kalana = snapshot.collection.find_one({"university": "NSBM Green University"})
+    snapshot.upsert({**kalana, "gpa": 3.8})
+    snapshot.upsert({"_id": "new", "full_name": "Nimal Perera", "university": "SLIIT", "degree": "BSc in IT", "gpa": 2.9})
+
+    result = verify_gpa_batch(snapshot, [
+        {"name": "Kalana De Alwis", "university": "NSBM", "gpa": 3.8},
+        {"name": "Nimal Perera", "university": "SLIIT", "gpa": 2.9},
+        {"name": "Kalana De Alwis", "university": "Colombo", "gpa": 3.9},
+    ])
+
+    assert result.verified.tolist() == [True, True, True]
+
+def test_colliding_names_do_not_match(snapshot, monkeypatch):
+    # Every name hashes to the same key
+    for module in (record_store, batch_verification):
+        monkeypatch.setattr(module, "hash", lambda name: 7, raising=False)
+    snapshot.load()
+
+    result = verify_gpa_batch(snapshot, [
+        {"name": "Nadeesha Alwis", "university": "NSBM", "gpa": 3.1},
+        {"name": "Shehani Jayawardena", "university": "NSBM", "gpa": 3.1},
+        {"name": "Kalana De Alwis", "university": "Colombo", "gpa": 3.9},
+    ])
+
+    assert result.status.tolist() == [STATUS_VERIFIED, STATUS_NOT_FOUND, STATUS_VERIFIED]
+
+def test_oracle_batches_without_the_snapshot(snapshot, monkeypatch):
+    db = MockDatabase.__new__(MockDatabase)
+    db.university_collection = snapshot.collection
+    db.snapshot = None
+    for record in db.university_collection.find():
+        db.university_collection.replace_one({"_id": record["_id"]}, with_name_key(record))
+    oracle = OracleSimulator.__new__(OracleSimulator)
+    oracle.db = db
+    monkeypatch.setattr("app.services.mock_db.NAME_LOOKUP_BATCH_SIZE", 1)
+
+    result = oracle.verify_gpa_batch([
+        {"name": "kalana de alwis", "university": "nsbm", "gpa": 3.73},
+        {"name": "Nadeesha Alwis", "university": "NSBM", "gpa": 3.5},
+        {"name": "Unknown Person", "university": "NSBM", "gpa": 3.0},
+    ])
+
+    assert result.status.tolist() == [STATUS_VERIFIED, STATUS_MISMATCH, STATUS_NOT_FOUND]
+
+def test_gpa_tolerance_boundary_matches_the_single_claim_path(snapshot):
+    db = MockDatabase.__new__(MockDatabase)
+    db.university_collection = snapshot.collection
+    db.snapshot = None
+    for record in db.university_collection.find():
+        db.university_collection.replace_one({"_id": record["_id"]}, with_name_key(record))
+    oracle = OracleSimulator.__new__(OracleSimulator)
+    oracle.db = db
+    claims = [{"name": "Kalana De Alwis", "university": "NSBM", "gpa": gpa} for gpa in (3.72, 3.725, 3.73, 3.735, 3.74)]
+
+    batch = verify_gpa_batch(snapshot, claims)
+
+    assert batch.verified.tolist() == [oracle.verify_gpa(claim)[0] for claim in claims]
+    assert batch.verified.tolist() == [True, True, True, True, False]
+
+def test_empty_batch(snapshot):
+    assert len(verify_gpa_batch(snapshot, [])) == 0
@@ -0,0 +1,103 @@
+import pytest
+from web3 import Web3
+from web3.exceptions import ContractLogicError, Web3RPCError
+
+from app.abi import load_abi
+from app.services.blockchain import BlockchainClient
+from app.services.contract_calls import ContractCaller
+from benchmarks.contract_calls import ARGS, CONTRACT_ADDRESS, DATA_HASH, ORACLE_ADDRESS, StaticProvider
+
+@pytest.fixture
+def provider():
+    return StaticProvider(load_abi())
+
+def test_call_data_matches_web3(provider):
+    contract = Web3(provider).eth.contract(address=CONTRACT_ADDRESS, abi=load_abi())
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    for name, args in ARGS.items():
+        caller.call(name, *args)
+        contract.functions[name](*args).call()
+        compiled, web3_call = provider.calls[-2:]
+        assert compiled["data"] == web3_call["data"]
+        assert compiled["to"] == web3_call["to"]
+
+def test_results_match_web3(provider):
+    contract = Web3(provider).eth.contract(address=CONTRACT_ADDRESS, abi=load_abi())
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    assert caller.call("verificationExists", DATA_HASH) == (contract.functions.verificationExists(DATA_HASH).call(),)
+    assert caller.call("getVerificationStatus", DATA_HASH) == tuple(contract.functions.getVerificationStatus(DATA_HASH).call())
+    assert caller.call("getVerificationHashAtIndex", 7) == (contract.functions.getVerificationHashAtIndex(7).call(),)
+    assert caller.call("getVerificationStatus", DATA_HASH)[3] == Web3.to_checksum_address(ORACLE_ADDRESS)
+
+def test_revert_raises_contract_logic_error(provider):
+    provider.make_request = lambda method, params: {
+        "jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted: No verification record found"}
+    }
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    with pytest.raises(ContractLogicError, match="No verification record found"):
+        caller.call("getVerificationStatus", DATA_HASH)
+
+def test_error_message_without_an_object_raises_contract_logic_error(provider):
+    provider.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1, "error": "execution reverted"}
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    with pytest.raises(ContractLogicError, match="execution reverted"):
+        caller.call("verificationExists", DATA_HASH)
+
+def test_revert_data_raises_contract_logic_error(provider):
+    provider.make_request = lambda method, params: {
+        "jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "VM error", "data": "0x08c379a0" + "00" * 64}
+    }
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    with pytest.raises(ContractLogicError):
+        caller.call("verificationExists", DATA_HASH)
+
+@pytest.mark.parametrize("error", [
+    {"code": -32000, "message": "header not found"},
+    {"code": 429, "message": "Too Many Requests"},
+    "request timed out",
+])
+def test_node_errors_are_not_reverts(provider, error):
+    provider.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1, "error": error}
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+
+    with pytest.raises(Web3RPCError) as raised:
+        caller.call("getVerificationStatus", DATA_HASH)
+    assert not isinstance(raised.value, ContractLogicError)
+
+def test_functions_without_arguments_compile(provider):
+    caller = ContractCaller(provider, CONTRACT_ADDRESS, load_abi(), names=("getVerificationCount",))
+
+    assert caller.functions["getVerificationCount"].encode(()) == "0x" + caller.functions["getVerificationCount"].selector.hex()
+
+def test_client_keeps_its_result_shapes(provider):
+    client = BlockchainClient.__new__(BlockchainClient)
+    client.w3 = Web3(provider)
+    client.calls = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+    data_hash = DATA_HASH.hex()
+
+    assert client.verification_exists(data_hash) is True
+    assert client.get_verification_status(data_hash) == {
+        "is_verified": True,
+        "verification_type": "DEGREE",
+        "timestamp": 1700000000,
+        "oracle_address": Web3.to_checksum_address(ORACLE_ADDRESS),
+        "details": "Verified GPA of 3.73 for Kalana De Alwis at NSBM Green University"
+    }
+
+def test_client_passes_node_errors_through(provider):
+    client = BlockchainClient.__new__(BlockchainClient)
+    client.w3 = Web3(provider)
+    client.calls = ContractCaller(provider, CONTRACT_ADDRESS, load_abi())
+    provider.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}}
+
+    assert client.get_verification_status(DATA_HASH.hex()) is None
+
+    provider.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "header not found"}}
+
+    with pytest.raises(Web3RPCError):
+        client.get_verification_status(DATA_HASH.hex())
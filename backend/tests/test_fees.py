@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+
+from web3.exceptions import TransactionNotFound
+
+from app.services.fees import FeePolicy, TransactionMonitor
+from app.services.metrics import CHAIN_TX_REVERTS
+
+GWEI = 10**9
+
+def chain(base_fees=(10 * GWEI, 12 * GWEI), tips=(1 * GWEI, 2 * GWEI, 3 * GWEI), gas_price=20 * GWEI):
+    w3 = MagicMock()
+    w3.eth.fee_history.return_value = {"baseFeePerGas": list(base_fees), "reward": [[tip] for tip in tips]}
+    w3.eth.gas_price = gas_price
+    return w3
+
+def test_gas_is_estimated_once_per_call_shape_with_margin():
+    policy = FeePolicy(margin=1.2)
+    estimate = MagicMock(return_value=100000)
+
+    assert policy.gas_limit(("requestVerification", 0), estimate) == 120000
+    assert policy.gas_limit(("requestVerification", 0), estimate) == 120000
+    assert estimate.call_count == 1
+
+    policy.gas_limit(("requestVerification", 2), estimate)
+    assert estimate.call_count == 2
+
+def test_state_dependent_gas_is_estimated_every_call():
+    policy = FeePolicy(margin=1.2)
+    estimate = MagicMock(side_effect=[150000, 60000])
+
+    assert policy.gas_limit(None, estimate) == 180000
+    assert policy.gas_limit(None, estimate) == 72000
+
+def test_fee_fields_follow_fee_history():
+    fields = FeePolicy(base_multiplier=2).fee_fields(chain())
+
+    assert fields == {"maxPriorityFeePerGas": 2 * GWEI, "maxFeePerGas": 2 * 12 * GWEI + 2 * GWEI}
+
+def test_legacy_gas_price_without_base_fee():
+    w3 = chain(base_fees=(0, 0))
+    assert FeePolicy().fee_fields(w3) == {"gasPrice": 20 * GWEI}
+
+    w3.eth.fee_history.side_effect = ValueError("method not found")
+    assert FeePolicy().fee_fields(w3) == {"gasPrice": 20 * GWEI}
+
+def test_fees_are_capped():
+    fields = FeePolicy(max_fee=5 * GWEI).fee_fields(chain())
+
+    assert fields["maxFeePerGas"] == 5 * GWEI
+    assert fields["maxPriorityFeePerGas"] == 2 * GWEI
+
+def test_stuck_transaction_is_replaced_with_the_same_nonce():
+    w3 = chain()
+    w3.eth.get_transaction_receipt.side_effect = TransactionNotFound("pending")
+    w3.eth.get_transaction_count.return_value = 7
+    send = MagicMock(return_value="0xreplacement")
+    monitor = TransactionMonitor(FeePolicy(), stuck_seconds=0)
+    tx = {"from": "0xabc", "nonce": 7, "gas": 50000, "maxFeePerGas": 40 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}
+
+    monitor.track(w3, tx, send, "0xoriginal")
+    monitor.check()
+    monitor.stop()
+
+    replacement = send.call_args[0][0]
+    assert replacement["nonce"] == 7
+    assert replacement["maxFeePerGas"] >= 40 * GWEI * 1.125
+    assert replacement["maxPriorityFeePerGas"] >= 2 * GWEI * 1.125
+    assert monitor.pending() == ["0xreplacement"]
+
+def test_mined_transaction_is_forgotten():
+    w3 = chain()
+    send = MagicMock()
+    monitor = TransactionMonitor(FeePolicy(), stuck_seconds=0)
+
+    monitor.track(w3, {"from": "0xabc", "nonce": 1, "gasPrice": GWEI}, send, "0xmined")
+    monitor.check()
+    monitor.stop()
+
+    send.assert_not_called()
+    assert monitor.pending() == []
+
+def test_reverted_transaction_is_counted_and_forgotten():
+    w3 = chain()
+    w3.eth.get_transaction_receipt.return_value = {"status": 0}
+    monitor = TransactionMonitor(FeePolicy(), stuck_seconds=0)
+    reverts = CHAIN_TX_REVERTS._values.get((), 0)
+
+    monitor.track(w3, {"from": "0xabc", "nonce": 2, "gasPrice": GWEI}, MagicMock(), "0xreverted")
+    monitor.check()
+    monitor.stop()
+
+    assert CHAIN_TX_REVERTS._values[()] == reverts + 1
+    assert monitor.pending() == []
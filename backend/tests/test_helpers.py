@@ -0,0 +1,31 @@
+import pytest
+
+from app.utils.helpers import extract_gpa, extract_gpa_many
+
+@pytest.mark.parametrize("details, expected", [
+    ("CGPA: 3.73/4.0", 3.73),
+    ("C-GPA: 3.5/4.0", 3.5),
+    ("GPA 3.2/4.0", 3.2),
+    ("CGPA 3.67", 3.67),
+    ("Graduated with GPA: 3.1 (First Class)", 3.1),
+    ("gpa=3.90", 3.9),
+    ("GPA of 4.2 out of 5.0", 3.36),
+    ("GPA: 8.1/10", 3.24),
+    ("GPA: 85%", 3.4),
+    ("GPA: 150%", None),
+    ("SGPA: 3.5", 3.5),
+    ("Grade Point Average: 3.6/4.0", 3.6),
+    ("Graduated 2019, GPA 4", None),
+    ("GPA: 5.2/4.0", None),
+    ("Final year project on blockchain", None),
+    ("", None),
+    (None, None),
+])
+def test_extract_gpa(details, expected):
+    assert extract_gpa(details) == expected
+
+def test_extract_gpa_prefers_value_with_scale():
+    assert extract_gpa("GPA 3.1 in the first year, CGPA: 3.4/4.0 overall") == 3.4
+
+def test_extract_gpa_many():
+    assert extract_gpa_many(["CGPA: 3.73/4.0", "no gpa here", "GPA: 9/10"]) == [3.73, None, 3.6]
@@ -0,0 +1,177 @@
+"""
+Explain-plan regression tests for the MockDatabase indexes.
+
+The plan tests need a real MongoDB server (mongomock has no query planner).
+Point MONGO_TEST_URI at a disposable server; they are skipped if none is
+reachable. The name lookup key tests run against mongomock.
+"""
+import os
+import mongomock
+import pytest
+from unittest.mock import MagicMock, patch
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.services import mock_db
+from app.services.mock_db import NAME_KEY_FIELD, MockDatabase, with_name_key
+from app.services.seed_loader import backfill_name_keys
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+UNIVERSITY_RECORDS = [
+    {"full_name": "Kalana De Alwis", "university": "NSBM Green University", "gpa": 3.73},
+    {"full_name": "Nadeesha Alwis", "university": "University of Colombo", "gpa": 3.4},
+]
+EMPLOYMENT_RECORDS = [
+    {"full_name": "Shehani Jayawardena", "company": "99X Technology", "position": "Software Engineer"},
+    {"full_name": "Kalana De Alwis", "company": "WSO2", "position": "Intern"},
+]
+TEST_DB_NAMES = {
+    "UNIVERSITY_DB_NAME": "index_test_university_db",
+    "COMPANY_DB_NAME": "index_test_company_db",
+    "RESUME_DB_NAME": "index_test_resume_rover_db",
+}
+
+def plan_stages(plan):
+    """Collect all stage names of an explain plan tree."""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+def winning_stages(cursor):
+    return plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+
+def issued_filter(collection, method, call):
+    """Run call and get the filter it passed to collection.<method>."""
+    with patch.object(collection, method, wraps=getattr(collection, method)) as spy:
+        call()
+    return spy.call_args.args[0]
+
+@pytest.fixture(scope="module")
+def db():
+    client = MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No MongoDB server reachable at {MONGO_TEST_URI}")
+
+    env = {"MONGO_URI": MONGO_TEST_URI, "MONGO": MONGO_TEST_URI}
+    with patch.dict(os.environ, env), patch.multiple(mock_db, **TEST_DB_NAMES):
+        MockDatabase._indexes_ensured = False
+        database = MockDatabase()
+
+    database.verification_info.insert_many([
+        {
+            "resume_id": str(i),
+            "job_id": f"job-{i % 10}",
+            "username": f"user-{i % 7}",
+            "is_verified": ["PENDING", "VERIFIED", "REJECTED"][i % 3],
+        }
+        for i in range(500)
+    ])
+    database.university_collection.insert_many([with_name_key(dict(record)) for record in UNIVERSITY_RECORDS])
+    database.company_collection.insert_many([with_name_key(dict(record)) for record in EMPLOYMENT_RECORDS])
+
+    yield database
+
+    database.close()
+    for name in TEST_DB_NAMES.values():
+        client.drop_database(name)
+    client.close()
+    MockDatabase._indexes_ensured = False
+
+def test_resume_id_lookup_uses_index(db):
+    stages = winning_stages(db.verification_info.find({"resume_id": "42"}).limit(1))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+def test_resume_id_is_unique(db):
+    assert db.create_verification_record({"resume_id": "42"}) is None
+
+def test_job_id_and_status_listing_uses_index(db):
+    cursor = db.find_verification_records(filters={"job_id": "job-3", "is_verified": "VERIFIED"}, limit=20)
+    stages = winning_stages(cursor)
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert "SORT" not in stages
+
+def test_status_listing_uses_index(db):
+    stages = winning_stages(db.find_verification_records(filters={"is_verified": "PENDING"}, limit=20))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+def test_username_lookup_uses_index(db):
+    stages = winning_stages(db.verification_info.find({"username": "user-3"}))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+def test_university_record_lookup_uses_index(db):
+    params = {"name": "kalana  de alwis", "university": "nsbm"}
+    query = issued_filter(db.university_collection, "find_one", lambda: db.get_university_record_by_params(params))
+
+    stages = winning_stages(db.university_collection.find(query))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert db.get_university_record_by_params(params)["gpa"] == 3.73
+
+def test_employment_record_lookup_uses_index(db):
+    params = {"name": "Shehani Jayawardena", "company": "99x", "job_title": "engineer"}
+    query = issued_filter(db.company_collection, "find", lambda: db.get_employment_record_by_params(params))
+
+    stages = winning_stages(db.company_collection.find(query))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert [record["company"] for record in db.get_employment_record_by_params(params)] == ["99X Technology"]
+
+# Against the real server: mongomock's bulk_write does not accept pymongo 4 UpdateOne operations
+def test_backfill_sets_the_name_key(db):
+    db.university_collection.insert_many([{"full_name": " Imported  Before"}, {"full_name": "Also Imported Before"}])
+
+    assert backfill_name_keys(db.university_collection, batch_size=1) == 2
+    assert backfill_name_keys(db.university_collection) == 0
+    assert db.get_university_record_by_params({"name": "imported before"})["full_name"] == " Imported  Before"
+
+@pytest.fixture
+def mock():
+    database = MockDatabase.__new__(MockDatabase)
+    client = mongomock.MongoClient()
+    database.university_collection = client["university_db"]["university_records"]
+    database.company_collection = client["company_db"]["employment_records"]
+    database.snapshot = None
+    return database
+
+def test_name_lookups_ignore_case_and_spacing(mock):
+    mock.university_collection.insert_many([with_name_key(dict(record)) for record in UNIVERSITY_RECORDS])
+    mock.company_collection.insert_many([with_name_key(dict(record)) for record in EMPLOYMENT_RECORDS])
+
+    assert mock.get_university_record_by_params({"name": " KALANA de  Alwis", "university": "green"})["gpa"] == 3.73
+    assert mock.get_university_record_by_params({"full_name": "Kalana De Alwis", "university": "Colombo"}) is None
+    assert [r["company"] for r in mock.get_employment_record_by_params({"name": "kalana de alwis"})] == ["WSO2"]
+
+def test_name_lookups_match_the_whole_name(mock):
+    mock.university_collection.insert_many([with_name_key(dict(record)) for record in UNIVERSITY_RECORDS])
+    mock.company_collection.insert_many([with_name_key(dict(record)) for record in EMPLOYMENT_RECORDS])
+
+    # Names are matched exactly (and never interpreted as a regex), like the snapshot does
+    assert mock.get_university_record_by_params({"name": "Alwis"}) is None
+    assert mock.get_employment_record_by_params({"name": "Shehani"}) == []
+    assert mock.get_employment_record_by_params({"name": ".*"}) == []
+
+def test_substring_filters_are_not_patterns(mock):
+    mock.university_collection.insert_one(with_name_key({"full_name": "Kalana De Alwis", "university": "University of Moratuwa (UoM)"}))
+    mock.company_collection.insert_one(with_name_key({"full_name": "Kalana De Alwis", "company": "C++ Labs", "position": "Engineer"}))
+
+    assert mock.get_university_record_by_params({"name": "Kalana De Alwis", "university": "moratuwa (uom)"}) is not None
+    assert [r["company"] for r in mock.get_employment_record_by_params({"name": "Kalana De Alwis", "company": "c++"})] == ["C++ Labs"]
+    assert mock.get_employment_record_by_params({"name": "Kalana De Alwis", "company": ".*"}) == []
+
+def test_failed_index_creation_is_not_retried_per_instance(mock, monkeypatch):
+    monkeypatch.setattr(MockDatabase, "_indexes_ensured", False)
+    mock.verification_info = MagicMock()
+    mock.verification_info.create_indexes.side_effect = PyMongoError("duplicate key")
+
+    assert mock.ensure_indexes() is False
+    assert MockDatabase._indexes_ensured is True
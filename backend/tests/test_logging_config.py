@@ -0,0 +1,46 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+from app.utils.logging_config import SAMPLED, JsonFormatter, SamplingFilter, configure_logging, stop_logging
+
+def make_record(level=logging.INFO, extra=None):
+    record = logging.LogRecord("app.test", level, __file__, 1, "Verified %s for %s", ("GPA", "Kalana De Alwis"), None)
+    for key, value in (extra or {}).items():
+        setattr(record, key, value)
+    return record
+
+def test_sampling_filter_only_drops_sampled_records():
+    never = SamplingFilter(0)
+    assert never.filter(make_record())
+    assert not never.filter(make_record(extra=SAMPLED))
+    assert never.filter(make_record(logging.WARNING, extra=SAMPLED))
+    assert SamplingFilter(1).filter(make_record(extra=SAMPLED))
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record(extra={"resume_id": "64b7f0c2", **SAMPLED})))
+
+    assert entry["message"] == "Verified GPA for Kalana De Alwis"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["resume_id"] == "64b7f0c2"
+    assert "sampled" not in entry
+
+def test_configure_logging_writes_through_queue(capsys):
+    root = logging.getLogger()
+    level = root.level
+    configure_logging(level="INFO", log_format="json", sample_rate=0)
+    try:
+        logger = logging.getLogger("app.test")
+        logger.info("Kept %s", 1)
+        logger.info("Dropped %s", 2, extra=SAMPLED)
+        logger.debug("Below level")
+        stop_logging()
+
+        lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+        assert [line["message"] for line in lines] == ["Kept 1"]
+    finally:
+        stop_logging()
+        for handler in [handler for handler in root.handlers if isinstance(handler, QueueHandler)]:
+            root.removeHandler(handler)
+        root.setLevel(level)
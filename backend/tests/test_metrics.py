@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.metrics import Counter, Histogram, Registry, StageMetrics
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("query_seconds", "Query latency", ("method",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, method="find")
+
+    assert histogram.collect() == [
+        "# HELP query_seconds Query latency",
+        "# TYPE query_seconds histogram",
+        'query_seconds_bucket{method="find",le="0.1"} 1',
+        'query_seconds_bucket{method="find",le="1.0"} 3',
+        'query_seconds_bucket{method="find",le="+Inf"} 4',
+        'query_seconds_sum{method="find"} 4.05',
+        'query_seconds_count{method="find"} 4',
+    ]
+
+def test_counter_escapes_label_values():
+    counter = Counter("calls_total", "Calls", ("name",))
+    counter.inc(name='say "hi"')
+    counter.inc(2, name='say "hi"')
+
+    assert counter.collect()[-1] == 'calls_total{name="say \\"hi\\""} 3'
+
+def test_stage_metrics_track_outcome_and_in_flight():
+    registry = Registry()
+    stage = StageMetrics("chain_call", "Contract function", "function", registry=registry)
+
+    @stage.instrument("verificationExists")
+    def call(fail=False):
+        assert stage.in_flight._values[("verificationExists",)] == 1
+        if fail:
+            raise ValueError("revert")
+        return True
+
+    assert call()
+    with pytest.raises(ValueError):
+        call(fail=True)
+
+    assert stage.calls._values == {("verificationExists", "ok"): 1, ("verificationExists", "error"): 1}
+    assert stage.in_flight._values[("verificationExists",)] == 0
+    assert 'chain_call_duration_seconds_count{function="verificationExists"} 2' in registry.render()
+
+def test_metrics_route_reports_requests_by_route_template():
+    client = TestClient(app)
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE blockchain_call_duration_seconds histogram" in response.text
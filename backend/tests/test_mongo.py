@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services import mongo
+
+ADDRESS = ("localhost", 27017)
+
+def test_get_client_reuses_one_client_per_uri():
+    with patch.object(mongo, "MongoClient") as mongo_client, patch.dict(mongo._clients, clear=True):
+        mongo_client.side_effect = lambda uri, **options: MagicMock(uri=uri)
+        first = mongo.get_client("mongodb://a:27017")
+        second = mongo.get_client("mongodb://a:27017")
+        other = mongo.get_client("mongodb://b:27017")
+
+        assert first is second
+        assert first is not other
+        assert mongo_client.call_count == 2
+        assert other.uri == "mongodb://b:27017"
+        options = mongo_client.call_args.kwargs
+        assert options["maxPoolSize"] == mongo.MONGO_MAX_POOL_SIZE
+        assert options["event_listeners"] == [mongo.pool_metrics]
+
+def test_close_clients():
+    with patch.object(mongo, "MongoClient") as mongo_client, patch.dict(mongo._clients, clear=True):
+        mongo.get_client("mongodb://a:27017")
+        mongo.close_clients()
+
+        mongo_client.return_value.close.assert_called_once()
+        assert mongo._clients == {}
+
+def test_pool_metrics_listener():
+    listener = mongo.PoolMetricsListener()
+    event = SimpleNamespace(address=ADDRESS, duration=0.25)
+
+    listener.connection_created(event)
+    listener.connection_check_out_started(event)
+    listener.connection_checked_out(event)
+
+    stats = listener.snapshot()["localhost:27017"]
+    assert stats["connections_open"] == 1
+    assert stats["connections_in_use"] == 1
+    assert stats["checkouts_waiting"] == 0
+    assert stats["checkout_wait_seconds"] == 0.25
+
+    listener.connection_checked_in(event)
+    listener.connection_closed(event)
+
+    stats = listener.snapshot()["localhost:27017"]
+    assert stats["connections_open"] == 0
+    assert stats["connections_in_use"] == 0
@@ -0,0 +1,64 @@
+from bson.objectid import ObjectId
+
+from app.services import record_store
+from app.services.record_store import ColumnStore, InternTable, UNIVERSITY_COLUMNS, MISSING_CODE
+
+DOCUMENTS = [
+    {"_id": ObjectId(), "full_name": "Kalana De Alwis", "university": "NSBM Green University", "degree": "BSc in Software Engineering", "gpa": 3.73, "graduation_year": 2025},
+    {"_id": ObjectId(), "full_name": "Nadeesha Alwis", "university": "NSBM Green University", "degree": "BSc in Data Science", "gpa": "3.1"},
+    {"_id": ObjectId(), "full_name": "kalana  de alwis", "university": "University of Colombo", "degree": "MSc in Computer Science"},
+]
+
+def test_intern_table():
+    table = InternTable()
+    assert table.code("a") == 0
+    assert table.code("b") == 1
+    assert table.code("a") == 0
+    assert table.code(None) == MISSING_CODE
+    assert table.lookup("c") == MISSING_CODE
+    assert len(table) == 2
+
+def test_build_groups_rows_by_name():
+    store = ColumnStore.build(iter(DOCUMENTS), UNIVERSITY_COLUMNS)
+
+    assert len(store) == 3
+    records = list(store.records(store.rows_for_name("KALANA DE ALWIS")))
+    assert sorted(record["university"] for record in records) == ["NSBM Green University", "University of Colombo"]
+    assert list(store.rows_for_name("Nobody")) == []
+
+def test_colliding_names_keep_their_own_records(monkeypatch):
+    # Every name hashes to the same key
+    monkeypatch.setattr(record_store, "hash", lambda name: 7, raising=False)
+    store = ColumnStore.build(iter(DOCUMENTS), UNIVERSITY_COLUMNS)
+
+    assert list(store.key_hashes) == [7, 7]
+    nadeesha, = store.records(store.rows_for_name("Nadeesha Alwis"))
+    assert nadeesha["degree"] == "BSc in Data Science"
+    assert len(store.rows_for_name("Kalana De Alwis")) == 2
+    assert list(store.rows_for_name("Nobody")) == []
+
+def test_record_types_and_missing_values():
+    store = ColumnStore.build(iter(DOCUMENTS), UNIVERSITY_COLUMNS)
+
+    kalana, = [r for r in store.records(store.rows_for_name("Kalana De Alwis")) if "gpa" in r]
+    assert kalana == {"university": "NSBM Green University", "degree": "BSc in Software Engineering", "gpa": 3.73, "graduation_year": 2025}
+
+    nadeesha, = store.records(store.rows_for_name("Nadeesha Alwis"))
+    assert nadeesha["gpa"] == 3.1
+    assert "graduation_year" not in nadeesha
+
+    # Strings are interned once per column
+    assert len(store.tables["university"]) == 2
+
+def test_row_for_id():
+    store = ColumnStore.build(iter(DOCUMENTS), UNIVERSITY_COLUMNS)
+
+    for document in DOCUMENTS:
+        row = store.row_for_id(document["_id"])
+        assert store.record(row)["degree"] == document["degree"]
+    assert store.row_for_id(ObjectId()) is None
+
+def test_nbytes_is_compact():
+    store = ColumnStore.build(iter(DOCUMENTS * 100), UNIVERSITY_COLUMNS)
+    # Columns and ids only; the interned strings are shared
+    assert store.nbytes() - sum(table.nbytes() for table in store.tables.values()) < 60 * len(store)
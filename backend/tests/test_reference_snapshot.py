@@ -0,0 +1,133 @@
+import mongomock
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from bson.timestamp import Timestamp
+
+from app.services import reference_snapshot
+from app.services.reference_snapshot import ReferenceSnapshot, normalize
+
+NOW = datetime(2025, 1, 1)
+
+@pytest.fixture
+def collections():
+    client = mongomock.MongoClient()
+    universities = client["university_db"]["university_records"]
+    companies = client["company_db"]["employment_records"]
+    universities.insert_many([
+        {"full_name": "Kalana De Alwis", "university": "NSBM Green University", "degree": "BSc in Software Engineering", "gpa": 3.73, "updated_at": NOW},
+        {"full_name": "Nadeesha Alwis", "university": "University of Colombo", "degree": "BSc in Computer Science", "gpa": 3.4, "updated_at": NOW},
+    ])
+    companies.insert_many([
+        {"full_name": "Shehani Jayawardena", "company": "99X Technology", "position": "ML Engineer", "updated_at": NOW},
+        {"full_name": "Shehani Jayawardena", "company": "WSO2", "position": "Software Engineer", "updated_at": NOW},
+    ])
+    return universities, companies
+
+@pytest.fixture
+def snapshot(collections):
+    snapshot = ReferenceSnapshot(*collections)
+    snapshot.load()
+    return snapshot
+
+def test_normalize():
+    assert normalize("  Kalana   De ALWIS ") == "kalana de alwis"
+    assert normalize(None) == ""
+
+def test_find_university_record(snapshot):
+    record = snapshot.find_university_record("kalana de alwis", "NSBM")
+    assert record["gpa"] == 3.73
+    assert "_id" not in record
+    assert snapshot.find_university_record("Kalana De Alwis", "University of Colombo") is None
+    assert snapshot.find_university_record("Unknown Person", "NSBM") is None
+
+def test_find_employment_records(snapshot):
+    assert len(snapshot.find_employment_records("Shehani Jayawardena", "")) == 2
+    records = snapshot.find_employment_records("Shehani Jayawardena", "99x", "ml engineer")
+    assert [record["company"] for record in records] == ["99X Technology"]
+    assert snapshot.find_employment_records("Shehani Jayawardena", "99X Technology", "Data Scientist") == []
+
+def test_poll_applies_updated_records(snapshot, collections):
+    universities, _ = collections
+    universities.update_one(
+        {"full_name": "Kalana De Alwis"},
+        {"$set": {"gpa": 3.8, "full_name": "Kalana Alwis", "updated_at": NOW + timedelta(hours=1)}}
+    )
+
+    assert snapshot.universities.poll() == 1
+    assert snapshot.find_university_record("Kalana De Alwis", "NSBM") is None
+    assert snapshot.find_university_record("Kalana Alwis", "NSBM")["gpa"] == 3.8
+    assert len(snapshot.universities) == 2
+
+def test_apply_change_stream_events(snapshot, collections):
+    universities, _ = collections
+    record_id = universities.find_one({"full_name": "Nadeesha Alwis"})["_id"]
+
+    snapshot.universities.apply_change({"_id": {"token": 1}, "operationType": "delete", "documentKey": {"_id": record_id}})
+
+    assert snapshot.find_university_record("Nadeesha Alwis", "Colombo") is None
+    assert snapshot.universities.resume_token == {"token": 1}
+
+def test_stats(snapshot):
+    stats = snapshot.stats()
+    assert stats["university_records"]["records"] == 2
+    assert stats["employment_records"]["memory_bytes"] > 0
+    assert stats["employment_records"]["staleness_seconds"] >= 0
+
+class StoppingStream:
+    """Change stream with no changes that stops the snapshot after a few reads."""
+
+    def __init__(self, snapshot, reads=3):
+        self.snapshot = snapshot
+        self.reads = reads
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def try_next(self):
+        self.reads -= 1
+        if self.reads <= 0:
+            self.snapshot._stop.set()
+        return None
+
+def test_change_stream_starts_before_the_load(collections, monkeypatch):
+    universities, companies = collections
+    calls = []
+    operation_time = Timestamp(1700000000, 1)
+    monkeypatch.setattr(universities.database, "command", lambda name: calls.append(name) or {"ok": 1, "operationTime": operation_time})
+    find = universities.find
+    monkeypatch.setattr(universities, "find", lambda *args: calls.append("find") or find(*args))
+    snapshot = ReferenceSnapshot(universities, companies)
+    snapshot.load()
+    watch = MagicMock(side_effect=lambda **kwargs: StoppingStream(snapshot))
+    monkeypatch.setattr(universities, "watch", watch)
+
+    snapshot._watch(snapshot.universities)
+
+    # Writes landing during the read are replayed from the stream
+    assert calls == ["ping", "find"]
+    assert watch.call_args.kwargs == {"full_document": "updateLookup", "start_at_operation_time": operation_time}
+
+def test_change_stream_mode_reloads_periodically(collections, monkeypatch):
+    universities, companies = collections
+    monkeypatch.setattr(reference_snapshot, "REFERENCE_SNAPSHOT_RELOAD_SECONDS", 0)
+    snapshot = ReferenceSnapshot(universities, companies)
+    snapshot.universities.resume_token = {"token": 1}
+    loads = []
+
+    def load():
+        loads.append(snapshot.universities.resume_token)
+        snapshot.universities.resume_token = None
+        if len(loads) == 2:
+            snapshot._stop.set()
+
+    monkeypatch.setattr(snapshot.universities, "load", load)
+    monkeypatch.setattr(universities, "watch", lambda **kwargs: StoppingStream(snapshot))
+
+    snapshot._watch(snapshot.universities)
+
+    assert loads == [{"token": 1}, None]
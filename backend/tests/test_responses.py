@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.resume_verification import get_resume_verification_service
+from app.routes.verification import get_blockchain
+from app.utils.responses import encode_json
+
+RESUME_ID = ObjectId("64b7f0c2a1b2c3d4e5f60718")
+
+def test_encode_json_converts_bson_values_without_mutating():
+    document = {
+        "_id": RESUME_ID,
+        "education": [{"resume_id": RESUME_ID, "gpa": Decimal128("3.73")}],
+        "created_at": datetime(2025, 1, 1, 12, 30),
+    }
+
+    assert json.loads(encode_json(document)) == {
+        "_id": str(RESUME_ID),
+        "education": [{"resume_id": str(RESUME_ID), "gpa": "3.73"}],
+        "created_at": "2025-01-01T12:30:00",
+    }
+    assert document["_id"] is RESUME_ID
+
+def test_routes_serialize_object_ids():
+    service = MagicMock()
+    service.get_resumes_page.return_value = ([{"_id": RESUME_ID, "name": "Kalana De Alwis"}], None)
+    service.check_education_verification.return_value = (True, "ok", {"_id": RESUME_ID, "resume_id": RESUME_ID})
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    try:
+        client = TestClient(app)
+
+        response = client.get("/resume-verification/resumes")
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"_id": str(RESUME_ID), "name": "Kalana De Alwis"}]
+
+        response = client.post("/resume-verification/check-education", json={"resume_id": str(RESUME_ID), "education_index": 0})
+        assert response.json() == {"success": True, "message": "ok", "data": {"_id": str(RESUME_ID), "resume_id": str(RESUME_ID)}}
+    finally:
+        app.dependency_overrides.clear()
+
+def test_list_route_keeps_documented_schema():
+    blockchain = MagicMock()
+    blockchain.get_all_verifications.return_value = [{"data_hash": "0x01", "is_verified": True, "timestamp": 1651234567}]
+    app.dependency_overrides[get_blockchain] = lambda: blockchain
+    try:
+        client = TestClient(app)
+        path = app.url_path_for("list_verifications")
+
+        response = client.get(path)
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"verifications": blockchain.get_all_verifications.return_value, "total": 1}
+
+        schema = client.get("/openapi.json").json()["paths"][path]["get"]["responses"]["200"]
+        assert schema["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/VerificationListResponse"}
+    finally:
+        app.dependency_overrides.clear()
+
+def test_orjson_is_opt_in():
+    # Routes that do not return a BSONResponse keep FastAPI's JSON encoding (float and datetime output)
+    routes = [route for route in app.routes if isinstance(route, APIRoute) and route.path in ("/", "/health")]
+
+    assert routes
+    for route in routes:
+        assert getattr(route.response_class, "value", route.response_class) is JSONResponse
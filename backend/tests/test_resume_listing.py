@@ -0,0 +1,110 @@
+import json
+
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import resume_verification
+from app.routes.resume_verification import get_resume_verification_service
+from app.services.mock_db import MockDatabase
+from app.services.verification import ResumeVerificationService
+
+STATUSES = ["PENDING", "VERIFIED", "REJECTED"]
+
+@pytest.fixture
+def service():
+    db = MockDatabase.__new__(MockDatabase)
+    db.verification_info = mongomock.MongoClient()["resume_rover_db"]["verification_info"]
+    db.verification_info.insert_many([
+        {
+            "resume_id": str(i),
+            "name": f"Applicant {i}",
+            "email": f"applicant{i}@example.com",
+            "job_id": f"job-{i % 2}",
+            "is_verified": STATUSES[i % 3],
+        }
+        for i in range(7)
+    ])
+    service = ResumeVerificationService.__new__(ResumeVerificationService)
+    service.db = db
+    return service
+
+@pytest.fixture
+def client(service, monkeypatch):
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    monkeypatch.setattr(resume_verification, "ResumeVerificationService", lambda: service)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def test_pages_continue_from_the_cursor(service):
+    first, cursor = service.get_resumes_page(limit=3)
+    second, cursor_2 = service.get_resumes_page(limit=3, after=cursor)
+    last, cursor_3 = service.get_resumes_page(limit=3, after=cursor_2)
+
+    assert [r["resume_id"] for r in first + second + last] == [str(i) for i in range(7)]
+    assert cursor == str(first[-1]["_id"])
+    assert cursor_3 is None
+
+def test_last_full_page_has_no_cursor(service):
+    page, cursor = service.get_resumes_page(limit=7)
+
+    assert len(page) == 7
+    assert cursor is None
+
+def test_route_walks_every_page(client):
+    seen, after = [], None
+    while True:
+        params = {"limit": 2, **({"after": after} if after else {})}
+        body = client.get("/resume-verification/resumes", params=params).json()
+        seen += [resume["resume_id"] for resume in body["data"]]
+        after = body["next_cursor"]
+        if after is None:
+            break
+
+    assert seen == [str(i) for i in range(7)]
+
+def test_route_without_limit_or_cursor_returns_everything(client):
+    body = client.get("/resume-verification/resumes").json()
+
+    assert [resume["resume_id"] for resume in body["data"]] == [str(i) for i in range(7)]
+    assert body["next_cursor"] is None
+
+def test_route_with_only_a_cursor_pages(client, monkeypatch):
+    monkeypatch.setattr(resume_verification, "DEFAULT_PAGE_SIZE", 2)
+    first = client.get("/resume-verification/resumes", params={"limit": 1}).json()
+
+    body = client.get("/resume-verification/resumes", params={"after": first["next_cursor"]}).json()
+
+    assert [resume["resume_id"] for resume in body["data"]] == ["1", "2"]
+    assert body["next_cursor"] is not None
+
+def test_route_filters_by_status_and_job(client):
+    body = client.get("/resume-verification/resumes", params={"is_verified": "VERIFIED", "job_id": "job-0"}).json()
+
+    # i % 3 == 1 and i % 2 == 0
+    assert [resume["resume_id"] for resume in body["data"]] == ["4"]
+
+    body = client.get("/resume-verification/resumes", params={"job_id": "job-1"}).json()
+    assert [resume["resume_id"] for resume in body["data"]] == ["1", "3", "5"]
+
+def test_route_projects_fields(client):
+    body = client.get("/resume-verification/resumes", params={"limit": 1, "fields": "name,is_verified"}).json()
+
+    resume, = body["data"]
+    assert set(resume) == {"_id", "name", "is_verified"}
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/resume-verification/resumes", params={"after": "not-an-object-id"})
+
+    assert response.status_code == 400
+
+def test_stream_returns_ndjson(client):
+    response = client.get("/resume-verification/resumes/stream", params={"is_verified": "PENDING", "fields": "resume_id"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["resume_id"] for line in lines] == ["0", "3", "6"]
+    assert all(set(line) == {"_id", "resume_id"} for line in lines)
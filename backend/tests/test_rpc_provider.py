@@ -0,0 +1,246 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from eth_account import Account
+from web3 import Web3
+from websockets.sync.server import serve
+
+from app.services import rpc_provider
+from app.services.rpc_provider import (
+    MultiEndpointProvider,
+    PooledHTTPProvider,
+    WebSocketRPCProvider,
+    get_provider,
+    sender_of
+)
+
+# Enough senders that every endpoint gets some, whatever the ports are (3 * (2/3)**32 chance of one without)
+SENDERS = ["0x" + f"{i:040x}" for i in range(1, 33)]
+
+class LocalNode:
+    """JSON-RPC endpoint on localhost answering a few read and nonce methods."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.down = False
+        self.calls = Counter()
+        self.clients = set()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like a node; headers and body go out in one write
+            protocol_version = "HTTP/1.1"
+            wbufsize = -1
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.calls[request["method"]] += 1
+                node.clients.add(self.client_address)
+                if node.down:
+                    self.send_error(503)
+                    return
+                time.sleep(node.delay)
+                results = {"eth_blockNumber": "0x10", "eth_getTransactionCount": "0x0", "web3_clientVersion": "local"}
+                body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": results.get(request["method"], "0x1")}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def nodes():
+    started = []
+
+    def start(*delays):
+        started.extend(LocalNode(delay) for delay in delays)
+        return started
+
+    yield start
+    for node in started:
+        node.close()
+
+@pytest.fixture
+def providers():
+    created = []
+
+    def create(nodes, **kwargs):
+        kwargs.setdefault("hedge_after", 0)
+        provider = MultiEndpointProvider([node.url for node in nodes], **kwargs)
+        created.append(provider)
+        return Web3(provider)
+
+    yield create
+    for provider in created:
+        provider.close()
+
+def test_reads_prefer_the_faster_endpoint(nodes, providers):
+    fast, slow = nodes(0.0, 0.03)
+    w3 = providers([fast, slow])
+
+    for _ in range(60):
+        assert w3.eth.block_number == 16
+
+    assert fast.calls["eth_blockNumber"] > 3 * slow.calls["eth_blockNumber"]
+
+def test_nonce_reads_are_pinned_per_sender(nodes, providers):
+    started = nodes(0.0, 0.0, 0.0)
+    w3 = providers(started)
+
+    for sender in SENDERS:
+        before = [node.calls["eth_getTransactionCount"] for node in started]
+        for _ in range(3):
+            w3.eth.get_transaction_count(Web3.to_checksum_address(sender))
+        added = [node.calls["eth_getTransactionCount"] - count for node, count in zip(started, before)]
+        assert sorted(added) == [0, 0, 3]
+
+    assert all(node.calls["eth_getTransactionCount"] for node in started)
+
+def test_failing_endpoint_is_ejected_and_probed_back(nodes, providers):
+    healthy, failing = nodes(0.0, 0.0)
+    failing.down = True
+    w3 = providers([healthy, failing], eject_after=1, probe_interval=0.5)
+    endpoint = w3.provider.endpoints[1]
+
+    for _ in range(20):
+        assert w3.eth.block_number == 16
+    assert not endpoint.healthy
+    # The read that ejected it, and maybe one probe
+    assert failing.calls["eth_blockNumber"] <= 2
+
+    failing.down = False
+    deadline = time.monotonic() + 5
+    while not endpoint.healthy:
+        assert time.monotonic() < deadline, "endpoint was not restored"
+        time.sleep(0.01)
+
+def test_slow_reads_are_hedged(nodes, providers):
+    stalled, fast = nodes(1.0, 0.0)
+    w3 = providers([stalled, fast], hedge_after=0.05)
+
+    for _ in range(5):
+        started = time.perf_counter()
+        assert w3.eth.block_number == 16
+        assert time.perf_counter() - started < 0.5
+
+def test_concurrent_reads_are_not_queued_into_hedges(nodes, providers):
+    started = nodes(0.2, 0.2)
+    w3 = providers(started, hedge_after=0.25)
+
+    begun = time.perf_counter()
+    threads = [threading.Thread(target=lambda: w3.eth.block_number) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert time.perf_counter() - begun < 0.6
+    # No read waited long enough for a hedge
+    assert sum(node.calls["eth_blockNumber"] for node in started) == 40
+
+def test_sender_of_pinned_calls():
+    assert sender_of("eth_sendTransaction", [{"from": "0xAbC"}]) == "0xabc"
+    assert sender_of("eth_getTransactionCount", ["0xAbC", "pending"]) == "0xabc"
+    assert sender_of("personal_sign", ["0x00", "0xAbC"]) == "0xabc"
+
+    account = Account.create()
+    signed = account.sign_transaction({"to": SENDERS[0], "value": 0, "gas": 21000, "gasPrice": 1, "nonce": 0, "chainId": 1337})
+    assert sender_of("eth_sendRawTransaction", [Web3.to_hex(signed.raw_transaction)]) == account.address.lower()
+
+def test_single_endpoint_uses_one_shared_provider(monkeypatch):
+    monkeypatch.setattr(rpc_provider, "_providers", {})
+    provider = get_provider("http://127.0.0.1:7545")
+
+    assert isinstance(provider, PooledHTTPProvider)
+    assert get_provider("http://127.0.0.1:7545") is provider
+    assert get_provider("http://127.0.0.1:7545", timeout=1) is not provider
+    assert isinstance(get_provider("ws://127.0.0.1:8545"), WebSocketRPCProvider)
+
+def test_pooled_http_connections_are_reused_across_threads(nodes):
+    node, = nodes(0.0)
+    provider = PooledHTTPProvider(node.url, pool_size=2)
+    w3 = Web3(provider)
+
+    threads = [threading.Thread(target=lambda: [w3.eth.block_number for _ in range(10)]) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    provider.close()
+
+    assert node.calls["eth_blockNumber"] == 20
+    assert len(node.clients) <= 2
+
+def test_pooled_http_read_timeout(nodes):
+    node, = nodes(0.5)
+    provider = PooledHTTPProvider(node.url, timeout=0.05, exception_retry_configuration=None)
+
+    with pytest.raises(requests.Timeout):
+        Web3(provider).eth.block_number
+
+class LocalWebSocketNode:
+    """JSON-RPC over WebSocket on localhost; eth_call answers after the delay given as its first param."""
+
+    def __init__(self):
+        def handle(connection):
+            for message in connection:
+                request = json.loads(message)
+                threading.Thread(target=answer, args=(connection, request)).start()
+
+        def answer(connection, request):
+            if request["method"] == "eth_call":
+                time.sleep(float(request["params"][0]))
+            connection.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": request["params"]}))
+
+        self.server = serve(handle, "127.0.0.1", 0)
+        self.url = f"ws://127.0.0.1:{self.server.socket.getsockname()[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+def test_websocket_requests_are_multiplexed():
+    node = LocalWebSocketNode()
+    provider = WebSocketRPCProvider(node.url, timeout=5)
+    try:
+        answers = {}
+        slow = threading.Thread(target=lambda: answers.update(slow=provider.make_request("eth_call", [0.3])))
+        slow.start()
+        time.sleep(0.05)
+        started = time.perf_counter()
+        assert provider.make_request("eth_call", [0])["result"] == [0]
+        # Not queued behind the slow call on the same connection
+        assert time.perf_counter() - started < 0.2
+        slow.join(5)
+        assert answers["slow"]["result"] == [0.3]
+    finally:
+        provider.close()
+        node.close()
+
+def test_websocket_reconnects_after_the_connection_drops():
+    node = LocalWebSocketNode()
+    provider = WebSocketRPCProvider(node.url, timeout=5)
+    try:
+        assert provider.make_request("eth_chainId", [])["result"] == []
+        provider._connection.close()
+        time.sleep(0.05)
+        assert provider.make_request("eth_chainId", [1])["result"] == [1]
+    finally:
+        provider.close()
+        node.close()
@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bson.objectid import ObjectId
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import resume_verification
+from app.routes.resume_verification import get_resume_verification_service
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    FairQueue,
+    SchedulerFullError,
+    VerificationScheduler,
+    _Job,
+    fairness_key,
+    fairness_key_async,
+    parse_weights
+)
+
+def job(key, priority=PRIORITY_BULK):
+    return _Job(lambda: key, (), {}, key, priority)
+
+def pop_keys(fair_queue, count):
+    return [fair_queue.pop().key for _ in range(count)]
+
+@pytest.fixture
+def scheduler():
+    scheduler = VerificationScheduler(workers=1, max_queued=3)
+    scheduler.start()
+    yield scheduler
+    scheduler.stop()
+
+def blocked(scheduler):
+    """Occupy the only worker until the returned event is set."""
+    release, started = threading.Event(), threading.Event()
+    scheduler.submit(lambda: (started.set(), release.wait(5)), priority=PRIORITY_INTERACTIVE)
+    started.wait(5)
+    return release
+
+def test_bulk_key_does_not_starve_others():
+    fair_queue = FairQueue()
+    for _ in range(100):
+        fair_queue.push(job("job-bulk"))
+    fair_queue.pop()
+    fair_queue.push(job("job-small"))
+    fair_queue.push(job("job-small"))
+
+    assert pop_keys(fair_queue, 4).count("job-small") == 2
+
+def test_weights_share_the_queue():
+    fair_queue = FairQueue(parse_weights("job-a=2, job-b=1"))
+    for _ in range(6):
+        fair_queue.push(job("job-a"))
+        fair_queue.push(job("job-b"))
+
+    assert pop_keys(fair_queue, 6).count("job-a") == 4
+
+def test_interactive_jobs_run_before_bulk_jobs(scheduler):
+    release = blocked(scheduler)
+    order = []
+    bulk = scheduler.submit(order.append, "bulk", key="job-1", priority=PRIORITY_BULK)
+    interactive = scheduler.submit(order.append, "interactive", key="job-2", priority=PRIORITY_INTERACTIVE)
+    assert scheduler.depth() == {"interactive": 1, "bulk": 1}
+
+    release.set()
+    bulk.result(5), interactive.result(5)
+    assert order == ["interactive", "bulk"]
+
+def test_full_queue_rejects_and_stop_cancels_queued_jobs(scheduler):
+    release = blocked(scheduler)
+    queued = [scheduler.submit(lambda: None) for _ in range(3)]
+
+    with pytest.raises(SchedulerFullError):
+        scheduler.submit(lambda: None)
+
+    threading.Timer(0.1, release.set).start()
+    scheduler.stop()
+    for future in queued:
+        with pytest.raises(CancelledError):
+            future.result(0)
+
+def test_jobs_run_in_the_submitting_context(scheduler):
+    request_id = contextvars.ContextVar("request_id")
+    request_id.set("request-1")
+    assert scheduler.submit(request_id.get).result(5) == "request-1"
+
+def test_exceptions_are_returned_through_the_future(scheduler):
+    with pytest.raises(ZeroDivisionError):
+        scheduler.submit(lambda: 1 / 0).result(5)
+
+def test_fairness_key_prefers_job_id_and_is_cached():
+    db = MagicMock()
+    db.get_resume_owner.return_value = {"job_id": "", "username": "alice"}
+    resume_id = str(ObjectId())
+
+    assert fairness_key(db, resume_id) == "alice"
+    assert fairness_key(db, resume_id) == "alice"
+    db.get_resume_owner.assert_called_once()
+
+def test_fairness_key_lookup_runs_off_the_event_loop():
+    db = MagicMock()
+    db.get_resume_owner.side_effect = lambda resume_id: {"job_id": threading.current_thread().name}
+    resume_id = str(ObjectId())
+
+    async def lookup():
+        return await fairness_key_async(db, resume_id), threading.current_thread().name
+
+    key, loop_thread = asyncio.run(lookup())
+    assert key != loop_thread
+    assert asyncio.run(lookup())[0] == key
+    db.get_resume_owner.assert_called_once()
+
+def test_route_returns_503_when_the_queue_is_full():
+    service = MagicMock()
+    service.db.get_resume_owner.return_value = {"job_id": "job-1"}
+    full = VerificationScheduler(workers=0, max_queued=0)
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    try:
+        with patch.object(resume_verification, "get_scheduler", return_value=full):
+            response = TestClient(app).post("/resume-verification/initialize", json={"resume_id": "64b7f0c2a1b2c3d4e5f60719"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    service.initialize_verification.assert_not_called()
+
+def test_route_runs_on_the_scheduler():
+    service = MagicMock()
+    service.db.get_resume_owner.return_value = {"job_id": "job-1"}
+    service.check_education_verification.side_effect = lambda resume_id, index: (True, threading.current_thread().name, {})
+    app.dependency_overrides[get_resume_verification_service] = lambda: service
+    try:
+        response = TestClient(app).post(
+            "/resume-verification/check-education",
+            json={"resume_id": "64b7f0c2a1b2c3d4e5f6071a", "education_index": 0}
+        )
+    finally:
+        app.dependency_overrides.clear()
+        scheduler_module.close_scheduler()
+
+    assert response.status_code == 200
+    assert response.json()["message"].startswith("scheduler-")
@@ -0,0 +1,70 @@
+import io
+import json
+import pytest
+from unittest.mock import MagicMock
+from pymongo.errors import BulkWriteError
+
+from app.services.seed_loader import (
+    detect_format,
+    iter_chunks,
+    iter_csv,
+    iter_json_array,
+    iter_ndjson,
+    load_records
+)
+
+RECORDS = [
+    {"full_name": "Kalana De Alwis", "university": "NSBM Green University", "gpa": 3.73},
+    {"full_name": "Nadeesha Alwis", "university": "University of Colombo", "details": "a [nested], {value}"},
+    {"full_name": "Shehani Jayawardena", "university": "SLIIT", "gpa": 3.2},
+]
+
+def test_detect_format():
+    assert detect_format("data/university_records.json") == "json"
+    assert detect_format("dump.jsonl") == "ndjson"
+    assert detect_format("dump.NDJSON") == "ndjson"
+    assert detect_format("dump.csv") == "csv"
+
+@pytest.mark.parametrize("read_size", [1, 7, 4096])
+def test_iter_json_array_across_chunk_boundaries(read_size):
+    text = json.dumps(RECORDS, indent=2)
+    assert list(iter_json_array(io.StringIO(text), read_size=read_size)) == RECORDS
+
+def test_iter_json_array_empty():
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+def test_iter_json_array_rejects_truncated_input():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(json.dumps(RECORDS)[:-20]), read_size=16))
+
+def test_iter_ndjson_skips_blank_lines():
+    text = "\n".join(json.dumps(record) for record in RECORDS) + "\n\n"
+    assert list(iter_ndjson(io.StringIO(text))) == RECORDS
+
+def test_iter_csv_converts_numeric_fields():
+    text = "full_name,university,gpa,student_id\nKalana De Alwis,NSBM Green University,3.73,0117\n"
+    assert list(iter_csv(io.StringIO(text))) == [
+        {"full_name": "Kalana De Alwis", "university": "NSBM Green University", "gpa": 3.73, "student_id": "0117"}
+    ]
+
+def test_iter_chunks():
+    assert [len(chunk) for chunk in iter_chunks(range(7), 3)] == [3, 3, 1]
+
+def test_load_records_uses_unordered_chunks():
+    collection = MagicMock()
+    collection.insert_many.side_effect = lambda chunk, ordered: MagicMock(inserted_ids=list(range(len(chunk))))
+
+    summary = load_records(collection, iter(RECORDS), chunk_size=2)
+
+    assert summary["inserted"] == 3
+    assert collection.insert_many.call_count == 2
+    assert all(call.kwargs["ordered"] is False for call in collection.insert_many.call_args_list)
+
+def test_load_records_counts_write_errors():
+    collection = MagicMock()
+    collection.insert_many.side_effect = BulkWriteError({"nInserted": 2, "writeErrors": [{"code": 11000}]})
+
+    summary = load_records(collection, iter(RECORDS), chunk_size=3)
+
+    assert summary["inserted"] == 2
+    assert summary["failed"] == 1
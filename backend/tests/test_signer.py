@@ -0,0 +1,225 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from eth_account import Account
+from web3.exceptions import TransactionNotFound
+
+from app.services import signer
+from app.services.fees import FeePolicy, TransactionMonitor
+from app.services.admission import CHAIN_LIMITER
+from app.services.blockchain import BlockchainClient, VerificationType
+from app.services.signer import Sender, SignerPool, authorize, get_signer_pool, load_senders
+
+GWEI = 10**9
+CONTRACT = "0x" + "11" * 20
+
+def chain(start_nonce=5):
+    w3 = MagicMock()
+    w3.eth.fee_history.return_value = {"baseFeePerGas": [GWEI], "reward": [[GWEI]]}
+    w3.eth.get_transaction_count.return_value = start_nonce
+    w3.eth.send_raw_transaction.side_effect = lambda raw: raw[:4]
+    return w3
+
+def function_call():
+    call = MagicMock()
+    call.estimate_gas.return_value = 50000
+    call.build_transaction.side_effect = lambda tx: {"to": CONTRACT, "data": "0x", "value": 0, "chainId": 1337, **tx}
+    return call
+
+@pytest.fixture
+def monitor():
+    monitor = TransactionMonitor(FeePolicy(), check_interval=60)
+    yield monitor
+    monitor.stop()
+
+def test_writes_round_robin_with_a_nonce_stream_per_account(monitor):
+    accounts = [Account.create(), Account.create()]
+    pool = SignerPool([Sender(account.address, account) for account in accounts], FeePolicy(), monitor)
+    w3 = chain()
+    call = function_call()
+
+    for _ in range(4):
+        pool.transact(w3, call, ("requestVerification", 0), pool.sender())
+
+    senders = [Account.recover_transaction(c.args[0]) for c in w3.eth.send_raw_transaction.call_args_list]
+    assert senders == [accounts[0].address, accounts[1].address] * 2
+    # The node is asked once per account, then nonces are counted locally
+    assert w3.eth.get_transaction_count.call_count == 2
+    assert sorted(tx["nonce"] for tx in (p.tx for p in monitor._pending.values())) == [5, 5, 6, 6]
+
+def test_failed_send_reloads_the_nonce(monitor):
+    account = Account.create()
+    pool = SignerPool([Sender(account.address, account)], FeePolicy(), monitor)
+    w3 = chain()
+    w3.eth.send_raw_transaction.side_effect = [ValueError("nonce too low"), b"\x01"]
+
+    with pytest.raises(ValueError):
+        pool.transact(w3, function_call(), ("requestVerification", 0), pool.sender())
+    pool.transact(w3, function_call(), ("requestVerification", 0), pool.sender())
+
+    assert w3.eth.get_transaction_count.call_count == 2
+
+@pytest.fixture
+def giving_up_monitor():
+    monitor = TransactionMonitor(FeePolicy(), stuck_seconds=0, check_interval=60, max_replacements=0)
+    yield monitor
+    monitor.stop()
+
+def node_signed_chain(latest):
+    w3 = chain()
+    w3.eth.get_transaction_count.side_effect = lambda address, block: {"pending": 5, "latest": latest}[block]
+    w3.eth.get_transaction_receipt.side_effect = TransactionNotFound("dropped")
+    w3.eth.send_transaction.side_effect = lambda tx: bytes([tx["nonce"], len(w3.eth.send_transaction.call_args_list)])
+    return w3
+
+def test_abandoned_nonce_is_filled_with_a_transfer_to_itself(giving_up_monitor):
+    address = Account.create().address
+    pool = SignerPool([Sender(address)], FeePolicy(), giving_up_monitor)
+    w3 = node_signed_chain(latest=5)
+
+    pool.transact(w3, function_call(), ("requestVerification", 0), pool.sender())
+    giving_up_monitor.check()
+
+    filler = w3.eth.send_transaction.call_args.args[0]
+    assert {key: filler[key] for key in ("from", "to", "value", "gas", "nonce")} == {
+        "from": address, "to": address, "value": 0, "gas": signer.TRANSFER_GAS, "nonce": 5
+    }
+    # Outbids the given up transaction in case the node still has it
+    original = w3.eth.send_transaction.call_args_list[0].args[0]
+    assert filler["maxFeePerGas"] > original["maxFeePerGas"]
+    assert [p.tx["nonce"] for p in giving_up_monitor._pending.values()] == [5]
+
+    # The next write asks the node again
+    pool.transact(w3, function_call(), ("requestVerification", 0), pool.sender())
+    assert w3.eth.get_transaction_count.call_args_list[-1].args == (address, "pending")
+
+def test_abandoned_nonce_already_mined_is_not_filled(giving_up_monitor):
+    address = Account.create().address
+    pool = SignerPool([Sender(address)], FeePolicy(), giving_up_monitor)
+    # Mined by the time it is given up
+    w3 = node_signed_chain(latest=6)
+    pool.transact(w3, function_call(), ("requestVerification", 0), pool.sender())
+
+    pool.senders[0].fill_gap(w3, giving_up_monitor._pending[(address, 5)].tx, FeePolicy(), giving_up_monitor)
+
+    assert w3.eth.send_transaction.call_count == 1
+
+def test_unknown_account_needs_a_key():
+    account = Account.create()
+    pool = SignerPool([Sender(account.address, account)])
+
+    assert pool.sender(account.address.lower()).account is account
+    with pytest.raises(ValueError):
+        pool.sender(Account.create().address)
+
+    dev_pool = SignerPool([Sender(account.address)])
+    assert dev_pool.sender(CONTRACT).account is None
+
+def test_keys_are_loaded_once(monkeypatch):
+    keys = [Account.create().key.hex() for _ in range(3)]
+    monkeypatch.setenv("ORACLE_PRIVATE_KEYS", ",".join(keys))
+
+    senders = load_senders(MagicMock(), dev_chain=False)
+
+    assert [sender.account.key.hex() for sender in senders] == keys
+
+    monkeypatch.delenv("ORACLE_PRIVATE_KEYS")
+    monkeypatch.delenv("PRIVATE_KEY", raising=False)
+    with pytest.raises(ValueError):
+        load_senders(MagicMock(), dev_chain=False)
+
+def test_unauthorized_oracles_are_authorized_by_the_owner(monitor):
+    owner, oracle = Account.create(), Account.create()
+    senders = [Sender(owner.address, owner), Sender(oracle.address, oracle)]
+    contract = MagicMock()
+    contract.functions.authorizedOracles.side_effect = lambda address: MagicMock(call=MagicMock(return_value=address == owner.address))
+    contract.functions.owner.return_value.call.return_value = owner.address
+    contract.functions.authorizeOracle.return_value = function_call()
+    w3 = chain()
+    w3.eth.wait_for_transaction_receipt.return_value = {"status": 1}
+
+    assert authorize(w3, contract, senders, False, FeePolicy(), monitor) == senders
+
+    contract.functions.authorizeOracle.assert_called_once_with(oracle.address)
+    raw, = w3.eth.send_raw_transaction.call_args.args
+    assert Account.recover_transaction(raw) == owner.address
+
+def test_oracles_are_dropped_without_the_owner_key(monitor, monkeypatch):
+    monkeypatch.delenv("OWNER_PRIVATE_KEY", raising=False)
+    oracle = Account.create()
+    contract = MagicMock()
+    contract.functions.authorizedOracles.return_value.call.return_value = False
+    contract.functions.owner.return_value.call.return_value = Account.create().address
+
+    assert authorize(chain(), contract, [Sender(oracle.address, oracle)], False, FeePolicy(), monitor) == []
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(signer, "_pools", {})
+    monkeypatch.setattr(signer, "_failures", {})
+    monkeypatch.setattr(signer, "_load_locks", {})
+
+def test_signer_pool_is_shared(pools, monkeypatch):
+    monkeypatch.setattr(signer, "ORACLE_AUTHORIZE", False)
+    w3 = MagicMock()
+    w3.eth.accounts = ["0x" + "aa" * 20, "0x" + "bb" * 20]
+    contract = MagicMock(address=CONTRACT)
+
+    pool = get_signer_pool(w3, contract, dev_chain=True)
+
+    assert get_signer_pool(w3, contract, dev_chain=True) is pool
+    assert [sender.address for sender in pool.senders] == w3.eth.accounts[:signer.ORACLE_ACCOUNTS]
+
+def test_failed_load_is_not_retried_on_every_write(pools, monkeypatch):
+    monkeypatch.setattr(signer, "ORACLE_AUTHORIZE", True)
+    monkeypatch.setattr(signer, "authorize", MagicMock(return_value=[]))
+    monkeypatch.setattr(signer, "load_senders", MagicMock(return_value=[Sender(CONTRACT)]))
+    contract = MagicMock(address=CONTRACT)
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            get_signer_pool(MagicMock(), contract, dev_chain=True)
+    assert signer.authorize.call_count == 1
+
+    monkeypatch.setattr(signer, "ORACLE_AUTHORIZE_RETRY_SECONDS", 0)
+    signer._failures.clear()
+    signer.authorize.return_value = signer.load_senders.return_value
+    assert get_signer_pool(MagicMock(), contract, dev_chain=True).senders == signer.load_senders.return_value
+
+def test_loading_one_pool_does_not_block_others(pools, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(signer, "ORACLE_AUTHORIZE", True)
+    monkeypatch.setattr(signer, "load_senders", lambda w3, dev_chain: [Sender(CONTRACT)])
+    monkeypatch.setattr(
+        signer, "authorize",
+        lambda w3, contract, senders, *args: senders if contract.address != "slow" or release.wait(5) else []
+    )
+    slow = threading.Thread(target=get_signer_pool, args=(MagicMock(), MagicMock(address="slow"), True))
+    slow.start()
+
+    try:
+        assert get_signer_pool(MagicMock(), MagicMock(address=CONTRACT), dev_chain=True).senders
+        assert slow.is_alive()
+    finally:
+        release.set()
+        slow.join()
+    assert set(signer._pools) == {("slow", True), (CONTRACT, True)}
+
+def test_writes_wait_for_authorization_without_a_chain_slot(monitor):
+    in_flight = []
+    account = Account.create()
+    pool = SignerPool([Sender(account.address, account)], FeePolicy(), monitor)
+
+    def signers(client):
+        in_flight.append(CHAIN_LIMITER.snapshot()["in_flight"])
+        return pool
+
+    client = BlockchainClient.__new__(BlockchainClient)
+    client.w3 = chain()
+    client.contract = MagicMock()
+    client.contract.functions.requestVerification.return_value = function_call()
+    with patch.object(BlockchainClient, "signers", property(signers)):
+        client.request_verification("00" * 32, VerificationType.DEGREE)
+
+    assert in_flight == [0]
@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main
+from app.abi import load_abi
+from benchmarks.import_time import imported_by, parse_importtime
+
+def test_importing_the_app_defers_web3():
+    code = "import sys, app.main; print(sorted({'web3', 'eth_account'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+def test_health_answers_during_warm_up(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(app.main, "BLOCKCHAIN_WARM_UP", True)
+    monkeypatch.setattr(app.main, "warm_up", lambda: release.wait(5))
+
+    try:
+        with TestClient(app.main.app) as client:
+            started = time.perf_counter()
+            assert client.get("/health").json() == {"status": "healthy"}
+            assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+
+def test_reference_snapshot_is_loaded_on_startup(monkeypatch):
+    loaded = threading.Event()
+    monkeypatch.setattr(app.main, "load_reference_snapshot", loaded.set)
+
+    with TestClient(app.main.app):
+        assert loaded.is_set()
+
+def test_bundled_abi_has_the_contract_functions():
+    functions = {entry["name"] for entry in load_abi() if entry["type"] == "function"}
+
+    assert {
+        "requestVerification", "storeVerificationResult", "verificationExists", "getVerificationStatus",
+        "getVerificationCount", "getVerificationHashAtIndex", "authorizeOracle", "authorizedOracles", "owner"
+    } <= functions
+
+def test_abi_loads_from_truffle_artifacts(tmp_path):
+    artifact = tmp_path / "Verification.json"
+    artifact.write_text(json.dumps({"contractName": "Verification", "abi": load_abi(), "bytecode": "0x00"}))
+
+    assert load_abi(str(artifact)) == load_abi()
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | site",
+        "import time:       300 |        300 |     web3.main",
+        "import time:        50 |        350 |   web3",
+        "import time:        20 |        370 | app.main",
+    ])
+
+    run = parse_importtime(output)
+
+    assert run[1] == ("web3.main", 300, 300, 2)
+    assert [name for name, _, _, _ in imported_by(run, "app.main")] == ["web3.main", "web3", "app.main"]
@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import tracing
+from app.services.metrics import MONGO_METRICS
+from app.services.tracing import (
+    STATUS_ERROR,
+    InMemoryExporter,
+    Tracer,
+    configure_tracing,
+    parse_traceparent,
+    set_span_attributes
+)
+
+@pytest.fixture
+def exporter():
+    tracer = Tracer()
+    exporter = InMemoryExporter()
+    tracer.add_span_processor(exporter)
+    return tracer, exporter
+
+def test_spans_nest_and_record_errors(exporter):
+    tracer, memory = exporter
+
+    with tracer.start_span("request", resume_id="64b7f0c2") as root:
+        with tracer.start_span("db.get_resume_by_id"):
+            set_span_attributes(rows=1)
+        with pytest.raises(ValueError):
+            with tracer.start_span("chain.verificationExists"):
+                raise ValueError("revert")
+
+    child, failed, parent = memory.spans()
+    assert parent is root and parent.attributes == {"resume_id": "64b7f0c2"}
+    assert child.parent_span_id == failed.parent_span_id == root.span_id
+    assert child.trace_id == failed.trace_id == root.trace_id
+    assert child.attributes == {"rows": 1}
+    assert failed.status == STATUS_ERROR and "revert" in failed.status_message
+
+def test_traced_records_selected_arguments(exporter):
+    tracer, memory = exporter
+
+    @tracer.traced("education.check", ("resume_id", "education_index"))
+    def check(resume_id, education_index, approval=True):
+        return education_index
+
+    assert check("64b7f0c2", education_index=1) == 1
+    assert memory.spans()[0].attributes == {"resume_id": "64b7f0c2", "education_index": 1}
+
+def test_unsampled_traces_are_not_recorded(exporter):
+    tracer, memory = exporter
+    tracer.sample_rate = 0
+
+    with tracer.start_span("request"):
+        with tracer.start_span("child") as child:
+            assert not child.recording
+
+    assert memory.spans() == []
+
+def test_parse_traceparent():
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01") == (
+        "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True
+    )
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+def test_request_spans_include_stage_spans():
+    configure_tracing("memory")
+    try:
+        @app.get("/_tracing_test")
+        async def traced_route():
+            with MONGO_METRICS.track("get_resume_by_id"):
+                pass
+            return {}
+
+        client = TestClient(app)
+        client.get("/_tracing_test", headers={"traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"})
+
+        trace = client.get("/traces").json()["traces"][0]
+        assert trace["trace_id"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert [span["name"] for span in trace["spans"]] == ["GET /_tracing_test", "db.get_resume_by_id"]
+        assert trace["spans"][0]["attributes"]["http.status_code"] == 200
+        assert trace["spans"][1]["attributes"] == {"db.operation": "get_resume_by_id"}
+    finally:
+        configure_tracing("none")
+        app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != "/_tracing_test"]
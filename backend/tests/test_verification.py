@@ -1 +1,119 @@
-# Pytest unit tests
\ No newline at end of file
+# Pytest unit tests
+import pytest
+from unittest.mock import MagicMock
+from bson.objectid import ObjectId
+
+from app.services.verification.common import VerificationState
+from app.services.verification.status import (
+    VerificationStatusService,
+    count_item_states,
+    counter_deltas
+)
+
+RECORD_ID = ObjectId()
+
+def make_record(*states):
+    """Build a verification record with one education item per state."""
+    record = {
+        "_id": RECORD_ID,
+        "education": [{"verified": state} for state in states],
+        "work_experience": []
+    }
+    record.update(count_item_states(record))
+    return record
+
+class TestVerificationStatusService:
+    """Tests for the counter based overall status."""
+
+    @pytest.fixture
+    def db(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def status_service(self, db):
+        return VerificationStatusService(db)
+
+    def test_count_item_states(self):
+        record = make_record(
+            VerificationState.PENDING,
+            VerificationState.VERIFIED,
+            VerificationState.BLOCKCHAIN_VERIFIED,
+            VerificationState.SUBMITTED
+        )
+        assert record["pending_count"] == 1
+        assert record["verified_count"] == 2
+        assert record["total_count"] == 4
+
+    def test_counter_deltas(self):
+        assert counter_deltas(VerificationState.PENDING, VerificationState.VERIFIED) == {
+            "pending_count": -1,
+            "verified_count": 1
+        }
+        assert counter_deltas(VerificationState.SUBMITTED, VerificationState.REJECTED) == {}
+        assert counter_deltas(VerificationState.BLOCKCHAIN_VERIFIED, VerificationState.VERIFIED) == {}
+
+    def test_update_item_uses_guarded_increment(self, status_service, db):
+        record = make_record(VerificationState.PENDING)
+        item = {"verified": VerificationState.SUBMITTED}
+        db.update_verification_item.return_value = {"_id": RECORD_ID}
+
+        status_service.update_item(record, "education", 0, item, VerificationState.PENDING)
+
+        db.update_verification_item.assert_called_once_with(
+            str(RECORD_ID),
+            "education.0",
+            item,
+            expected_state=VerificationState.PENDING,
+            counter_deltas={"pending_count": -1}
+        )
+
+    def test_update_item_recounts_legacy_record(self, status_service, db):
+        record = {"_id": RECORD_ID, "education": [], "work_experience": []}
+        db.get_verification_record.return_value = make_record(VerificationState.VERIFIED)
+
+        updated = status_service.update_item(record, "education", 0, {"verified": VerificationState.VERIFIED}, VerificationState.PENDING)
+
+        assert updated["verified_count"] == 1
+        db.update_verification_record.assert_called_once_with(
+            str(RECORD_ID),
+            {"pending_count": 0, "verified_count": 1, "total_count": 1}
+        )
+
+    def test_update_item_retries_on_the_stored_state_after_a_lost_race(self, status_service, db):
+        record = make_record(VerificationState.PENDING)
+        item = {"verified": VerificationState.VERIFIED}
+        db.update_verification_item.side_effect = [None, {"_id": RECORD_ID}]
+        db.get_verification_record.return_value = make_record(VerificationState.SUBMITTED)
+
+        assert status_service.update_item(record, "education", 0, item, VerificationState.PENDING) == {"_id": RECORD_ID}
+
+        retry = db.update_verification_item.call_args_list[1]
+        assert retry.kwargs == {"expected_state": VerificationState.SUBMITTED, "counter_deltas": {"verified_count": 1}}
+
+    def test_update_item_gives_up_when_the_record_is_gone(self, status_service, db):
+        db.update_verification_item.return_value = None
+        db.get_verification_record.return_value = None
+
+        assert status_service.update_item(make_record(VerificationState.PENDING), "education", 0, {"verified": VerificationState.VERIFIED}, VerificationState.PENDING) is None
+        db.update_verification_item.assert_called_once()
+
+    def test_overall_status_of_deleted_legacy_record(self, status_service, db):
+        db.get_verification_record.return_value = None
+
+        assert status_service.update_overall_verification_status({"_id": RECORD_ID, "education": []}) is False
+        db.update_verification_record.assert_not_called()
+
+    def test_pending_items_keep_status_pending(self, status_service, db):
+        record = make_record(VerificationState.PENDING, VerificationState.VERIFIED)
+        assert status_service.update_overall_verification_status(record) is False
+        db.update_verification_record.assert_called_once_with(str(RECORD_ID), {"is_verified": "PENDING"})
+
+    def test_threshold_met(self, status_service, db):
+        record = make_record(*[VerificationState.VERIFIED] * 3, VerificationState.REJECTED)
+        assert status_service.update_overall_verification_status(record) is True
+        db.update_verification_record.assert_called_once_with(str(RECORD_ID), {"is_verified": "VERIFIED"})
+
+    def test_threshold_not_met(self, status_service, db):
+        record = make_record(VerificationState.VERIFIED, VerificationState.REJECTED)
+        assert status_service.update_overall_verification_status(record) is False
+        db.update_verification_record.assert_called_once_with(str(RECORD_ID), {"is_verified": "REJECTED"})
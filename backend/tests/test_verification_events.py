@@ -0,0 +1,218 @@
+import asyncio
+import json
+import threading
+from unittest.mock import MagicMock
+
+from bson.objectid import ObjectId
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.resume_verification import get_db
+from app.services.verification.common import VerificationState
+from app.services.verification.education import EducationVerificationService
+from app.services.verification.events import ITEM_EVENT, STATUS_EVENT, VerificationEventBus, event_bus
+from app.services.verification.status import VerificationStatusService, count_item_states
+
+RESUME_ID = str(ObjectId())
+
+def make_record(*states, is_verified="PENDING"):
+    record = {
+        "_id": ObjectId(),
+        "resume_id": RESUME_ID,
+        "is_verified": is_verified,
+        "education": [{"verified": state} for state in states],
+        "work_experience": []
+    }
+    record.update(count_item_states(record))
+    return record
+
+def collect(publish, bus=event_bus, count=1):
+    """Subscribe, run publish() in another thread and return the first count events."""
+    async def run():
+        subscription = bus.subscribe(RESUME_ID)
+        try:
+            thread = threading.Thread(target=publish)
+            thread.start()
+            events = [await asyncio.wait_for(subscription.get(), 5) for _ in range(count)]
+            thread.join()
+            return events, subscription
+        finally:
+            subscription.close()
+    return asyncio.run(run())
+
+def test_events_cross_threads_and_unsubscribe():
+    bus = VerificationEventBus()
+    events, subscription = collect(lambda: bus.publish(RESUME_ID, ITEM_EVENT, {"index": 0}), bus)
+
+    assert events == [(ITEM_EVENT, {"index": 0})]
+    assert bus.subscriber_count(RESUME_ID) == 0
+
+def test_slow_subscriber_drops_oldest_events():
+    bus = VerificationEventBus(max_size=2)
+
+    async def run():
+        subscription = bus.subscribe(RESUME_ID)
+        for index in range(4):
+            bus.publish(RESUME_ID, ITEM_EVENT, {"index": index})
+        await asyncio.sleep(0)
+        return [await subscription.get() for _ in range(2)], subscription.dropped
+
+    events, dropped = asyncio.run(run())
+    assert [data["index"] for _, data in events] == [2, 3]
+    assert dropped == 2
+
+def test_status_service_publishes_transitions():
+    db = MagicMock()
+    service = VerificationStatusService(db)
+    record = make_record(VerificationState.PENDING)
+    db.update_verification_item.return_value = make_record(VerificationState.VERIFIED)
+
+    def verify():
+        updated = service.update_item(record, "education", 0, {"verified": VerificationState.VERIFIED}, VerificationState.PENDING)
+        service.update_overall_verification_status(updated)
+
+    (item, status), _ = collect(verify, count=2)
+
+    assert item == (ITEM_EVENT, {
+        "resume_id": RESUME_ID, "section": "education", "index": 0,
+        "previous_state": VerificationState.PENDING, "state": VerificationState.VERIFIED,
+        "pending_count": 0, "verified_count": 1, "total_count": 1
+    })
+    assert status[0] == STATUS_EVENT
+    assert status[1]["previous_status"] == "PENDING" and status[1]["is_verified"] == "VERIFIED"
+
+def test_unchanged_overall_status_is_not_published():
+    service = VerificationStatusService(MagicMock())
+
+    async def run():
+        subscription = event_bus.subscribe(RESUME_ID)
+        service.update_overall_verification_status(make_record(VerificationState.PENDING))
+        await asyncio.sleep(0)
+        subscription.close()
+        return subscription.queue.qsize()
+
+    assert asyncio.run(run()) == 0
+
+def test_pending_status_is_published_once():
+    service = VerificationStatusService(MagicMock())
+    record = make_record(VerificationState.PENDING, is_verified="VERIFIED")
+
+    def mark_pending():
+        service.set_pending(record)
+        service.update_overall_verification_status(record)
+        service.set_pending(record)
+
+    async def run():
+        subscription = event_bus.subscribe(RESUME_ID)
+        try:
+            thread = threading.Thread(target=mark_pending)
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0)
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        finally:
+            subscription.close()
+
+    events = asyncio.run(run())
+    assert [(name, data["previous_status"], data["is_verified"]) for name, data in events] == [(STATUS_EVENT, "VERIFIED", "PENDING")]
+
+def test_education_pending_goes_through_the_status_service():
+    db = MagicMock()
+    blockchain = MagicMock()
+    blockchain.verification_exists.return_value = False
+    db.get_university_record_by_params.return_value = None
+    record = make_record(VerificationState.SUBMITTED, is_verified="VERIFIED")
+    record.update(name="Kalana De Alwis", education=[{"verified": VerificationState.SUBMITTED, "send": {"degree": "BSc", "institution": "NSBM"}}])
+    db.get_verification_info.return_value = record
+    db.update_verification_item.return_value = make_record(VerificationState.PENDING, is_verified="VERIFIED")
+    service = EducationVerificationService(db, blockchain, MagicMock())
+
+    (item, status), _ = collect(lambda: service.check_verification(RESUME_ID, 0), count=2)
+
+    db.get_university_record_by_params.assert_called_once_with({"full_name": "Kalana De Alwis", "university": "NSBM"})
+    assert item[1]["state"] == VerificationState.PENDING
+    assert status == (STATUS_EVENT, {
+        "resume_id": RESUME_ID, "previous_status": "VERIFIED", "is_verified": "PENDING",
+        "pending_count": 1, "verified_count": 0, "total_count": 1
+    })
+
+async def stream_events(path, on_message):
+    """
+    Call the app like a server would, passing every body chunk to on_message
+    until it returns True, then disconnect. The test client cannot read endless streams.
+    """
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    messages = []
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and on_message(message["body"]):
+            disconnected.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 1234), "server": ("testserver", 80)
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+    return messages
+
+def test_events_route_streams_snapshot_then_transitions():
+    db = MagicMock()
+    db.get_verification_info.return_value = make_record(VerificationState.PENDING, VerificationState.SUBMITTED)
+    app.dependency_overrides[get_db] = lambda: db
+    chunks = []
+
+    def on_message(body):
+        chunks.append(body)
+        if len(chunks) == 1:
+            event_bus.publish(RESUME_ID, ITEM_EVENT, {"index": 1, "state": "VERIFIED"})
+        return len(chunks) == 2
+
+    try:
+        messages = asyncio.run(stream_events(f"/resume-verification/{RESUME_ID}/events", on_message))
+    finally:
+        app.dependency_overrides.clear()
+
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in messages[0]["headers"]
+    event, data = chunks[0].decode().splitlines()[:2]
+    snapshot = json.loads(data[len("data: "):])
+    assert event == "event: snapshot"
+    assert snapshot["education"] == ["PENDING", "SUBMITTED"] and snapshot["pending_count"] == 1
+    assert chunks[1] == b'event: item\ndata: {"index":1,"state":"VERIFIED"}\n\n'
+    # The subscription ends with the connection
+    assert event_bus.subscriber_count(RESUME_ID) == 0
+
+def test_events_route_unknown_resume():
+    db = MagicMock()
+    db.get_verification_info.return_value = None
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        response = TestClient(app).get(f"/resume-verification/{RESUME_ID}/events")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 404
+    assert event_bus.subscriber_count(RESUME_ID) == 0
+
+def test_events_route_reads_the_record_off_the_event_loop():
+    threads = []
+    db = MagicMock()
+    db.get_verification_info.side_effect = lambda resume_id: threads.append(threading.current_thread()) or make_record(VerificationState.PENDING)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        asyncio.run(stream_events(f"/resume-verification/{RESUME_ID}/events", lambda body: True))
+    finally:
+        app.dependency_overrides.clear()
+
+    # asyncio.run runs the loop on this thread
+    assert threads and threads[0] is not threading.current_thread()
@@ -15,8 +15,17 @@ const HomePage: React.FC = () => {
   const fetchResumes = async () => {
     try {
       setLoading(true);
-      const response = await axios.get("/api/resume-verification/resumes");
-      setResumes(response.data.data); // Note the .data property to access the actual resume array
+      // Follow next_cursor until the last page
+      const all: Resume[] = [];
+      let after: string | null = null;
+      do {
+        const response = await axios.get("/api/resume-verification/resumes", {
+          params: { limit: 500, ...(after ? { after } : {}) },
+        });
+        all.push(...response.data.data); // Note the .data property to access the actual resume array
+        after = response.data.next_cursor;
+      } while (after);
+      setResumes(all);
       setError(null);
     } catch (err) {
       setError("Failed to fetch resumes. Please try again later.");